@@ -0,0 +1,5 @@
+"""Performance benchmarks for PAC4 - Student Performance in Catalonia.
+
+Each ``bench_*`` module is a standalone script; run it from
+``PAC4_carlestrullas/`` with ``python -m benchmarks.<module>``.
+"""
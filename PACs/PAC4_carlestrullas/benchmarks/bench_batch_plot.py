@@ -0,0 +1,79 @@
+"""Time batch rendering of per-university figures with 1..N worker processes.
+
+A synthetic merged-like frame with ``FIGURES`` universities is split on
+``Sigles`` and rendered by ``plot_time_series_batch`` into a temporary
+folder, building a new figure per university or redrawing one reused figure
+per worker. Wall time should drop roughly in proportion to the worker count,
+up to the number of cores.
+
+Usage::
+
+    python -m benchmarks.bench_batch_plot [FIGURES]
+"""
+
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import print_table, time_call
+from src.modules import visual_analysis
+
+DEFAULT_FIGURES = 16
+BRANCHES = ["Arts", "Ciències", "Salut", "Socials", "Enginyeria"]
+YEARS = [f"{year}-{(year + 1) % 100:02d}" for year in range(2015, 2023)]
+
+
+def make_frame(figures: int, seed: int = 0) -> pd.DataFrame:
+    """Build one row per university, branch and year."""
+    rng = np.random.default_rng(seed)
+    index = pd.MultiIndex.from_product(
+        [[f"U{i:03d}" for i in range(figures)], BRANCHES, YEARS],
+        names=["Sigles", "Branca", "Curs Acadèmic"],
+    )
+    df = index.to_frame(index=False)
+    df["Abandonament mitjà (%)"] = rng.random(len(df)) * 30
+    df["Rendiment mitjà (%)"] = 60 + rng.random(len(df)) * 40
+    return df
+
+
+def run(figures: int) -> None:
+    """Time the batch with every worker count up to the CPU count."""
+    df = make_frame(figures)
+    cpus = os.cpu_count() or 1
+    rows = []
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp, patch.object(
+        visual_analysis, "IMG_DIR", tmp
+    ), patch("src.modules.visual_analysis.print"):
+        for workers in sorted({1, 2, 4, cpus} & set(range(1, cpus + 1))):
+            for reuse in (False, True):
+                elapsed = time_call(
+                    lambda w=workers, r=reuse: visual_analysis.plot_time_series_batch(
+                        df,
+                        "Sigles",
+                        max_workers=w,
+                        options=visual_analysis.RenderOptions(
+                            force=True, reuse_figure=r
+                        ),
+                    ),
+                    repeat=1,
+                )
+                baseline = baseline or elapsed
+                rows.append(
+                    [
+                        figures,
+                        workers,
+                        "reused" if reuse else "new",
+                        elapsed,
+                        f"{baseline / elapsed:.1f}x",
+                    ]
+                )
+    print_table(["figures", "workers", "figure", "wall (s)", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_FIGURES)
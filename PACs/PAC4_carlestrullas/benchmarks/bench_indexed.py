@@ -0,0 +1,57 @@
+"""Compare mask-scan slicing with IndexedDataset slices as branches grow.
+
+Selecting every branch with ``df[df["Branca"] == branch]`` scans all rows per
+branch, so the total cost grows with branches x rows; ``IndexedDataset``
+sorts once and then slices by offset. The index build time is reported
+separately and included in the speedup.
+
+Usage::
+
+    python -m benchmarks.bench_indexed [ROWS] [BRANCHES ...]
+"""
+
+import sys
+
+import pandas as pd
+
+from benchmarks.bench_stats import make_frame
+from benchmarks.common import print_table, time_call
+from src.modules.indexed_dataset import IndexedDataset
+
+DEFAULT_ROWS = 200_000
+DEFAULT_BRANCHES = [5, 50, 200, 500]
+
+
+def mask_slices(df: pd.DataFrame) -> int:
+    """Select every branch with a boolean mask."""
+    return sum(len(df[df["Branca"] == branch]) for branch in df["Branca"].unique())
+
+
+def indexed_slices(data: IndexedDataset) -> int:
+    """Select every branch through the index."""
+    return sum(len(data.branch(branch)) for branch in data.branches)
+
+
+def run(rows: int, branch_counts) -> None:
+    """Time both ways of slicing for each number of branches."""
+    results = []
+    for branches in branch_counts:
+        df = make_frame(rows, branches)
+        data = IndexedDataset(df)
+        if mask_slices(df) != indexed_slices(data):
+            raise AssertionError("Slices differ")
+        masks = time_call(lambda d=df: mask_slices(d), repeat=1)
+        build = time_call(lambda d=df: IndexedDataset(d))
+        slices = time_call(lambda d=data: indexed_slices(d))
+        results.append(
+            [rows, branches, masks, build, slices, f"{masks / (build + slices):.1f}x"]
+        )
+    print_table(
+        ["rows", "branches", "masks (s)", "index (s)", "slices (s)", "speedup"],
+        results,
+    )
+
+
+if __name__ == "__main__":
+    ARGS = [int(arg) for arg in sys.argv[1:]]
+    run(ARGS[0] if ARGS else DEFAULT_ROWS, ARGS[1:] or DEFAULT_BRANCHES)
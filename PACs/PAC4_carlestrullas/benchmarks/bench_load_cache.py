@@ -0,0 +1,35 @@
+"""Compare cold (Excel parse) and warm (Feather cache) dataset loads.
+
+Usage::
+
+    python -m benchmarks.bench_load_cache
+"""
+
+from unittest.mock import patch
+
+from benchmarks.common import print_table, time_call
+from src.modules import load_data
+
+DATASETS = ["rendiment_estudiants.xlsx", "taxa_abandonament.xlsx"]
+
+
+def run() -> None:
+    """Time a cold and a warm load for each bundled dataset."""
+    rows = []
+    with patch("src.modules.load_data.print"):
+        for name in DATASETS:
+
+            def cold(name=name):
+                load_data.clear_cache(name)
+                load_data.load_dataset(name, use_cache=True)
+
+            cold_time = time_call(cold)
+            warm_time = time_call(
+                lambda name=name: load_data.load_dataset(name, use_cache=True)
+            )
+            rows.append([name, cold_time, warm_time, f"{cold_time / warm_time:.1f}x"])
+    print_table(["dataset", "cold (s)", "warm (s)", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,75 @@
+"""Time figure rendering of long series with and without LTTB downsampling.
+
+A synthetic frame with one random walk per branch, ``POINTS`` time steps
+long, is rendered by the exercise 3 plotting code once with every point and
+once per ``max_points`` target. The downsampling itself is timed separately.
+
+Usage::
+
+    python -m benchmarks.bench_lttb [POINTS]
+"""
+
+import sys
+import tempfile
+from typing import Optional
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import print_table, time_call
+from src.modules import visual_analysis
+from src.modules.indexed_dataset import IndexedDataset
+
+DEFAULT_POINTS = 100_000
+BRANCHES = ["Arts", "Ciències", "Salut", "Socials", "Enginyeria"]
+TARGETS = [None, 10_000, 2_000, 500]
+
+
+def make_frame(points: int, seed: int = 0) -> pd.DataFrame:
+    """Build one row per branch and time step, with a numeric time axis."""
+    rng = np.random.default_rng(seed)
+    n = points * len(BRANCHES)
+    return pd.DataFrame(
+        {
+            "Branca": np.repeat(BRANCHES, points),
+            "Curs Acadèmic": np.tile(np.arange(points, dtype=np.float64), 5),
+            "Abandonament mitjà (%)": 15 + np.cumsum(rng.normal(size=n)) / 100,
+            "Rendiment mitjà (%)": 75 + np.cumsum(rng.normal(size=n)) / 100,
+        }
+    )
+
+
+def render(indexed: IndexedDataset, max_points: Optional[int]) -> None:
+    """Render the exercise 3 figure into a throwaway folder."""
+    with tempfile.TemporaryDirectory() as tmp, patch.object(
+        visual_analysis, "IMG_DIR", tmp
+    ), patch("src.modules.visual_analysis.print"):
+        visual_analysis.plot_time_series_by_branch(indexed, max_points=max_points)
+
+
+def run(points: int) -> None:
+    """Time the render for every downsampling target."""
+    indexed = IndexedDataset(make_frame(points))
+    x = np.arange(points, dtype=np.float64)
+    y = indexed.values("Rendiment mitjà (%)")[:points]
+    baseline = None
+    rows = []
+    for target in TARGETS:
+        elapsed = time_call(lambda t=target: render(indexed, t), repeat=1)
+        baseline = baseline or elapsed
+        lttb = (
+            "-"
+            if target is None
+            else time_call(lambda t=target: visual_analysis.lttb_indices(x, y, t))
+        )
+        rows.append(
+            [points, target or "all", lttb, elapsed, f"{baseline / elapsed:.1f}x"]
+        )
+    print_table(
+        ["points/series", "max_points", "lttb (s)", "render (s)", "speedup"], rows
+    )
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_POINTS)
@@ -0,0 +1,71 @@
+"""Compare merge_datasets with the integer-encoded composite-key join.
+
+A synthetic fact frame of N rows (string keys drawn from realistic
+cardinalities) is joined to a frame holding one row per key combination, the
+shape produced by ``group_by_branch``.
+
+Usage::
+
+    python -m benchmarks.bench_merge [N ...]
+"""
+
+import itertools
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import print_table, time_call
+from src.modules import transform_data
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+CARDINALITIES = {
+    "Curs Acadèmic": 5,
+    "Tipus universitat": 3,
+    "Sigles": 12,
+    "Tipus Estudi": 2,
+    "Branca": 5,
+    "Sexe": 2,
+    "Integrat S/N": 2,
+}
+
+
+def make_frames(size: int, seed: int = 0):
+    """Build a fact frame of ``size`` rows and a one-row-per-key frame."""
+    rng = np.random.default_rng(seed)
+    levels = {
+        col: np.array([f"{col[:4]}-{i}" for i in range(n)], dtype=object)
+        for col, n in CARDINALITIES.items()
+    }
+    facts = pd.DataFrame(
+        {col: rng.choice(values, size) for col, values in levels.items()}
+    )
+    facts["Rendiment mitjà (%)"] = rng.random(size)
+    keys = pd.DataFrame(list(itertools.product(*levels.values())), columns=list(levels))
+    keys["Abandonament mitjà (%)"] = rng.random(len(keys))
+    return facts, keys
+
+
+def run(sizes) -> None:
+    """Time both join paths for each frame size."""
+    rows = []
+    categorical = {col: "category" for col in CARDINALITIES}
+    for size in sizes:
+        facts, keys = make_frames(size)
+        cases = [
+            ("object", facts, keys),
+            ("category", facts.astype(categorical), keys.astype(categorical)),
+        ]
+        for label, left, right in cases:
+            baseline = time_call(
+                lambda l=left, r=right: transform_data.merge_datasets(l, r)
+            )
+            encoded = time_call(
+                lambda l=left, r=right: transform_data.merge_datasets_encoded(l, r)
+            )
+            rows.append([size, label, baseline, encoded, f"{baseline / encoded:.1f}x"])
+    print_table(["rows", "keys", "pd.merge (s)", "encoded (s)", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
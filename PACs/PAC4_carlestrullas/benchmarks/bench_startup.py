@@ -0,0 +1,37 @@
+"""Measure CLI startup time and the cost of each exercise's imports.
+
+Usage::
+
+    python -m benchmarks.bench_startup
+"""
+
+import subprocess
+import sys
+
+from benchmarks.common import print_table, time_call
+
+CASES = [
+    ("main.py --help", ["-m", "src.main", "--help"]),
+    ("import src.main", ["-c", "import src.main"]),
+    ("exercise 1-2 modules", ["-c", "import src.modules.transform_data"]),
+    ("exercise 3 modules", ["-c", "import src.modules.visual_analysis"]),
+    ("exercise 4 modules", ["-c", "import src.modules.statistical_analysis"]),
+]
+
+
+def run() -> None:
+    """Time each case in a fresh interpreter."""
+    rows = []
+    for label, args in CASES:
+        elapsed = time_call(
+            lambda args=args: subprocess.run(
+                [sys.executable, *args], capture_output=True, check=True
+            ),
+            repeat=5,
+        )
+        rows.append([label, elapsed])
+    print_table(["case", "wall (s)"], rows)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,93 @@
+"""Compare the per-branch statistics with the original mask-per-branch loop.
+
+``legacy_branch_stats`` reproduces the loop ``analyze_dataset`` used to run:
+one boolean mask over the full frame, one groupby and one ``linregress`` per
+branch. The grouped pass in ``statistical_analysis.build_report`` is timed
+against it on synthetic frames with a growing number of branches, and the
+per-branch results are checked to be identical.
+
+Usage::
+
+    python -m benchmarks.bench_stats [ROWS] [BRANCHES ...]
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy.stats import linregress
+
+from benchmarks.common import print_table, time_call
+from src.modules import statistical_analysis
+
+DEFAULT_ROWS = 200_000
+DEFAULT_BRANCHES = [5, 50, 200, 500]
+YEARS = [f"{year}-{(year + 1) % 100:02d}" for year in range(2012, 2023)]
+
+
+def make_frame(rows: int, branches: int, seed: int = 0) -> pd.DataFrame:
+    """Build a merged-like frame with ``branches`` distinct branches."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Curs Acadèmic": rng.choice(YEARS, rows),
+            "Branca": rng.choice([f"Branca {i:04d}" for i in range(branches)], rows),
+            "Abandonament mitjà (%)": rng.random(rows) * 30,
+            "Rendiment mitjà (%)": 60 + rng.random(rows) * 40,
+        }
+    )
+
+
+def legacy_branch_stats(merged_df: pd.DataFrame) -> dict:
+    """Per-branch statistics computed with the original loop."""
+    abandon_col = statistical_analysis.ABANDON_COL
+    perf_col = statistical_analysis.PERF_COL
+    branch_stats = {}
+    for branch in merged_df["Branca"].unique():
+        branch_data = merged_df[merged_df["Branca"] == branch]
+        branch_by_year = (
+            branch_data.groupby("Curs Acadèmic", observed=True)
+            .agg({abandon_col: "mean"})
+            .reset_index()
+        )
+        slope = linregress(
+            range(len(branch_by_year)), branch_by_year[abandon_col].tolist()
+        ).slope
+        if slope > 0.01:
+            tendencia = "increasing"
+        elif slope < -0.01:
+            tendencia = "decreasing"
+        else:
+            tendencia = "stable"
+        branch_stats[branch] = {
+            "abandono": {
+                "mean": branch_data[abandon_col].mean(),
+                "std": branch_data[abandon_col].std(),
+            },
+            "rendimiento": {
+                "mean": branch_data[perf_col].mean(),
+                "std": branch_data[perf_col].std(),
+            },
+            "tendencia_abandono": tendencia,
+        }
+    return branch_stats
+
+
+def run(rows: int, branch_counts) -> None:
+    """Time both implementations for each number of branches."""
+    results = []
+    for branches in branch_counts:
+        df = make_frame(rows, branches)
+        expected = legacy_branch_stats(df)
+        actual = statistical_analysis.build_report(df)["analisis_por_rama"]
+        if list(actual.items()) != list(expected.items()):
+            raise AssertionError(f"Results differ with {branches} branches")
+        legacy = time_call(lambda d=df: legacy_branch_stats(d), repeat=1)
+        grouped = time_call(lambda d=df: statistical_analysis.branch_summary(d))
+        results.append([rows, branches, legacy, grouped, f"{legacy / grouped:.1f}x"])
+    print_table(["rows", "branches", "loop (s)", "grouped (s)", "speedup"], results)
+
+
+if __name__ == "__main__":
+    ARGS = [int(arg) for arg in sys.argv[1:]]
+    run(ARGS[0] if ARGS else DEFAULT_ROWS, ARGS[1:] or DEFAULT_BRANCHES)
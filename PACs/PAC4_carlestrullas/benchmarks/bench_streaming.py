@@ -0,0 +1,37 @@
+"""Compare peak memory of a full Excel load with chunked streaming.
+
+Usage::
+
+    python -m benchmarks.bench_streaming
+"""
+
+from unittest.mock import patch
+
+from benchmarks.common import measure, print_table
+from src.modules import load_data
+
+DATASET = "rendiment_estudiants.xlsx"
+CHUNKSIZES = [1_000, 5_000, 20_000]
+
+
+def _stream(chunksize: int) -> None:
+    """Consume the dataset chunk by chunk, keeping only a row count."""
+    rows = 0
+    for chunk in load_data.iter_dataset(DATASET, chunksize=chunksize):
+        rows += len(chunk)
+
+
+def run() -> None:
+    """Report wall time and peak memory for each loading strategy."""
+    rows = []
+    with patch("src.modules.load_data.print"):
+        elapsed, peak = measure(lambda: load_data.load_dataset(DATASET))
+        rows.append(["load_dataset", elapsed, peak])
+        for chunksize in CHUNKSIZES:
+            elapsed, peak = measure(lambda c=chunksize: _stream(c))
+            rows.append([f"iter_dataset({chunksize})", elapsed, peak])
+    print_table(["strategy", "wall (s)", "peak (MB)"], rows)
+
+
+if __name__ == "__main__":
+    run()
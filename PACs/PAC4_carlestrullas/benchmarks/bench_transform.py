@@ -0,0 +1,53 @@
+"""Compare the chained exercise 2 transforms with the fused transform.
+
+The bundled datasets are tiled to emulate larger extracts. For each size the
+script reports wall time and peak traced memory of both paths.
+
+Usage::
+
+    python -m benchmarks.bench_transform [FACTOR ...]
+"""
+
+import sys
+from unittest.mock import patch
+
+import pandas as pd
+
+from benchmarks.common import measure, print_table
+from src.modules import load_data, transform_data
+
+DEFAULT_FACTORS = [1, 10, 50]
+VALUE_COL = "% Abandonament a primer curs"
+NEW_COL = "Abandonament mitjà (%)"
+
+
+def chained(df: pd.DataFrame) -> pd.DataFrame:
+    """Run harmonize -> drop -> group as separate steps."""
+    harmonized = transform_data.harmonize_abandonment_columns(df)
+    cleaned = transform_data.drop_unnecessary_columns(harmonized, "abandonment")
+    return transform_data.group_by_branch(cleaned, VALUE_COL, NEW_COL)
+
+
+def fused(df: pd.DataFrame) -> pd.DataFrame:
+    """Run the fused transform."""
+    return transform_data.transform_dataset(df, "abandonment", VALUE_COL, NEW_COL)
+
+
+def run(factors) -> None:
+    """Benchmark both paths on the dropout dataset tiled ``factor`` times."""
+    with patch("src.modules.load_data.print"):
+        base = load_data.load_dataset("taxa_abandonament.xlsx", use_cache=True)
+    rows = []
+    for factor in factors:
+        df = pd.concat([base] * factor, ignore_index=True)
+        chain_time, chain_peak = measure(lambda df=df: chained(df))
+        fused_time, fused_peak = measure(lambda df=df: fused(df))
+        rows.append([len(df), chain_time, fused_time, chain_peak, fused_peak])
+    print_table(
+        ["rows", "chain (s)", "fused (s)", "chain peak (MB)", "fused peak (MB)"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or DEFAULT_FACTORS)
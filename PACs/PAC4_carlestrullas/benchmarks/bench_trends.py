@@ -0,0 +1,61 @@
+"""Compare per-group ``linregress`` calls with the batched trend regression.
+
+Synthetic data has one row per group and academic year, so every group is a
+tiny regression over its yearly means, as in ``trend_by_groups`` over
+fine-grained keys such as ``Sigles`` x ``Tipus Estudi`` x ``Sexe``.
+
+Usage::
+
+    python -m benchmarks.bench_trends [GROUPS ...]
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy.stats import linregress
+
+from benchmarks.common import print_table, time_call
+from src.modules import statistical_analysis
+
+DEFAULT_GROUPS = [1_000, 10_000, 50_000]
+YEARS = [f"{year}-{(year + 1) % 100:02d}" for year in range(2012, 2023)]
+
+
+def make_frame(groups: int, seed: int = 0) -> pd.DataFrame:
+    """Build one row per group and year with a random dropout rate."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Grup": np.repeat(np.arange(groups), len(YEARS)),
+            "Curs Acadèmic": np.tile(YEARS, groups),
+            "Abandonament mitjà (%)": rng.random(groups * len(YEARS)) * 30,
+        }
+    )
+
+
+def scipy_trends(df: pd.DataFrame) -> list:
+    """Fit every group with its own ``linregress`` call."""
+    col = statistical_analysis.ABANDON_COL
+    fits = []
+    for _, group in df.groupby("Grup"):
+        yearly = group.groupby("Curs Acadèmic")[col].mean()
+        fits.append(linregress(range(len(yearly)), yearly.to_numpy()))
+    return fits
+
+
+def run(group_counts) -> None:
+    """Time both approaches for each number of groups."""
+    rows = []
+    for groups in group_counts:
+        df = make_frame(groups)
+        batched = time_call(
+            lambda d=df: statistical_analysis.trend_by_groups(d, ["Grup"])
+        )
+        looped = time_call(lambda d=df: scipy_trends(d), repeat=1)
+        rows.append([groups, looped, batched, f"{looped / batched:.0f}x"])
+    print_table(["groups", "linregress loop (s)", "batched (s)", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or DEFAULT_GROUPS)
@@ -0,0 +1,58 @@
+"""Shared helpers for the benchmark scripts."""
+
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+
+def time_call(func: Callable[[], object], repeat: int = 3) -> float:
+    """Time a callable and return the best wall time.
+
+    Args:
+        func: Zero-argument callable to time.
+        repeat: Number of runs; the fastest one is reported.
+
+    Returns:
+        The best wall time in seconds.
+    """
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure(func: Callable[[], object]) -> Tuple[float, float]:
+    """Run a callable once and report its wall time and peak memory.
+
+    Args:
+        func: Zero-argument callable to measure.
+
+    Returns:
+        The wall time in seconds and the peak memory traced by
+        ``tracemalloc`` while it ran, in MB.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def print_table(headers: List[str], rows: List[List[object]]) -> None:
+    """Print benchmark results as an aligned plain-text table.
+
+    Args:
+        headers: Column titles.
+        rows: Table rows; floats are formatted with four decimals.
+    """
+    cells = [
+        [f"{v:.4f}" if isinstance(v, float) else str(v) for v in row] for row in rows
+    ]
+    widths = [max(len(h), *(len(r[i]) for r in cells)) for i, h in enumerate(headers)]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)).rstrip())
+    for row in cells:
+        print("  ".join(c.ljust(w) for c, w in zip(row, widths)).rstrip())
@@ -0,0 +1,161 @@
+"""Time and memory-profile the pipeline stages on synthetic data at scale.
+
+For each size, :mod:`benchmarks.synthetic` builds performance and dropout
+frames of N rows and stores them as Feather files, like the workbook cache.
+Each stage then runs once under ``tracemalloc``: loading (Feather read plus
+``optimize_dtypes``, the path a cached run takes; Excel itself stops at about
+10^6 rows), harmonize/group, merge, statistics and plotting. The results are
+printed and saved as JSON together with the environment, and ``--compare``
+prints the ratios against an earlier results file.
+
+Usage::
+
+    python -m benchmarks.suite [--sizes N ...] [--output PATH] [--compare PATH]
+"""
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+from datetime import datetime
+from typing import Dict, List
+from unittest.mock import patch
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import measure, print_table
+from benchmarks.synthetic import make_datasets
+from src.modules import load_data, statistical_analysis, transform_data
+from src.modules import visual_analysis
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+TRANSFORMS = {
+    "performance": ("Taxa rendiment", "Rendiment mitjà (%)"),
+    "abandonment": ("% Abandonament a primer curs", "Abandonament mitjà (%)"),
+}
+
+
+def write_datasets(rows: int, folder: str) -> Dict[str, str]:
+    """Store synthetic frames of ``rows`` rows as Feather files in ``folder``."""
+    paths = {}
+    for dataset, df in zip(TRANSFORMS, make_datasets(rows)):
+        paths[dataset] = os.path.join(folder, f"{dataset}.feather")
+        df.to_feather(paths[dataset])
+    return paths
+
+
+def run_size(rows: int) -> List[dict]:
+    """Measure every stage on synthetic frames of ``rows`` rows."""
+    state: Dict[str, object] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_datasets(rows, tmp)
+
+        def load():
+            for dataset, path in paths.items():
+                state[dataset] = load_data.optimize_dtypes(pd.read_feather(path))
+
+        def transform():
+            for dataset, (value_col, new_col) in TRANSFORMS.items():
+                state[f"{dataset}_g"] = transform_data.transform_dataset(
+                    state.pop(dataset), dataset, value_col, new_col
+                )
+
+        def merge():
+            state["merged"] = transform_data.merge_datasets_encoded(
+                state["performance_g"], state["abandonment_g"]
+            )
+
+        def statistics():
+            statistical_analysis.build_report(state["merged"])
+
+        def plot():
+            with patch.object(visual_analysis, "IMG_DIR", tmp), patch(
+                "src.modules.visual_analysis.print"
+            ):
+                visual_analysis.plot_time_series_by_branch(state["merged"], force=True)
+
+        results = []
+        for stage in [load, transform, merge, statistics, plot]:
+            seconds, peak_mb = measure(stage)
+            results.append(
+                {
+                    "rows": rows,
+                    "stage": stage.__name__,
+                    "seconds": seconds,
+                    "peak_mb": peak_mb,
+                }
+            )
+    return results
+
+
+def environment() -> dict:
+    """Describe the machine and library versions the results come from."""
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+    }
+
+
+def compare(results: List[dict], baseline_path: str) -> None:
+    """Print each measurement next to the same one in an earlier run."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["rows"], r["stage"]): r for r in json.load(f)["results"]}
+    rows = []
+    for result in results:
+        base = baseline.get((result["rows"], result["stage"]))
+        if base is not None:
+            rows.append(
+                [
+                    result["rows"],
+                    result["stage"],
+                    base["seconds"],
+                    result["seconds"],
+                    f"{result['seconds'] / base['seconds']:.2f}x",
+                    base["peak_mb"],
+                    result["peak_mb"],
+                ]
+            )
+    print(f"\nCompared with {baseline_path}:")
+    print_table(
+        ["rows", "stage", "base (s)", "now (s)", "time", "base MB", "now MB"], rows
+    )
+
+
+def main() -> None:
+    """Run the suite for every size and save the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--output",
+        help="Results file (default: benchmarks/results/suite-<timestamp>.json).",
+    )
+    parser.add_argument("--compare", metavar="PATH", help="Earlier results file.")
+    args = parser.parse_args()
+
+    results = [result for rows in args.sizes for result in run_size(rows)]
+    print_table(
+        ["rows", "stage", "time (s)", "peak (MB)"],
+        [[r["rows"], r["stage"], r["seconds"], r["peak_mb"]] for r in results],
+    )
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"suite-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({**environment(), "results": results}, f, indent=4)
+    print(f"\nResults saved to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Synthetic performance and dropout datasets at any scale.
+
+The frames have the columns, dtypes and labels of ``rendiment_estudiants.xlsx``
+and ``taxa_abandonament.xlsx`` as parsed by ``load_dataset``, with the same
+category cardinalities: 12 universities (11 in the dropout data, which leaves
+out the online one), about 169 units, 1689 studies over 5 branches and 2 study
+types, 5 academic years, 2 sexes and 2 centre types. Studies are nested in
+units and units in universities, and every row draws a study, year and sex
+at random, so the grouped and merged frames keep the shape of the real ones
+(about 1,500 groups) however many rows there are. Label columns share their
+string objects, which keeps 10^7-row frames within a few GB.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Sigles, name, kind and relative size, as in the performance workbook
+UNIVERSITIES = [
+    ("UB", "UNIVERSITAT DE BARCELONA", "PÚBLICA", 2391),
+    ("UAB", "UNIVERSITAT AUTÒNOMA DE BARCELONA", "PÚBLICA", 2222),
+    ("UPC", "UNIVERSITAT POLITÈCNICA DE CATALUNYA", "PÚBLICA", 1956),
+    ("UPF", "UNIVERSITAT POMPEU FABRA", "PÚBLICA", 1224),
+    ("URV", "UNIVERSITAT ROVIRA I VIRGILI", "PÚBLICA", 1192),
+    ("URL", "UNIVERSITAT RAMON LLULL", "PRIVADA", 1156),
+    ("UdL", "UNIVERSITAT DE LLEIDA", "PÚBLICA", 1047),
+    ("UdG", "UNIVERSITAT DE GIRONA", "PÚBLICA", 998),
+    ("UOC", "UNIVERSITAT OBERTA DE CATALUNYA", "NO PRESENCIAL", 843),
+    (
+        "UVIC-UCC",
+        "UNIVERSITAT DE VIC - UNIVERSITAT CENTRAL DE CATALUNYA",
+        "PRIVADA",
+        533,
+    ),
+    ("UIC", "UNIVERSITAT INTERNACIONAL DE CATALUNYA", "PRIVADA", 314),
+    ("UAO", "UNIVERSITAT ABAT OLIBA CEU", "PRIVADA", 241),
+]
+BRANCHES = {
+    "Ciències socials i jurídiques": 5450,
+    "Enginyeria i arquitectura": 3508,
+    "Ciències de la salut": 1986,
+    "Arts i humanitats": 1896,
+    "Ciències": 1277,
+}
+STUDY_TYPES = ["grau", "màster universitari"]
+PERFORMANCE_YEARS = ["19-20", "20-21", "21-22", "22-23", "23-24"]
+DROPOUT_YEARS = ["18-19", "19-20", "20-21", "21-22", "22-23"]
+SEXES = ["HOME", "DONA"]
+CENTRES = ["Integrat", "Adscrit"]
+N_UNITS = 169
+N_STUDIES = 1689
+# Share of units attached to a university rather than integrated in it
+ADSCRIT_SHARE = 0.12
+# Universities without dropout figures (the online university)
+NO_DROPOUT = {"NO PRESENCIAL"}
+
+
+def make_datasets(rows: int, seed: int = 0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Build performance and dropout frames of ``rows`` rows each.
+
+    Args:
+        rows: Number of rows of each frame.
+        seed: Random seed; the same seed gives the same frames.
+
+    Returns:
+        The performance and dropout frames, in the layout of the bundled
+        workbooks.
+    """
+    return make_performance(rows, seed), make_dropout(rows, seed)
+
+
+def make_performance(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Build a frame in the layout of ``rendiment_estudiants.xlsx``.
+
+    Args:
+        rows: Number of rows.
+        seed: Random seed.
+
+    Returns:
+        The frame; ``Taxa rendiment`` is ``superats / matriculats``.
+    """
+    rng = np.random.default_rng([seed, 0])
+    studies = _studies()
+    picked = rng.integers(0, N_STUDIES, rows)
+    enrolled = np.maximum(np.round(rng.lognormal(7.2, 1.3, rows)), 1.0)
+    passed = np.round(enrolled * rng.beta(6.0, 0.9, rows))
+    return pd.DataFrame(
+        {
+            "Curs Acadèmic": _labels(PERFORMANCE_YEARS, rng.integers(0, 5, rows)),
+            "Tipus universitat": studies["kind"][picked],
+            "Universitat": studies["university"][picked],
+            "Sigles": studies["sigles"][picked],
+            "Unitat": studies["unit"][picked],
+            "Tipus Estudi": studies["type"][picked],
+            "Branca": studies["branch"][picked],
+            "Codi Estudi": studies["code"][picked],
+            "Estudi": studies["name"][picked],
+            "Sexe": _labels(SEXES, rng.integers(0, 2, rows)),
+            "Integrat S/N": studies["centre"][picked],
+            "Crèdits ordinaris superats": passed,
+            "Crèdits ordinaris matriculats": enrolled,
+            "Taxa rendiment": passed / enrolled,
+        }
+    )
+
+
+def make_dropout(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Build a frame in the layout of ``taxa_abandonament.xlsx``.
+
+    About a quarter of the rates are exactly zero and 0.3% are missing, as in
+    the bundled workbook.
+
+    Args:
+        rows: Number of rows.
+        seed: Random seed.
+
+    Returns:
+        The frame, with the dropout workbook's column names.
+    """
+    rng = np.random.default_rng([seed, 1])
+    studies = _studies()
+    eligible = np.flatnonzero(~np.isin(studies["kind"], list(NO_DROPOUT)))
+    picked = eligible[rng.integers(0, len(eligible), rows)]
+    rate = rng.beta(0.9, 7.0, rows)
+    rate[rng.random(rows) < 0.25] = 0.0
+    rate[rng.random(rows) < 0.003] = np.nan
+    return pd.DataFrame(
+        {
+            "Curs Acadèmic": _labels(DROPOUT_YEARS, rng.integers(0, 5, rows)),
+            "Naturalesa universitat responsable": studies["kind"][picked],
+            "Universitat Responsable": studies["university"][picked],
+            "Sigles": studies["sigles"][picked],
+            "Unitat": studies["unit"][picked],
+            "Tipus Estudi": studies["type"][picked],
+            "Branca": studies["branch"][picked],
+            "Estudi": studies["name"][picked],
+            "Sexe Alumne": _labels(SEXES, rng.integers(0, 2, rows)),
+            "Tipus de centre": studies["centre"][picked],
+            "% Abandonament a primer curs": rate,
+        }
+    )
+
+
+def _studies() -> Dict[str, np.ndarray]:
+    """Build the fixed catalogue of studies both frames draw rows from.
+
+    Returns:
+        One object array per study attribute, ``N_STUDIES`` long.
+    """
+    rng = np.random.default_rng(2024)
+    sizes = np.array([size for *_, size in UNIVERSITIES], dtype=np.float64)
+    # Every university gets at least one unit, the rest go by size
+    unit_university = np.concatenate(
+        [
+            np.arange(len(UNIVERSITIES)),
+            rng.choice(
+                len(UNIVERSITIES), N_UNITS - len(UNIVERSITIES), p=sizes / sizes.sum()
+            ),
+        ]
+    )
+    unit_centre = (rng.random(N_UNITS) < ADSCRIT_SHARE).astype(np.int64)
+    university_units = [
+        np.flatnonzero(unit_university == u) for u in range(len(UNIVERSITIES))
+    ]
+
+    study_university = rng.choice(len(UNIVERSITIES), N_STUDIES, p=sizes / sizes.sum())
+    study_unit = np.array(
+        [rng.choice(university_units[u]) for u in study_university], dtype=np.int64
+    )
+    branch_weights = np.array(list(BRANCHES.values()), dtype=np.float64)
+    study_type = rng.integers(0, len(STUDY_TYPES), N_STUDIES)
+    prefixes = np.array(["G", "M"], dtype=object)
+
+    return {
+        "sigles": _labels([u[0] for u in UNIVERSITIES], study_university),
+        "university": _labels([u[1] for u in UNIVERSITIES], study_university),
+        "kind": _labels([u[2] for u in UNIVERSITIES], study_university),
+        "unit": _labels([f"UNITAT {i + 1}" for i in range(N_UNITS)], study_unit),
+        "centre": _labels(CENTRES, unit_centre[study_unit]),
+        "branch": _labels(
+            list(BRANCHES),
+            rng.choice(
+                len(BRANCHES), N_STUDIES, p=branch_weights / branch_weights.sum()
+            ),
+        ),
+        "type": _labels(STUDY_TYPES, study_type),
+        "code": np.array(
+            [f"{prefixes[t]}{1000 + i}" for i, t in enumerate(study_type)], dtype=object
+        ),
+        "name": np.array([f"ESTUDI {i + 1}" for i in range(N_STUDIES)], dtype=object),
+    }
+
+
+def _labels(values, codes: np.ndarray) -> np.ndarray:
+    """Map integer codes to an object array of shared label strings."""
+    return np.asarray(values, dtype=object)[codes]
@@ -14,6 +14,7 @@ setup(
     package_dir={"": "src"},
     install_requires=[
         "pandas==1.5.3",
+        "pyarrow==15.0.0",
         "openpyxl==3.1.2",
         "numpy==1.26.0",
         "matplotlib==3.8.2",
@@ -4,81 +4,336 @@ the required analyses and functionalities for the assignment.
 """
 
 import argparse
+import dataclasses
+import os
+import sys
+from datetime import datetime
+from functools import partial
 
-from src.modules import (
-    eda,
-    load_data,
-    statistical_analysis,
-    transform_data,
-    visual_analysis,
-)
+# Submodules load lazily, so each exercise only imports what it needs
+from src import modules
+from src.modules import artifacts
+from src.modules.scheduler import Pipeline, Stage
 
+SRC_DIR = os.path.dirname(__file__)
+DATA_DIR = os.path.join(os.path.dirname(SRC_DIR), "data")
+REPORT_DIR = os.path.join(SRC_DIR, "report")
+DATASETS = ["rendiment_estudiants.xlsx", "taxa_abandonament.xlsx"]
+STUDENT_NAME = "carlestrullas"
+# Pipeline stages of each exercise; the last one is the exercise's target
+EXERCISE_STAGES = {
+    1: ["load_performance", "load_abandonment", "exercise_1"],
+    2: ["transform_performance", "transform_abandonment", "exercise_2"],
+    3: ["exercise_3"],
+    4: ["exercise_4"],
+}
 
-def run_exercise_1():
+
+def load_performance():
+    """
+    Load the performance dataset.
+    Returns:
+        df_perf (pd.DataFrame): Performance dataset.
+    """
+    return modules.load_data.load_dataset(DATASETS[0], use_cache=True, optimize=True)
+
+
+def load_abandonment():
+    """
+    Load the abandonment dataset.
+    Returns:
+        df_aband (pd.DataFrame): Abandonment dataset.
     """
-    Load both datasets and perform exploratory data analysis (EDA).
+    return modules.load_data.load_dataset(DATASETS[1], use_cache=True, optimize=True)
+
 
-    Returns
-    -------
-    df_perf : pd.DataFrame
-        Performance dataset.
-    df_aband : pd.DataFrame
-        Abandonment dataset.
+def run_exercise_1(df_perf, df_aband):
+    """
+    Perform exploratory data analysis (EDA) of both datasets.
+    Args:
+        df_perf (pd.DataFrame): Performance dataset.
+        df_aband (pd.DataFrame): Abandonment dataset.
     """
     print("Exercise 1: Load dataset and EDA")
-    df_perf = load_data.load_dataset("rendiment_estudiants.xlsx")
-    df_aband = load_data.load_dataset("taxa_abandonament.xlsx")
     print("\nPerformance dataset:")
-    eda.show_eda(df_perf)
+    modules.eda.show_eda(df_perf)
     print("\nAbandonment dataset:")
-    eda.show_eda(df_aband)
-    return df_perf, df_aband
+    modules.eda.show_eda(df_aband)
+
+
+def transform_performance(df_perf):
+    """
+    Harmonize, clean and group the performance dataset.
+    Args:
+        df_perf (pd.DataFrame): Performance dataset.
+    Returns:
+        df_perf_g (pd.DataFrame): Grouped performance dataset.
+    """
+    # Fused harmonize -> drop -> group, without copying the full dataset
+    return modules.transform_data.transform_dataset(
+        df_perf, "performance", "Taxa rendiment", "Rendiment mitjà (%)"
+    )
+
+
+def transform_abandonment(df_aband):
+    """
+    Harmonize, clean and group the abandonment dataset.
+    Args:
+        df_aband (pd.DataFrame): Abandonment dataset.
+    Returns:
+        df_aband_g (pd.DataFrame): Grouped abandonment dataset.
+    """
+    return modules.transform_data.transform_dataset(
+        df_aband,
+        "abandonment",
+        "% Abandonament a primer curs",
+        "Abandonament mitjà (%)",
+    )
+
+
+def run_exercise_2(df_perf_g, df_aband_g):
+    """
+    Merge the grouped datasets for further analysis.
+    Args:
+        df_perf_g (pd.DataFrame): Grouped performance dataset.
+        df_aband_g (pd.DataFrame): Grouped abandonment dataset.
+    Returns:
+        merged (pd.DataFrame): Merged dataset ready for analysis.
+    """
+    print("\nExercise 2: Data cleaning, harmonization, grouping, and merging")
+    merged = modules.transform_data.merge_datasets_encoded(df_perf_g, df_aband_g)
+    print("\nMerged dataset (first 5 rows):")
+    print(merged.head())
+    return merged
 
 
-def run_exercise_2(df_perf, df_aband):
+def run_exercise_2_by_year(df_perf, df_aband, max_workers=None):
     """
-    Clean, harmonize, group, and merge the datasets for further analysis.
+    Transform, merge and summarize both datasets one academic year at a
+    time in a process pool; the merged dataset is the same as in
+    run_exercise_2.
     Args:
         df_perf (pd.DataFrame): Performance dataset.
         df_aband (pd.DataFrame): Abandonment dataset.
+        max_workers (int): Maximum number of worker processes.
     Returns:
         merged (pd.DataFrame): Merged dataset ready for analysis.
+        statistics (OnlineStatistics): Report statistics of the merged rows.
     """
     print("\nExercise 2: Data cleaning, harmonization, grouping, and merging")
-    df_aband_h = transform_data.harmonize_abandonment_columns(df_aband)
-    df_perf_c = transform_data.drop_unnecessary_columns(df_perf, "performance")
-    df_aband_c = transform_data.drop_unnecessary_columns(df_aband_h, "abandonment")
-    df_perf_g = transform_data.group_by_branch(
-        df_perf_c, "Taxa rendiment", "Rendiment mitjà (%)"
+    merged, statistics = modules.partitioned.merge_by_year(
+        df_perf, df_aband, max_workers=max_workers
     )
-    df_aband_g = transform_data.group_by_branch(
-        df_aband_c, "% Abandonament a primer curs", "Abandonament mitjà (%)"
-    )
-    merged = transform_data.merge_datasets(df_perf_g, df_aband_g)
     print("\nMerged dataset (first 5 rows):")
     print(merged.head())
-    return merged
+    return merged, statistics
 
 
-def run_exercise_3(merged):
+def run_exercise_3(merged, force_render=False):
     """
     Generate and save time series visualizations for abandonment and performance
     rates by branch.
     Args:
         merged (pd.DataFrame): Merged dataset.
+        force_render (bool): Redraw the figure even if the existing PNG was
+            rendered from the same data.
     """
     print("\nExercise 3: Time series visualization")
-    visual_analysis.plot_time_series_by_branch(merged, student_name="carlestrullas")
+    modules.visual_analysis.plot_time_series_by_branch(
+        merged, student_name=STUDENT_NAME, force=force_render
+    )
 
 
-def run_exercise_4(merged):
+def run_exercise_4(merged, statistics=None, n_bootstrap=0):
     """
     Perform statistical analysis and save results as a JSON report.
     Args:
         merged (pd.DataFrame): Merged dataset.
+        statistics (OnlineStatistics): Statistics of the merged rows computed
+            by run_exercise_2_by_year, or None to compute them here.
+        n_bootstrap (int): Bootstrap resamples for the confidence intervals;
+            0 leaves them out of the report.
     """
     print("\nExercise 4: Statistical analysis and JSON report")
-    statistical_analysis.analyze_dataset(merged)
+    modules.statistical_analysis.analyze_dataset(
+        merged, n_bootstrap=n_bootstrap, statistics=statistics
+    )
+
+
+def build_pipeline(store, args):
+    """
+    Describe the exercises as a graph of cached stages.
+
+    The two loads and the two transforms are independent, as are the plot
+    and the report, so the scheduler runs them concurrently. Loads parse
+    Excel workbooks and hold the GIL, so they run in worker processes.
+    Args:
+        store (artifacts.ArtifactStore): Store caching each stage's result.
+        args (argparse.Namespace): Parsed command-line options.
+    Returns:
+        scheduler.Pipeline: The pipeline of every exercise stage.
+    """
+    data_keys = [
+        artifacts.file_digest(os.path.join(DATA_DIR, name)) for name in DATASETS
+    ]
+    keys = {}
+    for stage, data_key in zip(EXERCISE_STAGES[1], data_keys):
+        keys[stage] = artifacts.stage_key(
+            stage, data_key, artifacts.code_version("main", "load_data")
+        )
+    keys["exercise_1"] = artifacts.stage_key(
+        "exercise_1",
+        keys["load_performance"],
+        keys["load_abandonment"],
+        artifacts.code_version("main", "eda"),
+    )
+    for stage, load in zip(EXERCISE_STAGES[2], EXERCISE_STAGES[1]):
+        keys[stage] = artifacts.stage_key(
+            stage,
+            keys[load],
+            artifacts.code_version("main", "transform_data", "profiling"),
+        )
+    if args.partition_by_year:
+        keys["exercise_2"] = artifacts.stage_key(
+            "exercise_2",
+            keys["load_performance"],
+            keys["load_abandonment"],
+            artifacts.code_version(
+                "main",
+                "transform_data",
+                "statistical_analysis",
+                "partitioned",
+                "profiling",
+            ),
+        )
+    else:
+        keys["exercise_2"] = artifacts.stage_key(
+            "exercise_2",
+            keys["transform_performance"],
+            keys["transform_abandonment"],
+            artifacts.code_version("main", "transform_data", "profiling"),
+        )
+    keys["exercise_3"] = artifacts.stage_key(
+        "exercise_3",
+        keys["exercise_2"],
+        artifacts.code_version(
+            "main", "visual_analysis", "indexed_dataset", "shared_frame"
+        ),
+    )
+    keys["exercise_4"] = artifacts.stage_key(
+        "exercise_4",
+        keys["exercise_2"],
+        artifacts.code_version(
+            "main",
+            "statistical_analysis",
+            "indexed_dataset",
+            "shared_frame",
+            "profiling",
+        ),
+        f"bootstrap={args.bootstrap}",
+    )
+
+    stages = [
+        Stage("load_performance", load_performance, (), ("df_perf",), True),
+        Stage("load_abandonment", load_abandonment, (), ("df_aband",), True),
+        Stage("exercise_1", run_exercise_1, ("df_perf", "df_aband")),
+        Stage(
+            "transform_performance", transform_performance, ("df_perf",), ("df_perf_g",)
+        ),
+        Stage(
+            "transform_abandonment",
+            transform_abandonment,
+            ("df_aband",),
+            ("df_aband_g",),
+        ),
+        Stage(
+            "exercise_3",
+            partial(run_exercise_3, force_render=args.force_render),
+            ("merged",),
+        ),
+    ]
+    # The stages that start process pools (the per-year map and the
+    # bootstrap) run in the main thread while no other stage runs
+    if args.partition_by_year:
+        stages += [
+            Stage(
+                "exercise_2",
+                partial(run_exercise_2_by_year, max_workers=args.workers),
+                ("df_perf", "df_aband"),
+                ("merged", "statistics"),
+                main_thread=True,
+            ),
+            Stage(
+                "exercise_4",
+                partial(run_exercise_4, n_bootstrap=args.bootstrap),
+                ("merged", "statistics"),
+                main_thread=args.bootstrap > 0,
+            ),
+        ]
+    else:
+        stages += [
+            Stage(
+                "exercise_2",
+                run_exercise_2,
+                ("df_perf_g", "df_aband_g"),
+                ("merged",),
+            ),
+            Stage(
+                "exercise_4",
+                partial(run_exercise_4, n_bootstrap=args.bootstrap),
+                ("merged",),
+                main_thread=args.bootstrap > 0,
+            ),
+        ]
+    # Files a stage writes; its cached result is stale if they are missing
+    files = {
+        "exercise_3": [os.path.join(SRC_DIR, "img", f"evolucio_{STUDENT_NAME}.png")],
+        "exercise_4": [os.path.join(REPORT_DIR, "analisi_estadistic.json")],
+    }
+    return Pipeline(
+        dataclasses.replace(
+            stage,
+            func=partial(
+                store.run,
+                stage.name,
+                keys[stage.name],
+                stage.func,
+                outputs=files.get(stage.name, []),
+            ),
+        )
+        for stage in stages
+    )
+
+
+def run_profiled(pipeline, targets, dump_stats=False):
+    """
+    Run the pipeline one stage at a time, timing every stage and analysis
+    function, and save the timings to `src/report/profile.json`. The
+    pipeline's store should force every stage, so the timings cover the
+    stage work rather than artifact loads.
+    Args:
+        pipeline (scheduler.Pipeline): Pipeline to run.
+        targets (list): Names of the stages to run.
+        dump_stats (bool): Also dump a cProfile file per stage under
+            `src/report/profile/`.
+    """
+    profiler = modules.profiling.Profiler(
+        os.path.join(REPORT_DIR, "profile") if dump_stats else None
+    )
+    pipeline = Pipeline(
+        dataclasses.replace(stage, func=profiler.wrap_stage(stage.name, stage.func))
+        for stage in pipeline.stages.values()
+    )
+    # tracemalloc only sees this process, and timings must not overlap
+    with profiler:
+        pipeline.run(targets, max_workers=1)
+    output_path = os.path.join(REPORT_DIR, "profile.json")
+    profiler.save(
+        output_path,
+        fecha=datetime.now().isoformat(timespec="seconds"),
+        argv=sys.argv[1:],
+    )
+    print(f"\nProfile saved to {output_path}")
 
 
 def main():
@@ -92,6 +347,7 @@ def main():
             "\nExamples:\n"
             "  python main.py         # Run all exercises (1-4)\n"
             "  python main.py -ex 2  # Run exercises 1 and 2 only\n"
+            "  python main.py --from-stage 3  # Redo plots and report only\n"
             "  python main.py --help # Show this help message\n"
             "\nExercises:\n"
             "  1: Load datasets and show EDA\n"
@@ -110,18 +366,84 @@ def main():
             "For example, -ex 2 runs only exercises 1 and 2."
         ),
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rerun every exercise, ignoring cached stage artifacts.",
+    )
+    parser.add_argument(
+        "--from-stage",
+        type=int,
+        metavar="N",
+        help="Rerun exercise N and later ones even if their inputs are unchanged.",
+    )
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Add bootstrap confidence intervals with N resamples to the report.",
+    )
+    parser.add_argument(
+        "--force-render",
+        action="store_true",
+        help="Redraw the figures even if their render cache says they are current.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help=(
+            "Run up to N independent stages at once (default: CPU count). "
+            "With 1, stages run one after the other."
+        ),
+    )
+    parser.add_argument(
+        "--partition-by-year",
+        action="store_true",
+        help=(
+            "Run exercise 2 and the exercise 4 statistics as a map-reduce "
+            "over academic years in a process pool. The merged dataset is "
+            "the same, but the report's statistics match the serial ones "
+            "only up to floating-point rounding."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Run every stage, ignoring cached stage artifacts, one at a time "
+            "and save the wall time, CPU time and peak memory of each stage "
+            "and analysis function to src/report/profile.json."
+        ),
+    )
+    parser.add_argument(
+        "--profile-dump",
+        action="store_true",
+        help="With --profile, also save a cProfile file per stage.",
+    )
     args = parser.parse_args()
 
-    # Always run progressively from 1 to N
-    df_perf, df_aband, merged = None, None, None
-    if args.ex >= 1:
-        df_perf, df_aband = run_exercise_1()
-    if args.ex >= 2:
-        merged = run_exercise_2(df_perf, df_aband)
-    if args.ex >= 3:
-        run_exercise_3(merged)
-    if args.ex >= 4:
-        run_exercise_4(merged)
+    # Each stage is keyed by its inputs and code, so unchanged stages are reused
+    first_forced = 1 if args.force else args.from_stage or args.ex + 1
+    forced = [
+        stage
+        for n in range(first_forced, args.ex + 1)
+        for stage in EXERCISE_STAGES.get(n, [])
+    ]
+    if args.force_render:
+        forced.append("exercise_3")
+    if args.profile:
+        # Profile the stage work itself rather than artifact loads
+        forced = [stage for stages in EXERCISE_STAGES.values() for stage in stages]
+    store = artifacts.ArtifactStore(force=forced)
+    # Running exercise N means running exercises 1 to N
+    targets = [EXERCISE_STAGES[n][-1] for n in range(1, min(args.ex, 4) + 1)]
+    pipeline = build_pipeline(store, args)
+    if args.profile:
+        run_profiled(pipeline, targets, dump_stats=args.profile_dump)
+    else:
+        pipeline.run(targets, max_workers=args.workers)
 
 
 if __name__ == "__main__":
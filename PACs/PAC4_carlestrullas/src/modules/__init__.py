@@ -0,0 +1,40 @@
+"""Analysis modules for PAC4 - Student Performance in Catalonia.
+
+Submodules are imported lazily on first attribute access, so ``src.main`` can
+start (and print ``--help``) without importing pandas, matplotlib or scipy.
+Only the exercises that actually run pay for their dependencies.
+"""
+
+import importlib
+
+__all__ = [
+    "artifacts",
+    "data_cube",
+    "eda",
+    "indexed_dataset",
+    "load_data",
+    "partitioned",
+    "profiling",
+    "scheduler",
+    "shared_frame",
+    "statistical_analysis",
+    "transform_data",
+    "visual_analysis",
+]
+
+
+def __getattr__(name: str):
+    """Import the submodule ``name`` on first access.
+
+    Args:
+        name: Attribute requested on the package.
+
+    Returns:
+        The imported submodule.
+
+    Raises:
+        AttributeError: If ``name`` is not a known submodule.
+    """
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,219 @@
+"""Content-addressed stage artifacts for the PAC4 pipeline.
+
+Each pipeline stage is identified by a key derived from the contents of its
+inputs (data files or upstream stage keys) and the source code it runs. The
+stage result is pickled under `src/artifacts/` with what the stage printed,
+so a rerun whose key is unchanged can reuse it and show the same output
+instead of recomputing the stage.
+"""
+
+import glob
+import hashlib
+import io
+import os
+import pickle
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Collection, Iterable, Iterator, Optional
+
+SRC_DIR = os.path.dirname(os.path.dirname(__file__))
+MODULES_DIR = os.path.dirname(__file__)
+ARTIFACT_DIR = os.path.join(SRC_DIR, "artifacts")
+# Guards swapping sys.stdout while stages run on several threads
+_STDOUT_LOCK = threading.Lock()
+
+
+def file_digest(path: str) -> str:
+    """Return the SHA-256 digest of a file's contents.
+
+    Args:
+        path: File to hash.
+
+    Returns:
+        The hexadecimal digest.
+
+    Raises:
+        FileNotFoundError: If ``path`` does not exist.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_version(*module_names: str) -> str:
+    """Fingerprint the source of the given analysis modules.
+
+    Files are hashed rather than imported, so computing a key never pulls in
+    the modules' heavy dependencies.
+
+    Args:
+        *module_names: Module names inside `src/modules/` (e.g.
+            ``"transform_data"``), or ``"main"`` for `src/main.py`.
+
+    Returns:
+        A digest that changes whenever any of the sources changes, including
+        this module, which defines the artifact format.
+    """
+    parts = [file_digest(__file__)]
+    for name in module_names:
+        if name == "main":
+            path = os.path.join(SRC_DIR, "main.py")
+        else:
+            path = os.path.join(MODULES_DIR, f"{name}.py")
+        parts.append(file_digest(path))
+    return stage_key("code", *parts)
+
+
+def stage_key(stage: str, *parts: str) -> str:
+    """Combine a stage name and its input fingerprints into a key.
+
+    Args:
+        stage: Stage name.
+        *parts: Fingerprints of the stage inputs: file digests, upstream stage
+            keys, :func:`code_version` values or parameters.
+
+    Returns:
+        A short hexadecimal key.
+    """
+    digest = hashlib.sha256(stage.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\0")
+        digest.update(part.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class ArtifactStore:
+    """Persist and reuse stage results keyed by content hash.
+
+    Args:
+        root: Directory holding the pickled artifacts. Defaults to
+            ``ARTIFACT_DIR``.
+        force: Stage names to rerun even if an up-to-date artifact exists.
+    """
+
+    def __init__(self, root: Optional[str] = None, force: Collection[str] = ()):
+        self.root = root if root is not None else ARTIFACT_DIR
+        self.force = set(force)
+
+    def path(self, stage: str, key: str) -> str:
+        """Return the artifact file for ``stage`` at ``key``.
+
+        Args:
+            stage: Stage name.
+            key: Stage key from :func:`stage_key`.
+
+        Returns:
+            The artifact path.
+        """
+        return os.path.join(self.root, f"{stage}.{key}.pkl")
+
+    def run(
+        self,
+        stage: str,
+        key: str,
+        func: Callable[..., Any],
+        *args: Any,
+        outputs: Iterable[str] = (),
+    ) -> Any:
+        """Return the cached result of a stage, or run and cache it.
+
+        Args:
+            stage: Stage name.
+            key: Stage key from :func:`stage_key`.
+            func: Callable computing the stage result.
+            *args: Positional arguments for ``func``.
+            outputs: Files the stage writes; the cached artifact is only
+                reused if all of them still exist.
+
+        Returns:
+            The stage result, either loaded from disk or freshly computed. A
+            reused result is preceded by what the stage printed when it ran.
+        """
+        path = self.path(stage, key)
+        fresh = os.path.exists(path) and all(os.path.exists(o) for o in outputs)
+        if fresh and stage not in self.force:
+            print(f"\n{stage}: inputs unchanged, reusing artifact {key}")
+            with open(path, "rb") as f:
+                result, printed = pickle.load(f)
+            sys.stdout.write(printed)
+            return result
+
+        with _recorded_stdout() as buffer:
+            result = func(*args)
+        for stale in glob.glob(os.path.join(self.root, f"{glob.escape(stage)}.*")):
+            os.remove(stale)
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(
+                (result, buffer.getvalue()), f, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(tmp_path, path)
+        return result
+
+    def clear(self) -> int:
+        """Remove every stored artifact.
+
+        Returns:
+            The number of artifacts removed.
+        """
+        removed = 0
+        for path in glob.glob(os.path.join(self.root, "*.pkl")):
+            os.remove(path)
+            removed += 1
+        return removed
+
+
+class _Recorder(io.TextIOBase):
+    """Stand-in for ``sys.stdout`` that also copies what recording threads print.
+
+    Args:
+        stream: Stream every write is passed on to.
+    """
+
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+        self.local = threading.local()
+        self.users = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self.local, "buffer", None)
+        if buffer is not None:
+            buffer.write(text)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+@contextmanager
+def _recorded_stdout() -> Iterator[io.StringIO]:
+    """Copy what the calling thread prints while still printing it.
+
+    Stages running at once on other threads share one :class:`_Recorder`,
+    which is removed when the last of them finishes.
+
+    Yields:
+        The buffer receiving the calling thread's output.
+    """
+    with _STDOUT_LOCK:
+        recorder = sys.stdout
+        if not isinstance(recorder, _Recorder):
+            recorder = sys.stdout = _Recorder(sys.stdout)
+        recorder.users += 1
+    buffer = recorder.local.buffer = io.StringIO()
+    try:
+        yield buffer
+    finally:
+        recorder.local.buffer = None
+        with _STDOUT_LOCK:
+            recorder.users -= 1
+            if not recorder.users and sys.stdout is recorder:
+                sys.stdout = recorder.stream
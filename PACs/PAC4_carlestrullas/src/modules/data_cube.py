@@ -0,0 +1,255 @@
+"""Precomputed aggregates over the merge dimensions.
+
+A :class:`DataCube` stores the sum, count and sum of squares of each measure
+for every combination of dimension values (the base cuboid, computed in one
+grouped pass over the rows) and for rollups over subsets of the dimensions.
+Means and standard deviations for any slice are then answered from those
+aggregates without rescanning the rows.
+"""
+
+import itertools
+import pickle
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.modules.transform_data import GROUP_COLS
+
+MEASURES = ["Abandonament mitjà (%)", "Rendiment mitjà (%)"]
+
+
+class DataCube:
+    """Sum/count/sum-of-squares aggregates for combinations of dimensions.
+
+    Build it with :meth:`build`; the constructor takes precomputed cuboids.
+
+    Args:
+        dimensions: Dimension columns, in canonical order.
+        measures: Numeric columns aggregated by the cube.
+        cuboids: Aggregates per dimension subset, keyed by the subset as a
+            tuple in canonical order. Each frame is indexed by the subset's
+            dimensions and has ``(measure, aggregate)`` columns.
+    """
+
+    def __init__(
+        self,
+        dimensions: Sequence[str],
+        measures: Sequence[str],
+        cuboids: Dict[Tuple[str, ...], pd.DataFrame],
+    ):
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        self.cuboids = cuboids
+
+    @classmethod
+    def build(
+        cls,
+        df: pd.DataFrame,
+        dimensions: Optional[Sequence[str]] = None,
+        measures: Optional[Sequence[str]] = None,
+        cuboids: Optional[Iterable[Sequence[str]]] = None,
+    ) -> "DataCube":
+        """Aggregate a dataset into a cube.
+
+        The base cuboid over all ``dimensions`` is computed in a single
+        groupby over the rows. Every other cuboid is rolled up from the
+        smallest already computed cuboid that contains its dimensions, so the
+        rows are scanned only once.
+
+        Args:
+            df: Dataset with the dimension and measure columns, e.g. the
+                merged dataset from exercise 2.
+            dimensions: Dimension columns. Defaults to the seven merge
+                dimensions (``GROUP_COLS``).
+            measures: Numeric columns to aggregate. Defaults to the dropout
+                and performance rates (``MEASURES``).
+            cuboids: Dimension subsets to precompute besides the base cuboid.
+                Defaults to every subset.
+
+        Returns:
+            The built cube.
+        """
+        dimensions = list(GROUP_COLS if dimensions is None else dimensions)
+        measures = list(MEASURES if measures is None else measures)
+        values = df[measures].astype(np.float64)
+        squares = values**2
+        squares.columns = [f"{m} sq" for m in measures]
+        grouped = pd.concat([df[dimensions], values, squares], axis=1).groupby(
+            dimensions, observed=True, dropna=False, sort=True
+        )
+        # sort_index: categorical keys with dropna=False come back unsorted
+        sums, counts = grouped.sum().sort_index(), grouped.count().sort_index()
+        base = pd.concat(
+            {
+                (measure, aggregate): frame[column]
+                for measure in measures
+                for aggregate, frame, column in (
+                    ("sum", sums, measure),
+                    ("count", counts, measure),
+                    ("sumsq", sums, f"{measure} sq"),
+                )
+            },
+            axis=1,
+        )
+
+        if cuboids is None:
+            subsets = [
+                combo
+                for size in range(len(dimensions))
+                for combo in itertools.combinations(dimensions, size)
+            ]
+        else:
+            subsets = [_canonical(dimensions, subset) for subset in cuboids]
+        built = {tuple(dimensions): base}
+        # Larger subsets first, so each rollup can start from a small parent
+        for subset in sorted(set(subsets), key=len, reverse=True):
+            if subset not in built:
+                built[subset] = _rollup(_smallest_parent(built, subset), subset)
+        return cls(dimensions, measures, built)
+
+    def query(
+        self,
+        by: Sequence[str] = (),
+        where: Optional[Dict[str, object]] = None,
+        measures: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        """Return means, standard deviations and counts for a slice.
+
+        Equivalent to filtering the original rows with ``where``, grouping
+        them by ``by`` and aggregating the measures with ``mean``, ``std``
+        (sample) and ``count``, but computed from the smallest precomputed
+        cuboid covering the requested dimensions.
+
+        Args:
+            by: Dimensions to group by; empty for a single overall row.
+            where: Dimension filters, mapping a dimension to a value or to a
+                list of accepted values.
+            measures: Measures to report. Defaults to all of them.
+
+        Returns:
+            A frame indexed by ``by`` with ``(measure, statistic)`` columns.
+
+        Raises:
+            KeyError: If a dimension or measure is not part of the cube.
+        """
+        where = where or {}
+        measures = self.measures if measures is None else list(measures)
+        unknown = [m for m in measures if m not in self.measures]
+        if unknown:
+            raise KeyError(f"Measures not in the cube: {unknown}")
+        needed = _canonical(self.dimensions, list(by) + list(where))
+        cuboid = _smallest_parent(self.cuboids, needed)
+
+        mask = np.ones(len(cuboid), dtype=bool)
+        for dim, accepted in where.items():
+            if isinstance(accepted, (list, tuple, set)):
+                accepted = list(accepted)
+            else:
+                accepted = [accepted]
+            mask &= cuboid.index.get_level_values(dim).isin(accepted)
+        aggregates = _rollup(cuboid[mask], _canonical(self.dimensions, by))
+        if list(by) != list(aggregates.index.names) and by:
+            aggregates = aggregates.reorder_levels(list(by)).sort_index()
+
+        stats = {}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for measure in measures:
+                total = aggregates[(measure, "sum")]
+                count = aggregates[(measure, "count")]
+                squares = aggregates[(measure, "sumsq")]
+                variance = (squares - total**2 / count) / (count - 1)
+                stats[(measure, "mean")] = (total / count).where(count > 0)
+                stats[(measure, "std")] = np.sqrt(variance.clip(lower=0)).where(
+                    count > 1
+                )
+                stats[(measure, "count")] = count.astype(np.int64)
+        return pd.DataFrame(stats, index=aggregates.index)
+
+    def save(self, path: str) -> None:
+        """Persist the cube.
+
+        Args:
+            path: Destination file.
+        """
+        with open(path, "wb") as f:
+            pickle.dump(
+                {
+                    "dimensions": self.dimensions,
+                    "measures": self.measures,
+                    "cuboids": self.cuboids,
+                },
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "DataCube":
+        """Restore a cube saved with :meth:`save`.
+
+        Args:
+            path: File written by :meth:`save`.
+
+        Returns:
+            The restored cube.
+        """
+        with open(path, "rb") as f:
+            saved = pickle.load(f)
+        return cls(saved["dimensions"], saved["measures"], saved["cuboids"])
+
+
+def _canonical(dimensions: List[str], subset: Iterable[str]) -> Tuple[str, ...]:
+    """Return ``subset`` as a tuple in the cube's dimension order.
+
+    Args:
+        dimensions: Cube dimensions in canonical order.
+        subset: Dimension names.
+
+    Returns:
+        The distinct names of ``subset``, ordered as in ``dimensions``.
+
+    Raises:
+        KeyError: If a name is not a cube dimension.
+    """
+    subset = set(subset)
+    unknown = subset.difference(dimensions)
+    if unknown:
+        raise KeyError(f"Dimensions not in the cube: {sorted(unknown)}")
+    return tuple(dim for dim in dimensions if dim in subset)
+
+
+def _smallest_parent(
+    cuboids: Dict[Tuple[str, ...], pd.DataFrame], subset: Tuple[str, ...]
+) -> pd.DataFrame:
+    """Return the cuboid with the fewest rows that covers ``subset``.
+
+    Args:
+        cuboids: Available cuboids.
+        subset: Required dimensions.
+
+    Returns:
+        The smallest cuboid whose dimensions include ``subset``.
+    """
+    parents = [frame for dims, frame in cuboids.items() if set(subset).issubset(dims)]
+    return min(parents, key=len)
+
+
+def _rollup(cuboid: pd.DataFrame, subset: Tuple[str, ...]) -> pd.DataFrame:
+    """Aggregate a cuboid up to fewer dimensions.
+
+    Args:
+        cuboid: Cuboid indexed by a superset of ``subset``.
+        subset: Dimensions to keep, in canonical order.
+
+    Returns:
+        The cuboid indexed by ``subset``; a single row when it is empty.
+    """
+    if not subset:
+        return cuboid.sum().to_frame().T
+    if list(subset) == list(cuboid.index.names):
+        return cuboid
+    return (
+        cuboid.groupby(level=list(subset), observed=True, dropna=False, sort=True)
+        .sum()
+        .sort_index()
+    )
@@ -1,23 +1,86 @@
 """Exploratory Data Analysis utilities for PAC4.
 
 Simple helpers to quickly inspect a dataset by printing a preview, columns, and
-info to standard output.
+info to standard output, plus :func:`profile_dataset`, which computes
+per-column statistics in one vectorized pass per dtype group.
 """
 
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
 import pandas as pd
 
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+@dataclass
+class DatasetProfile:
+    """Per-column statistics of a dataset.
+
+    Attributes:
+        n_rows: Number of rows in the profiled dataset.
+        n_profiled: Number of rows the statistics were computed on; smaller
+            than ``n_rows`` when sampling was used.
+        numeric: One row per numeric column with ``dtype``, ``count``,
+            ``nulls``, ``unique``, ``mean``, ``std``, ``min``, the quantile
+            columns (e.g. ``"50%"``) and ``max``.
+        categorical: One row per non-numeric column with ``dtype``,
+            ``count``, ``nulls``, ``unique`` and ``top``, a list of
+            ``(value, count)`` pairs for the most frequent values.
+    """
+
+    n_rows: int
+    n_profiled: int
+    numeric: pd.DataFrame
+    categorical: pd.DataFrame
+
+    @property
+    def sampled(self) -> bool:
+        """Whether the statistics were computed on a sample."""
+        return self.n_profiled < self.n_rows
+
+    def to_dict(self) -> dict:
+        """Return the profile as plain Python containers.
+
+        Returns:
+            A dict with the row counts and one entry per column.
+        """
+        columns = {}
+        for frame in (self.numeric, self.categorical):
+            for col, stats in frame.iterrows():
+                columns[col] = {
+                    k: v.item() if isinstance(v, np.generic) else v
+                    for k, v in stats.items()
+                }
+        return {
+            "n_rows": self.n_rows,
+            "n_profiled": self.n_profiled,
+            "columns": columns,
+        }
 
-def show_eda(df: pd.DataFrame) -> None:
+    def __str__(self) -> str:
+        lines = [f"Rows: {self.n_rows}"]
+        if self.sampled:
+            lines[0] += f" (profiled on a sample of {self.n_profiled})"
+        if not self.numeric.empty:
+            lines += ["", "Numeric columns:", self.numeric.to_string()]
+        if not self.categorical.empty:
+            lines += ["", "Categorical columns:", self.categorical.to_string()]
+        return "\n".join(lines)
+
+
+def show_eda(df: pd.DataFrame) -> DatasetProfile:
     """Display a basic EDA for the given DataFrame.
 
-    Prints the head, the list of columns, and the result of ``DataFrame.info``
-    to standard output.
+    Prints the head, the list of columns, the result of ``DataFrame.info``
+    and the column profile from :func:`profile_dataset` to standard output.
 
     Args:
         df: DataFrame to analyze.
 
     Returns:
-        None. Information is printed to stdout.
+        The :class:`DatasetProfile` that was printed.
     """
     print("\nFirst 5 rows:")
     print(df.head())
@@ -25,3 +88,128 @@ def show_eda(df: pd.DataFrame) -> None:
     print(df.columns.tolist())
     print("\nInfo:")
     df.info()
+    profile = profile_dataset(df)
+    print("\nProfile:")
+    print(profile)
+    return profile
+
+
+def profile_dataset(
+    df: pd.DataFrame,
+    top_k: int = 5,
+    quantiles: Sequence[float] = QUANTILES,
+    sample_size: Optional[int] = None,
+    seed: int = 0,
+) -> DatasetProfile:
+    """Compute per-column statistics in one pass per dtype group.
+
+    Numeric columns are stacked into a single float array and sorted once per
+    column; null counts, cardinality, min/max, quantiles, mean and std are all
+    derived from that array. Other columns are factorized once each, and
+    their null counts, cardinality and top values come from the codes.
+
+    Args:
+        df: DataFrame to profile.
+        top_k: Number of most frequent values reported per non-numeric
+            column.
+        quantiles: Quantiles to report for numeric columns (linear
+            interpolation, as in ``DataFrame.quantile``).
+        sample_size: If set and smaller than ``len(df)``, profile a random
+            sample of this many rows instead of the full frame.
+        seed: Random seed for the sample, so profiles are reproducible.
+
+    Returns:
+        A :class:`DatasetProfile` with the statistics.
+    """
+    n_rows = len(df)
+    if sample_size is not None and sample_size < n_rows:
+        df = df.sample(n=sample_size, random_state=seed)
+    numeric_cols = [
+        col
+        for col, dtype in df.dtypes.items()
+        if pd.api.types.is_numeric_dtype(dtype)
+        and not pd.api.types.is_bool_dtype(dtype)
+    ]
+    other_cols = [col for col in df.columns if col not in numeric_cols]
+    return DatasetProfile(
+        n_rows=n_rows,
+        n_profiled=len(df),
+        numeric=_profile_numeric(df[numeric_cols], quantiles),
+        categorical=_profile_categorical(df[other_cols], top_k),
+    )
+
+
+def _profile_numeric(df: pd.DataFrame, quantiles: Sequence[float]) -> pd.DataFrame:
+    """Profile numeric columns from one sorted float array.
+
+    Args:
+        df: Numeric columns to profile.
+        quantiles: Quantiles to report.
+
+    Returns:
+        One row of statistics per column.
+    """
+    values = df.to_numpy(dtype=np.float64, na_value=np.nan)
+    n_total = values.shape[0]
+    count = n_total - np.isnan(values).sum(axis=0)
+    # NaNs sort to the end, so the first ``count`` entries hold the values; a
+    # row of NaNs keeps the indexing below valid for empty frames
+    ordered = np.sort(np.vstack([values, np.full((1, values.shape[1]), np.nan)]), 0)
+    cols = np.arange(values.shape[1])
+    last = np.maximum(count - 1, 0)
+    # Compare rather than subtract neighbours, since inf - inf is NaN
+    changes = ordered[1:] != ordered[:-1]
+    in_range = np.arange(changes.shape[0])[:, None] < last
+
+    stats = {
+        "dtype": df.dtypes.astype(str).to_numpy(),
+        "count": count,
+        "nulls": n_total - count,
+        "unique": (changes & in_range).sum(axis=0) + (count > 0),
+    }
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(values, axis=0) / count
+        stats["mean"] = mean
+        squares = np.nansum((values - mean) ** 2, axis=0)
+        stats["std"] = np.where(count > 1, np.sqrt(squares / (count - 1)), np.nan)
+    stats["min"] = ordered[0, cols]
+    for q in quantiles:
+        pos = q * last
+        lo = np.floor(pos).astype(int)
+        lower, upper = ordered[lo, cols], ordered[np.minimum(lo + 1, last), cols]
+        stats[f"{q:.0%}"] = lower + (upper - lower) * (pos - lo)
+    stats["max"] = ordered[last, cols]
+    return pd.DataFrame(stats, index=df.columns)
+
+
+def _profile_categorical(df: pd.DataFrame, top_k: int) -> pd.DataFrame:
+    """Profile non-numeric columns from their factorized codes.
+
+    Args:
+        df: Non-numeric columns to profile.
+        top_k: Number of most frequent values to report.
+
+    Returns:
+        One row of statistics per column.
+    """
+    rows = []
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        order = np.argsort(-counts, kind="stable")[:top_k]
+        rows.append(
+            {
+                "dtype": str(series.dtype),
+                "count": int(counts.sum()),
+                "nulls": int((codes < 0).sum()),
+                "unique": int((counts > 0).sum()),
+                "top": [(uniques[i], int(counts[i])) for i in order if counts[i]],
+            }
+        )
+    return pd.DataFrame(
+        rows, index=df.columns, columns=["dtype", "count", "nulls", "unique", "top"]
+    )
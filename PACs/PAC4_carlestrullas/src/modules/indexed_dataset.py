@@ -0,0 +1,177 @@
+"""Branch/year index over the merged dataset.
+
+:class:`IndexedDataset` sorts the rows once by ``Branca`` and ``Curs
+Acadèmic`` and keeps the offsets where every branch, and every year within a
+branch, starts. Selecting a branch or a branch-year is then a slice of the
+sorted frame instead of a boolean mask scan over every row.
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+BRANCH_COL = "Branca"
+YEAR_COL = "Curs Acadèmic"
+
+
+class IndexedDataset:
+    """Rows sorted by branch and year, with O(1) slices per group.
+
+    Branches and years are ordered as ``groupby`` sorts them. The sort is
+    stable, so rows of the same branch and year keep their original order,
+    and it is skipped when the rows are already in order. Rows with a missing
+    year come after the other rows of their branch, and rows with a missing
+    branch come last; neither belongs to any branch-year slice, and rows with
+    a missing branch belong to no branch slice.
+
+    Args:
+        df: Dataset with the ``Branca`` and ``Curs Acadèmic`` columns.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        branch_codes, self.branches = pd.factorize(df[BRANCH_COL], sort=True)
+        year_codes, self.years = pd.factorize(df[YEAR_COL], sort=True)
+        n_branches, n_years = len(self.branches), len(self.years)
+        branch_codes[branch_codes < 0] = n_branches
+        year_codes[year_codes < 0] = n_years
+        # One slot per (branch, year) pair plus one per branch for missing years
+        key = branch_codes.astype(np.int64) * (n_years + 1) + year_codes
+
+        if (key[1:] >= key[:-1]).all():
+            order = np.arange(len(key))
+            self.frame = df.reset_index(drop=True)
+            self._input_rows: Optional[np.ndarray] = None
+        else:
+            order = np.argsort(key, kind="stable")
+            self.frame = df.take(order).reset_index(drop=True)
+            # Input position of each row of ``frame``
+            self._input_rows = order
+        self.pair_bounds = np.searchsorted(
+            key[order], np.arange(n_branches * (n_years + 1) + 1)
+        )
+        self.branch_bounds = self.pair_bounds[:: n_years + 1]
+
+        first_rows = np.full(n_branches + 1, len(key))
+        np.minimum.at(first_rows, branch_codes, np.arange(len(key)))
+        # Positions in ``branches`` in order of first appearance in the rows
+        self.appearance_order = np.argsort(first_rows[:n_branches], kind="stable")
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def branch_slice(self, branch) -> slice:
+        """Return the rows of ``branch`` as a slice of ``frame``.
+
+        Args:
+            branch: Branch label.
+
+        Returns:
+            The positional slice.
+
+        Raises:
+            KeyError: If the branch does not occur in the data.
+        """
+        i = self.branches.get_loc(branch)
+        return slice(self.branch_bounds[i], self.branch_bounds[i + 1])
+
+    def branch(self, branch) -> pd.DataFrame:
+        """Return the rows of one branch.
+
+        Args:
+            branch: Branch label.
+
+        Returns:
+            The branch's rows, sorted by year.
+        """
+        return self.frame.iloc[self.branch_slice(branch)]
+
+    def branch_year(self, branch, year) -> pd.DataFrame:
+        """Return the rows of one branch in one academic year.
+
+        Args:
+            branch: Branch label.
+            year: Academic year label.
+
+        Returns:
+            The matching rows; empty if the branch has no rows that year.
+
+        Raises:
+            KeyError: If the branch or year does not occur in the data.
+        """
+        branch_pos = self.branches.get_loc(branch)
+        pair = branch_pos * (len(self.years) + 1) + self.years.get_loc(year)
+        return self.frame.iloc[self.pair_bounds[pair] : self.pair_bounds[pair + 1]]
+
+    def values(self, column: str) -> np.ndarray:
+        """Return a numeric column, in sorted order, as ``float64``.
+
+        Args:
+            column: Column name.
+
+        Returns:
+            The values; slicing them with :meth:`branch_slice` gives a view.
+        """
+        return self.frame[column].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def branch_values(self, column: str) -> np.ndarray:
+        """Return a numeric column grouped by branch, rows in input order.
+
+        The branches occupy the same slices as in :meth:`values`, but the
+        rows of each branch keep their input order instead of being sorted
+        by year. Reductions over a slice then add the values in the same
+        order as on the unsorted rows, e.g. a per-branch ``Series.mean``.
+
+        Args:
+            column: Column name.
+
+        Returns:
+            The values as ``float64``; a view of :meth:`values` if the input
+            rows were already sorted.
+        """
+        values = self.values(column)
+        if self._input_rows is None:
+            return values
+        n_rows = len(self.frame)
+        sizes = np.diff(np.append(self.branch_bounds, n_rows))
+        branch_of_row = np.repeat(np.arange(len(sizes), dtype=np.int64), sizes)
+        return values[np.argsort(branch_of_row * n_rows + self._input_rows)]
+
+    def yearly_means(self, columns: Sequence[str]) -> "IndexedDataset":
+        """Average columns per branch and year in one pass over the slices.
+
+        Equivalent to ``groupby(["Branca", "Curs Acadèmic"]).mean()`` on the
+        columns (missing values skipped, groups without a branch or year
+        left out), up to floating-point rounding.
+
+        Args:
+            columns: Numeric columns to average.
+
+        Returns:
+            An indexed dataset with one row per observed branch and year.
+        """
+        n_years = len(self.years)
+        n_valid = self.branch_bounds[-1]
+        starts, stops = self.pair_bounds[:-1], self.pair_bounds[1:]
+        nonempty = np.flatnonzero(stops > starts)
+        # Every valid row lies in exactly one non-empty pair, in order, so the
+        # pairs' starts delimit reduceat segments over the valid rows
+        segments = np.append(starts[nonempty], n_valid)
+        keep = nonempty % (n_years + 1) < n_years
+
+        result: Dict[str, object] = {
+            BRANCH_COL: self.branches.take(nonempty[keep] // (n_years + 1)),
+            YEAR_COL: self.years.take(nonempty[keep] % (n_years + 1)),
+        }
+        for column in columns:
+            values = self.values(column)[:n_valid]
+            missing = np.isnan(values)
+            sums = np.add.reduceat(
+                np.append(np.where(missing, 0.0, values), 0.0), segments
+            )
+            counts = np.add.reduceat(
+                np.append(~missing, False).astype(np.int64), segments
+            )
+            with np.errstate(invalid="ignore", divide="ignore"):
+                result[column] = (sums[:-1] / counts[:-1])[keep]
+        return IndexedDataset(pd.DataFrame(result))
@@ -3,15 +3,50 @@
 This module provides helpers to load the official PAC4 datasets either by
 passing an explicit path or by interactively selecting one of the known files
 bundled under the project `data/` folder.
+
+Parsed workbooks can optionally be cached as Feather files under
+`data/.cache/`, so later loads skip the (slow) Excel parse. Workbooks too large
+for memory can be streamed in fixed-size chunks with :func:`iter_dataset`, and
+loaded frames can be shrunk with :func:`optimize_dtypes`. Several workbooks
+(or sheets) can be parsed in parallel with :func:`load_datasets`.
 """
 
+import glob
+import hashlib
 import os
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
+from openpyxl import load_workbook
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+
+# Dimension columns (both raw and harmonized names) used as group/merge keys
+CATEGORICAL_COLUMNS = [
+    "Curs Acadèmic",
+    "Tipus universitat",
+    "Naturalesa universitat responsable",
+    "Sigles",
+    "Tipus Estudi",
+    "Branca",
+    "Sexe",
+    "Sexe Alumne",
+    "Integrat S/N",
+    "Tipus de centre",
+]
 
 
-def load_dataset(filepath: Optional[str] = None) -> pd.DataFrame:
+def load_dataset(
+    filepath: Optional[str] = None,
+    use_cache: bool = False,
+    optimize: bool = False,
+    sheet_name: Union[str, int] = 0,
+) -> pd.DataFrame:
     """Load a dataset from Excel.
 
     Loads one of the PAC4 datasets from an Excel file. If ``filepath`` is not
@@ -21,6 +56,11 @@ def load_dataset(filepath: Optional[str] = None) -> pd.DataFrame:
     Args:
         filepath: Absolute or relative path to the Excel dataset. If ``None``,
             the user is prompted to select a known dataset.
+        use_cache: If ``True``, read the parsed frame from the Feather cache
+            when the workbook is unchanged, and populate the cache otherwise.
+        optimize: If ``True``, convert the dimension columns to categoricals
+            and downcast numeric columns with :func:`optimize_dtypes`.
+        sheet_name: Sheet name or zero-based index to read.
 
     Returns:
         A pandas DataFrame with the loaded dataset.
@@ -31,8 +71,6 @@ def load_dataset(filepath: Optional[str] = None) -> pd.DataFrame:
         xlrd.XLRDError, openpyxl.utils.exceptions.InvalidFileException: If the
             Excel file is invalid or cannot be parsed by the engine.
     """
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    data_dir = os.path.join(project_root, "data")
     datasets = {
         "1": ("rendiment_estudiants.xlsx", "Performance rate dataset"),
         "2": ("taxa_abandonament.xlsx", "Dropout rate dataset"),
@@ -44,10 +82,315 @@ def load_dataset(filepath: Optional[str] = None) -> pd.DataFrame:
         choice = input("Enter 1 or 2: ").strip()
         while choice not in datasets:
             choice = input("Invalid option. Enter 1 or 2: ").strip()
-        filepath = os.path.join(data_dir, datasets[choice][0])
+        filepath = os.path.join(DATA_DIR, datasets[choice][0])
     else:
         if not os.path.isabs(filepath):
-            filepath = os.path.join(data_dir, filepath)
+            filepath = os.path.join(DATA_DIR, filepath)
     print(f"Loading file: {filepath}")
-    df = pd.read_excel(filepath)
+    if use_cache:
+        df = _load_cached(filepath, sheet_name)
+    else:
+        df = pd.read_excel(filepath, sheet_name=sheet_name)
+    if optimize:
+        optimized = optimize_dtypes(df)
+        before = df.memory_usage(deep=True).sum() / 1e6
+        after = optimized.memory_usage(deep=True).sum() / 1e6
+        print(f"Memory usage: {before:.2f} MB -> {after:.2f} MB")
+        df = optimized
     return df
+
+
+def load_datasets(
+    sources: Sequence[Union[str, Tuple[str, Union[str, int]]]],
+    max_workers: Optional[int] = None,
+    use_cache: bool = False,
+    optimize: bool = False,
+) -> List[pd.DataFrame]:
+    """Load several datasets in parallel.
+
+    Each source is parsed by :func:`load_dataset` in its own worker process,
+    since the openpyxl parse is CPU-bound and sources share no state.
+
+    Args:
+        sources: Paths to Excel datasets, or ``(path, sheet_name)`` tuples to
+            read several sheets of the same workbook. Relative paths are
+            resolved under the project `data/` folder.
+        max_workers: Maximum number of worker processes. Defaults to one per
+            source, capped at the CPU count. With a single worker, sources are
+            loaded sequentially in the current process.
+        use_cache: Forwarded to :func:`load_dataset`.
+        optimize: Forwarded to :func:`load_dataset`.
+
+    Returns:
+        The loaded DataFrames, in the same order as ``sources``.
+
+    Raises:
+        Exception: The first error raised while loading any source, e.g.
+            ``FileNotFoundError`` for a missing workbook.
+    """
+    jobs = [(src, 0) if isinstance(src, str) else tuple(src) for src in sources]
+    load = partial(_load_source, use_cache=use_cache, optimize=optimize)
+    if max_workers is None:
+        max_workers = min(len(jobs), os.cpu_count() or 1)
+    if max_workers <= 1 or len(jobs) <= 1:
+        return [load(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(load, jobs))
+
+
+def _load_source(
+    job: Tuple[str, Union[str, int]], use_cache: bool, optimize: bool
+) -> pd.DataFrame:
+    """Load one ``(path, sheet_name)`` job; picklable worker for the pool.
+
+    Args:
+        job: Path to the Excel dataset and the sheet to read.
+        use_cache: Forwarded to :func:`load_dataset`.
+        optimize: Forwarded to :func:`load_dataset`.
+
+    Returns:
+        The loaded DataFrame.
+    """
+    filepath, sheet_name = job
+    return load_dataset(
+        filepath, use_cache=use_cache, optimize=optimize, sheet_name=sheet_name
+    )
+
+
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Shrink a dataset by using compact dtypes.
+
+    Dimension columns listed in ``CATEGORICAL_COLUMNS`` become pandas
+    categoricals, integer columns are downcast to the smallest integer type,
+    and float columns are downcast to ``float32`` only when every value
+    survives the round trip unchanged, so no precision is lost.
+
+    Args:
+        df: Dataset to optimize. It is not modified.
+
+    Returns:
+        A new DataFrame with optimized dtypes.
+    """
+    optimized = df.copy()
+    for col in optimized.columns:
+        series = optimized[col]
+        if col in CATEGORICAL_COLUMNS:
+            optimized[col] = series.astype("category")
+        elif pd.api.types.is_integer_dtype(series):
+            optimized[col] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series):
+            downcast = series.astype(np.float32)
+            if np.array_equal(
+                downcast.to_numpy(np.float64), series.to_numpy(), equal_nan=True
+            ):
+                optimized[col] = downcast
+    return optimized
+
+
+def memory_report(
+    before: pd.DataFrame, after: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """Report memory usage per column before and after optimization.
+
+    Args:
+        before: Original dataset.
+        after: Optimized dataset. If ``None``, ``optimize_dtypes(before)`` is
+            used.
+
+    Returns:
+        A DataFrame indexed by column name with the dtype and deep memory
+        usage (bytes) before and after, plus the reduction ratio. The last row,
+        ``"Total"``, sums the whole frame.
+    """
+    if after is None:
+        after = optimize_dtypes(before)
+    report = pd.DataFrame(
+        {
+            "dtype_before": before.dtypes.astype(str),
+            "bytes_before": before.memory_usage(deep=True, index=False),
+            "dtype_after": after.dtypes.astype(str),
+            "bytes_after": after.memory_usage(deep=True, index=False),
+        }
+    )
+    report.loc["Total"] = [
+        "",
+        report["bytes_before"].sum(),
+        "",
+        report["bytes_after"].sum(),
+    ]
+    report["ratio"] = report["bytes_after"] / report["bytes_before"]
+    return report
+
+
+def iter_dataset(
+    filepath: str,
+    chunksize: int = 50_000,
+    sheet_name: Optional[Union[str, int]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Stream an Excel dataset as DataFrame chunks.
+
+    Rows are read with openpyxl's read-only, values-only iteration, so at most
+    ``chunksize`` rows are held in memory at a time regardless of the sheet
+    size. The first row is used as the header, and fully empty rows are
+    skipped. Column dtypes are inferred per chunk.
+
+    Args:
+        filepath: Absolute or relative path to the Excel dataset. Relative
+            paths are resolved under the project `data/` folder.
+        chunksize: Maximum number of rows per yielded chunk.
+        sheet_name: Sheet name or zero-based index. If ``None``, the active
+            sheet is read.
+
+    Yields:
+        DataFrames of at most ``chunksize`` rows, in sheet order.
+
+    Raises:
+        ValueError: If ``chunksize`` is not a positive integer.
+        FileNotFoundError: If the resolved path does not exist.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be a positive integer")
+    if not os.path.isabs(filepath):
+        filepath = os.path.join(DATA_DIR, filepath)
+    print(f"Streaming file: {filepath}")
+    workbook = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        if sheet_name is None:
+            sheet = workbook.active
+        elif isinstance(sheet_name, int):
+            sheet = workbook.worksheets[sheet_name]
+        else:
+            sheet = workbook[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = list(header)
+        buffer = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            buffer.append(row)
+            if len(buffer) == chunksize:
+                yield pd.DataFrame.from_records(buffer, columns=columns)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame.from_records(buffer, columns=columns)
+    finally:
+        workbook.close()
+
+
+def clear_cache(filepath: Optional[str] = None) -> int:
+    """Invalidate cached copies of parsed workbooks.
+
+    Args:
+        filepath: Workbook whose cached copies should be removed. Relative
+            paths are resolved under the project `data/` folder. If ``None``,
+            the whole cache is cleared.
+
+    Returns:
+        The number of cache files removed.
+    """
+    if filepath is None:
+        pattern = "*.feather"
+    else:
+        if not os.path.isabs(filepath):
+            filepath = os.path.join(DATA_DIR, filepath)
+        pattern = f"{glob.escape(_cache_stem(filepath))}.*.feather"
+    removed = 0
+    for path in glob.glob(os.path.join(CACHE_DIR, pattern)):
+        os.remove(path)
+        removed += 1
+    return removed
+
+
+def _load_cached(filepath: str, sheet_name: Union[str, int] = 0) -> pd.DataFrame:
+    """Load a sheet of ``filepath`` through the Feather cache.
+
+    Args:
+        filepath: Absolute path to the Excel dataset.
+        sheet_name: Sheet name or zero-based index to read.
+
+    Returns:
+        The parsed DataFrame, read from the cache when possible.
+    """
+    prefix = f"{_cache_stem(filepath)}.{_sheet_tag(sheet_name)}"
+    cache_path = os.path.join(
+        CACHE_DIR, f"{prefix}.{_cache_key(filepath, sheet_name)}.feather"
+    )
+    if os.path.exists(cache_path):
+        return pd.read_feather(cache_path)
+
+    df = pd.read_excel(filepath, sheet_name=sheet_name)
+    # Older entries for this sheet are stale once its key has changed
+    for stale in glob.glob(os.path.join(CACHE_DIR, f"{glob.escape(prefix)}.*")):
+        os.remove(stale)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    df.to_feather(tmp_path)
+    os.replace(tmp_path, cache_path)
+    return df
+
+
+def _cache_stem(filepath: str) -> str:
+    """Return the cache file prefix used for a workbook.
+
+    Args:
+        filepath: Absolute path to the Excel dataset.
+
+    Returns:
+        The workbook file name without extension, followed by a hash of its
+        absolute path, so that workbooks with the same name in different
+        folders get separate cache entries.
+    """
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    path_hash = hashlib.sha256(os.path.abspath(filepath).encode("utf-8"))
+    return f"{name}.{path_hash.hexdigest()[:8]}"
+
+
+def _sheet_tag(sheet_name: Union[str, int]) -> str:
+    """Return a file-name-safe tag identifying a sheet.
+
+    Args:
+        sheet_name: Sheet name or zero-based index.
+
+    Returns:
+        A short tag, e.g. ``"0"`` for the first sheet or a hash of the name.
+    """
+    if isinstance(sheet_name, int):
+        return str(sheet_name)
+    return hashlib.sha256(sheet_name.encode("utf-8")).hexdigest()[:8]
+
+
+def _cache_key(filepath: str, sheet_name: Union[str, int] = 0) -> str:
+    """Compute the cache key for a workbook sheet.
+
+    The key combines the absolute path, sheet, size, modification time and a
+    SHA-256 digest of the file contents, so any change to the workbook
+    invalidates it.
+
+    Args:
+        filepath: Absolute path to the Excel dataset.
+        sheet_name: Sheet name or zero-based index.
+
+    Returns:
+        A short hexadecimal key.
+
+    Raises:
+        FileNotFoundError: If the workbook does not exist.
+    """
+    stat = os.stat(filepath)
+    content = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            content.update(block)
+    key = "|".join(
+        [
+            os.path.abspath(filepath),
+            repr(sheet_name),
+            str(stat.st_size),
+            str(stat.st_mtime_ns),
+            content.hexdigest(),
+        ]
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,206 @@
+"""Opt-in timing and memory instrumentation for the PAC4 pipeline.
+
+While a :class:`Profiler` is active, every pipeline stage it wraps and every
+function decorated with :func:`profiled` records its wall time, CPU time and
+peak traced memory (``tracemalloc``), and each stage can dump a cProfile
+``.prof`` file. With no active profiler a decorated function only reads a
+module-level slot, so the instrumentation costs nothing in normal runs. Only
+the standard library is imported, so the analysis modules can use the
+decorator without slowing down CLI startup.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Profiler recording the current run, if any, under "active"
+_STATE: Dict[str, Optional["Profiler"]] = {"active": None}
+
+
+@dataclass
+class Timing:
+    """Measurements of one stage, or of the calls to one function in a stage.
+
+    Attributes:
+        name: Stage name, or ``module.function`` for functions.
+        stage: Stage the function ran in; ``None`` for stages and for calls
+            outside any stage.
+        calls: Number of calls added up in the timings.
+        wall_s: Elapsed time, in seconds.
+        cpu_s: CPU time of the process, in seconds.
+        peak_kib: Largest traced memory above the level at entry, in KiB.
+    """
+
+    name: str
+    stage: Optional[str]
+    calls: int
+    wall_s: float
+    cpu_s: float
+    peak_kib: float
+
+
+class Profiler:
+    """Record timings of stages and decorated functions.
+
+    Use it as a context manager around the run: entering starts
+    ``tracemalloc`` (unless it is already tracing) and makes the profiler
+    active for :func:`profiled` functions in this process. Measurements must
+    not overlap across threads, so run the stages one at a time.
+
+    Args:
+        prof_dir: If given, dump a cProfile ``<stage>.prof`` file per stage
+            into this folder.
+    """
+
+    def __init__(self, prof_dir: Optional[str] = None):
+        self.prof_dir = prof_dir
+        self.stages: List[Timing] = []
+        self.functions: Dict[tuple, Timing] = {}
+        # [memory at entry, peak so far] of each open measurement
+        self._open: List[List[int]] = []
+        self._stage: Optional[str] = None
+        self.pid = os.getpid()
+        self._started_tracing = False
+
+    def __enter__(self) -> "Profiler":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        _STATE["active"] = self
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _STATE["active"] = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def wrap_stage(self, name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Return ``func`` instrumented as the pipeline stage ``name``.
+
+        Args:
+            name: Stage name.
+            func: Stage function.
+
+        Returns:
+            A callable with the same arguments and result that records a
+            stage timing, and dumps a cProfile file, on every call.
+        """
+
+        @functools.wraps(func)
+        def stage(*args, **kwargs):
+            timing = Timing(name, None, 0, 0.0, 0.0, 0.0)
+            self.stages.append(timing)
+            self._stage = name
+            profile = cProfile.Profile() if self.prof_dir else None
+            try:
+                with self._measure(timing):
+                    if profile is None:
+                        return func(*args, **kwargs)
+                    return profile.runcall(func, *args, **kwargs)
+            finally:
+                self._stage = None
+                if profile is not None:
+                    os.makedirs(self.prof_dir, exist_ok=True)
+                    profile.dump_stats(os.path.join(self.prof_dir, f"{name}.prof"))
+
+        return stage
+
+    def record_call(self, name: str, func: Callable[..., Any], *args, **kwargs):
+        """Call ``func`` and add its measurements to the function ``name``.
+
+        Args:
+            name: Function name in the report.
+            func: Function to call.
+            *args: Positional arguments for ``func``.
+            **kwargs: Keyword arguments for ``func``.
+
+        Returns:
+            The result of ``func``.
+        """
+        key = (self._stage, name)
+        if key not in self.functions:
+            self.functions[key] = Timing(name, self._stage, 0, 0.0, 0.0, 0.0)
+        with self._measure(self.functions[key]):
+            return func(*args, **kwargs)
+
+    def report(self) -> Dict[str, list]:
+        """Return the timings as JSON-serializable data.
+
+        Returns:
+            A dict with a ``stages`` list, in run order, and a ``functions``
+            list, one entry per stage and function in order of first call.
+        """
+        return {
+            "stages": [asdict(timing) for timing in self.stages],
+            "functions": [asdict(timing) for timing in self.functions.values()],
+        }
+
+    def save(self, path: str, **metadata) -> None:
+        """Write :meth:`report` as a JSON file.
+
+        Args:
+            path: Output file; its folder is created if needed.
+            **metadata: Extra top-level entries, e.g. the command line.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**metadata, **self.report()}, f, indent=4, ensure_ascii=False)
+
+    @contextmanager
+    def _measure(self, timing: Timing) -> Iterator[None]:
+        """Add the measurements of the enclosed block to ``timing``.
+
+        Args:
+            timing: Totals updated on exit, even if the block raises: one
+                more call, its wall and CPU time, and the largest peak.
+        """
+        if self._open:
+            outer = self._open[-1]
+            outer[1] = max(outer[1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        self._open.append([current, current])
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            timing.calls += 1
+            timing.wall_s += time.perf_counter() - wall
+            timing.cpu_s += time.process_time() - cpu
+            start, peak = self._open.pop()
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            if self._open:
+                self._open[-1][1] = max(self._open[-1][1], peak)
+            timing.peak_kib = max(timing.peak_kib, (peak - start) / 1024)
+
+
+def profiled(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorate a function so an active :class:`Profiler` measures its calls.
+
+    Calls are reported as ``<module>.<function>``, added up per stage.
+    Calls in other processes than the one that activated the profiler, e.g.
+    pool workers, are not measured.
+
+    Args:
+        func: Function to instrument.
+
+    Returns:
+        The wrapped function.
+    """
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _STATE["active"]
+        if profiler is None or profiler.pid != os.getpid():
+            return func(*args, **kwargs)
+        return profiler.record_call(name, func, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,428 @@
+"""Dependency-graph scheduler for the PAC4 pipeline stages.
+
+Each :class:`Stage` names the values it consumes and the values it produces.
+A :class:`Pipeline` links stages through those names and runs the ones a set
+of targets needs, starting every stage as soon as its inputs exist, so
+independent stages run concurrently on a thread pool (or a process pool, for
+stages marked ``use_process``). While stages run concurrently, each one's
+console output is buffered and printed in :meth:`Pipeline.subgraph` order, so
+it reads as in a sequential run. Only the standard library is imported, so
+the CLI can build its pipeline without loading pandas.
+"""
+
+import io
+import os
+import sys
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import ExitStack, redirect_stdout
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Attribute holding what a failed stage printed before raising
+_OUTPUT_ATTR = "stage_output"
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One step of a pipeline.
+
+    Attributes:
+        name: Unique stage name.
+        func: Callable receiving the values named in ``inputs``, in order.
+        inputs: Names of the values the stage consumes.
+        outputs: Names of the values the stage produces. With several
+            outputs ``func`` returns a tuple with one item per name; with
+            none, its result is discarded.
+        use_process: Run the stage in a worker process instead of a thread,
+            for CPU-bound work that holds the GIL. ``func`` and the input and
+            output values must then be picklable.
+        after: Stages that must run first although they pass no value on.
+        main_thread: Run the stage in the calling thread while no other
+            stage runs. Stages that start a process pool need it: forking
+            while other threads hold locks (pyplot's, for instance) can
+            leave the children deadlocked.
+    """
+
+    name: str
+    func: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    use_process: bool = False
+    after: Tuple[str, ...] = ()
+    main_thread: bool = False
+
+
+class Pipeline:
+    """Stages linked by the values they exchange.
+
+    Args:
+        stages: The stages; their order is the tie-break for run order.
+
+    Raises:
+        ValueError: If two stages share a name or an output, an input is not
+            produced by any stage, a stage runs after an unknown stage, or the
+            stages depend on each other in a cycle.
+    """
+
+    def __init__(self, stages: Iterable[Stage]):
+        self.stages: Dict[str, Stage] = {}
+        self.producers: Dict[str, str] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+            for value in stage.outputs:
+                if value in self.producers:
+                    raise ValueError(
+                        f"Value {value!r} is produced by both "
+                        f"{self.producers[value]} and {stage.name}"
+                    )
+                self.producers[value] = stage.name
+        for stage in self.stages.values():
+            missing = [value for value in stage.inputs if value not in self.producers]
+            if missing:
+                raise ValueError(
+                    f"No stage produces the inputs of {stage.name}: {missing}"
+                )
+            unknown = [name for name in stage.after if name not in self.stages]
+            if unknown:
+                raise ValueError(f"{stage.name} runs after unknown stages: {unknown}")
+        self.order = self._topological_order()
+
+    def dependencies(self, name: str) -> List[str]:
+        """Return the stages that must finish before a stage starts.
+
+        Args:
+            name: Stage name.
+
+        Returns:
+            The stages producing its inputs, in input order, then its
+            ``after`` stages, without repeats.
+        """
+        stage = self.stages[name]
+        producers = [self.producers[value] for value in stage.inputs]
+        return list(dict.fromkeys(producers + list(stage.after)))
+
+    def subgraph(self, targets: Iterable[str]) -> List[str]:
+        """Return the stages needed to run ``targets``.
+
+        Args:
+            targets: Names of the stages to run.
+
+        Returns:
+            The targets and every stage they depend on, directly or not, in
+            an order where each stage follows its dependencies.
+
+        Raises:
+            KeyError: If a target is not a stage of the pipeline.
+        """
+        pending = list(targets)
+        unknown = [name for name in pending if name not in self.stages]
+        if unknown:
+            raise KeyError(f"Unknown stages: {unknown}")
+        needed = set()
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.dependencies(name))
+        return [name for name in self.order if name in needed]
+
+    def run(
+        self, targets: Iterable[str], max_workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Run the stages needed for ``targets``.
+
+        Each stage is submitted as soon as every stage it depends on has
+        finished, except ``main_thread`` stages, which wait until nothing
+        else runs. Process stages share one process pool, created only if one
+        of them runs, with at most one worker per process stage. What the
+        stages print to ``sys.stdout`` is held back and printed in
+        :meth:`subgraph` order, each stage's output once it and every stage
+        before it have finished.
+
+        Args:
+            targets: Names of the stages to run.
+            max_workers: Maximum number of stages running at once. Defaults
+                to the CPU count. With a single worker the stages run one
+                after the other in the calling thread, in :meth:`subgraph`
+                order, and no process is started.
+
+        Returns:
+            The values produced by the stages that ran, by name.
+
+        Raises:
+            Exception: The first error raised by a stage, after the output of
+                the finished stages and of the failed one. Stages that have
+                not started yet are cancelled.
+        """
+        names = self.subgraph(targets)
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers <= 1:
+            values: Dict[str, Any] = {}
+            for name in names:
+                stage = self.stages[name]
+                self._store(
+                    stage, stage.func(*(values[v] for v in stage.inputs)), values
+                )
+            return values
+        return self._run_concurrently(names, max_workers)
+
+    def _run_concurrently(self, names: List[str], max_workers: int) -> Dict[str, Any]:
+        """Run stages on worker threads and processes as their inputs arrive.
+
+        Args:
+            names: Stages to run, in :meth:`subgraph` order.
+            max_workers: Maximum number of stages running at once.
+
+        Returns:
+            The values produced by the stages, by name.
+        """
+        values: Dict[str, Any] = {}
+        waiting = {name: set(self.dependencies(name)) for name in names}
+        running: Dict[Future, str] = {}
+        output = _StageOutput(names, sys.stdout)
+        with ExitStack() as stack:
+            stack.enter_context(redirect_stdout(output.router))
+            threads = stack.enter_context(ThreadPoolExecutor(max_workers))
+            processes = None
+            # Forking starts every worker at once, so start one per stage
+            n_process = sum(self.stages[name].use_process for name in names)
+            if n_process:
+                processes = stack.enter_context(
+                    ProcessPoolExecutor(min(max_workers, n_process))
+                )
+            while waiting or running:
+                ready = [n for n in names if n in waiting and not waiting[n]]
+                for name in ready:
+                    stage = self.stages[name]
+                    if stage.main_thread:
+                        continue
+                    del waiting[name]
+                    args = [values[value] for value in stage.inputs]
+                    if stage.use_process:
+                        future = processes.submit(_captured, stage.func, *args)
+                    else:
+                        future = threads.submit(output.capture, stage.func, *args)
+                    running[future] = name
+                if running:
+                    finished = _collect(running, output)
+                else:
+                    # Only main-thread stages are ready, and nothing else runs
+                    del waiting[ready[0]]
+                    finished = [self._run_here(ready[0], values, output)]
+                for name, (result, printed) in finished:
+                    output.finish(name, printed)
+                    self._store(self.stages[name], result, values)
+                    for deps in waiting.values():
+                        deps.discard(name)
+        return values
+
+    def _run_here(
+        self, name: str, values: Dict[str, Any], output: "_StageOutput"
+    ) -> Tuple[str, Tuple[Any, str]]:
+        """Run a stage in the calling thread with its output buffered.
+
+        Args:
+            name: Stage name.
+            values: Values produced so far.
+            output: Output of the run.
+
+        Returns:
+            The stage name, and its result and printed text.
+        """
+        stage = self.stages[name]
+        try:
+            return name, output.capture(
+                stage.func, *(values[value] for value in stage.inputs)
+            )
+        except Exception as error:
+            output.fail(error)
+            raise
+
+    def _topological_order(self) -> List[str]:
+        """Order the stages so that each follows the stages it depends on.
+
+        Returns:
+            The stage names; among stages whose dependencies are met, the
+            earliest defined comes first.
+
+        Raises:
+            ValueError: If the stages depend on each other in a cycle.
+        """
+        order: List[str] = []
+        placed = set()
+        while len(order) < len(self.stages):
+            ready = [
+                name
+                for name in self.stages
+                if name not in placed and placed.issuperset(self.dependencies(name))
+            ]
+            if not ready:
+                cycle = sorted(set(self.stages) - placed)
+                raise ValueError(f"Stages depend on each other in a cycle: {cycle}")
+            order.append(ready[0])
+            placed.add(ready[0])
+        return order
+
+    @staticmethod
+    def _store(stage: Stage, result: Any, values: Dict[str, Any]) -> None:
+        """Record a stage's result under its output names.
+
+        Args:
+            stage: Stage that produced ``result``.
+            result: Return value of the stage's function.
+            values: Values produced so far, updated in place.
+
+        Raises:
+            ValueError: If a stage with several outputs returned a different
+                number of items.
+        """
+        if len(stage.outputs) == 1:
+            values[stage.outputs[0]] = result
+        elif stage.outputs:
+            result = tuple(result)
+            if len(result) != len(stage.outputs):
+                raise ValueError(
+                    f"Stage {stage.name} returned {len(result)} values for "
+                    f"{len(stage.outputs)} outputs"
+                )
+            values.update(zip(stage.outputs, result))
+
+
+class _OutputRouter(io.TextIOBase):
+    """Stand-in for ``sys.stdout`` that gives each capturing thread a buffer.
+
+    Args:
+        stream: Stream written to by threads that are not capturing.
+    """
+
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+        self.local = threading.local()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self.local, "buffer", None)
+        return (self.stream if buffer is None else buffer).write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+class _StageOutput:
+    """Console output of the stages of one run, printed in stage order.
+
+    Args:
+        names: The stages of the run, in the order to print their output.
+        stream: Stream to print to.
+    """
+
+    def __init__(self, names: List[str], stream):
+        self.names = names
+        self.router = _OutputRouter(stream)
+        self.pending: Dict[str, str] = {}
+        self.printed = 0
+
+    def capture(self, func: Callable[..., Any], *args) -> Tuple[Any, str]:
+        """Call ``func`` with what this thread prints buffered.
+
+        Args:
+            func: Stage function.
+            *args: Its arguments.
+
+        Returns:
+            The result of ``func`` and what it printed. If it raises, the
+            printed text is kept on the error (see :func:`_captured`).
+        """
+        buffer = self.router.local.buffer = io.StringIO()
+        try:
+            return func(*args), buffer.getvalue()
+        except Exception as error:
+            setattr(error, _OUTPUT_ATTR, buffer.getvalue())
+            raise
+        finally:
+            self.router.local.buffer = None
+
+    def finish(self, name: str, text: str) -> None:
+        """Record a finished stage's output and print all that is due."""
+        self.pending[name] = text
+        while self.printed < len(self.names):
+            text = self.pending.pop(self.names[self.printed], None)
+            if text is None:
+                break
+            self.router.stream.write(text)
+            self.printed += 1
+
+    def fail(self, error: BaseException) -> None:
+        """Print the output of the finished stages, then of the failed one."""
+        for other in self.names:
+            self.router.stream.write(self.pending.pop(other, ""))
+        self.router.stream.write(getattr(error, _OUTPUT_ATTR, ""))
+        self.router.stream.flush()
+
+
+def _collect(
+    running: Dict[Future, str], output: "_StageOutput"
+) -> List[Tuple[str, Tuple[Any, str]]]:
+    """Wait for running stages and take the results of those that finished.
+
+    Args:
+        running: Futures of the running stages, by stage name; finished ones
+            are removed.
+        output: Output of the run.
+
+    Returns:
+        The name, and the result and printed text, of every finished stage.
+
+    Raises:
+        Exception: The error of a failed stage, after cancelling the stages
+            that have not started.
+    """
+    finished = []
+    done, _ = wait(running, return_when=FIRST_COMPLETED)
+    for future in done:
+        name = running.pop(future)
+        error = future.exception()
+        if error is not None:
+            for other in running:
+                other.cancel()
+            output.fail(error)
+            raise error
+        finished.append((name, future.result()))
+    return finished
+
+
+def _captured(func: Callable[..., Any], *args) -> Tuple[Any, str]:
+    """Call ``func`` in a worker process with its output buffered.
+
+    A worker process runs one stage at a time, so redirecting its
+    ``sys.stdout`` only catches that stage.
+
+    Args:
+        func: Stage function.
+        *args: Its arguments.
+
+    Returns:
+        The result of ``func`` and what it printed. If it raises, the printed
+        text is kept on the error, which is pickled with its attributes.
+    """
+    buffer = io.StringIO()
+    try:
+        with redirect_stdout(buffer):
+            result = func(*args)
+    except Exception as error:
+        setattr(error, _OUTPUT_ATTR, buffer.getvalue())
+        raise
+    return result, buffer.getvalue()
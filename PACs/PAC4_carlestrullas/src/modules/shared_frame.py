@@ -0,0 +1,207 @@
+"""Zero-copy sharing of DataFrames with process-pool workers.
+
+A :class:`SharedFrame` copies the numeric columns and the categorical codes of
+a frame into one ``multiprocessing.shared_memory`` block, once. Pickling it
+only sends a small handle (the block name, the column layout and the
+categories), so a pool task that receives it costs the same whatever the
+number of rows. A worker attaches to the block on first use and reads the
+columns as read-only NumPy views of the shared pages, and
+:meth:`SharedFrame.to_frame` wraps them in a DataFrame without copying.
+Columns of other dtypes, e.g. strings, are stored as categorical codes.
+
+The process that creates the block owns it: :meth:`SharedFrame.close`, the end
+of a ``with`` block or, failing both, interpreter exit unlinks it. Workers
+keep their mappings until they exit, as views handed out may still be alive.
+"""
+
+import atexit
+import os
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+# Column offsets are rounded up to this many bytes
+ALIGNMENT = 64
+
+# Blocks created by this process, unlinked at exit unless closed before
+_OWNED: Dict[str, SharedMemory] = {}
+# Blocks this process attached to, kept mapped while views may be alive
+_ATTACHED: Dict[str, SharedMemory] = {}
+
+
+class SharedColumn(NamedTuple):
+    """Layout of one column in a shared block.
+
+    Attributes:
+        name: Column name.
+        dtype: NumPy dtype of the stored values or codes.
+        offset: Position of the first value in the block, in bytes.
+        categories: Categories of a categorical column; None for numeric ones.
+        ordered: Whether the categories are ordered.
+    """
+
+    name: object
+    dtype: np.dtype
+    offset: int
+    categories: Optional[pd.Index]
+    ordered: bool
+
+
+class SharedFrame:
+    """A DataFrame's columns in shared memory, picklable as a small handle.
+
+    Args:
+        df: Frame to share. Its index is not shared; :meth:`to_frame`
+            returns a frame with a ``RangeIndex``.
+
+    Raises:
+        ValueError: If ``df`` has duplicate column names.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        if df.columns.has_duplicates:
+            raise ValueError("Cannot share a frame with duplicate column names")
+        columns, values, size = [], [], 0
+        for name, series in df.items():
+            array, categories, ordered = _column_values(series)
+            columns.append(SharedColumn(name, array.dtype, size, categories, ordered))
+            values.append(array)
+            size += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+        # A block cannot be empty, even for a frame without rows or columns
+        block = SharedMemory(create=True, size=max(size, 1))
+        _OWNED[block.name] = block
+        self.name = block.name
+        self.length = len(df)
+        self.columns: List[SharedColumn] = columns
+        self._owner = os.getpid()
+        self._arrays: Optional[Dict[object, np.ndarray]] = None
+        for column, array in zip(columns, values):
+            self._view(block, column, writeable=True)[:] = array
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __enter__(self) -> "SharedFrame":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_arrays"] = None
+        return state
+
+    def arrays(self) -> Dict[object, np.ndarray]:
+        """Return the stored columns as read-only views of the shared block.
+
+        Returns:
+            The values of numeric columns and the codes of categorical ones,
+            by column name, in column order.
+
+        Raises:
+            FileNotFoundError: If the creating process already unlinked the
+                block.
+        """
+        if self._arrays is None:
+            block = _OWNED.get(self.name) or _attach(self.name)
+            self._arrays = {
+                column.name: self._view(block, column) for column in self.columns
+            }
+        return self._arrays
+
+    def to_frame(self) -> pd.DataFrame:
+        """Rebuild the frame on top of the shared block, without copying.
+
+        Returns:
+            A frame with the original columns and a ``RangeIndex``. Numeric
+            columns and categorical codes are read-only views of the block;
+            columns that were neither are categorical.
+        """
+        arrays = self.arrays()
+        data = {}
+        for column in self.columns:
+            values = arrays[column.name]
+            if column.categories is not None:
+                values = pd.Categorical.from_codes(
+                    values, column.categories, ordered=column.ordered
+                )
+            data[column.name] = values
+        return pd.DataFrame(data, index=pd.RangeIndex(self.length), copy=False)
+
+    def close(self) -> None:
+        """Release the block; the creating process also unlinks it.
+
+        Views returned earlier must not be used afterwards in the creating
+        process. Other processes keep their mappings until they exit.
+        """
+        self._arrays = None
+        if os.getpid() == self._owner:
+            block = _OWNED.pop(self.name, None)
+            if block is not None:
+                _release(block)
+
+    def _view(
+        self, block: SharedMemory, column: SharedColumn, writeable: bool = False
+    ) -> np.ndarray:
+        """Map one column of ``block`` as a NumPy array."""
+        array = np.ndarray(
+            (self.length,), dtype=column.dtype, buffer=block.buf, offset=column.offset
+        )
+        array.flags.writeable = writeable
+        return array
+
+
+def _column_values(series: pd.Series):
+    """Split a column into the array to store and its categories.
+
+    Args:
+        series: Column to share.
+
+    Returns:
+        The numeric values or categorical codes, the categories (None for
+        numeric columns) and whether they are ordered.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), dtype.categories, dtype.ordered
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufc":
+        return series.to_numpy(), None, False
+    codes, categories = pd.factorize(series, sort=True)
+    return codes, pd.Index(categories), False
+
+
+def _attach(name: str) -> SharedMemory:
+    """Map a block created by another process, once per process.
+
+    Pool workers share the resource tracker of the process that started
+    them, so attaching does not hand them the block's cleanup.
+
+    Args:
+        name: Name of the block.
+
+    Returns:
+        The mapped block.
+    """
+    if name not in _ATTACHED:
+        _ATTACHED[name] = SharedMemory(name=name)
+    return _ATTACHED[name]
+
+
+def _release(block: SharedMemory) -> None:
+    """Unlink a block and unmap it unless views of it are still alive."""
+    try:
+        block.close()
+    except BufferError:
+        # Mapped pages outlive the name and are freed with the last view
+        pass
+    block.unlink()
+
+
+@atexit.register
+def _unlink_owned() -> None:
+    """Unlink the blocks this process created and did not close."""
+    for name in list(_OWNED):
+        _release(_OWNED.pop(name))
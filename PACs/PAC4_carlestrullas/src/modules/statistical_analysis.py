@@ -1,18 +1,58 @@
 """Statistical analysis utilities.
 
 Functions to compute descriptive statistics, correlations, and simple trends by
-branch, and to persist the analysis as a JSON report under `src/report/`.
+branch, and to persist the analysis as a JSON report under `src/report/`. The
+per-branch section is computed in a single grouped pass over the rows sorted
+by branch, rather than one boolean mask over the full frame per branch.
+:func:`bootstrap_intervals` adds optional percentile bootstrap confidence
+intervals, resampled in batches of index matrices across a process pool whose
+workers read the rows from shared memory, and :class:`OnlineStatistics`
+builds the same report from chunks of rows.
 """
 
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import partial
+from typing import Dict, List, Optional, Union
 
+import numpy as np
 import pandas as pd
-from scipy.stats import linregress, pearsonr
+from scipy.stats import pearsonr
+from scipy.stats import t as student_t
 
+from src.modules.indexed_dataset import IndexedDataset
+from src.modules.profiling import profiled
+from src.modules.shared_frame import SharedFrame
 
-def analyze_dataset(merged_df: pd.DataFrame) -> None:
+ABANDON_COL = "Abandonament mitjà (%)"
+PERF_COL = "Rendiment mitjà (%)"
+TREND_THRESHOLD = 0.01
+YEAR_COL = "Curs Acadèmic"
+# Running moments kept per metric; "pair" covers rows with both metrics
+MOMENT_COLUMNS = [
+    f"{prefix}_{stat}"
+    for prefix, stats in (
+        ("abandon", ("n", "mean", "m2")),
+        ("perf", ("n", "mean", "m2")),
+        ("pair", ("n", "mean_a", "mean_p", "m2_a", "m2_p", "c")),
+    )
+    for stat in stats
+]
+# Upper bound on the resampled values held per batch (rows x resamples)
+BOOTSTRAP_BATCH_ELEMENTS = 2_000_000
+# Per-row arrays of the bootstrap inputs, shared with the pool's workers
+BOOTSTRAP_ROWS = ("abandon", "perf", "year_pos")
+
+
+@profiled
+def analyze_dataset(
+    merged_df: pd.DataFrame,
+    n_bootstrap: int = 0,
+    seed: int = 0,
+    statistics: Optional["OnlineStatistics"] = None,
+) -> None:
     """Perform statistical analysis and save a JSON report.
 
     Computes global means, Pearson correlation, per-branch statistics, and
@@ -21,12 +61,72 @@ def analyze_dataset(merged_df: pd.DataFrame) -> None:
 
     Args:
         merged_df: Merged dataset containing performance and dropout metrics.
+        n_bootstrap: If positive, add an ``intervalos_confianza`` section
+            computed by :func:`bootstrap_intervals` with this many resamples.
+        seed: Random seed for the bootstrap.
+        statistics: Forwarded to :func:`build_report`.
 
     Returns:
         None. Writes a JSON report to disk and prints its path.
     """
-    abandon_col = "Abandonament mitjà (%)"
-    perf_col = "Rendiment mitjà (%)"
+    report = build_report(
+        merged_df, n_bootstrap=n_bootstrap, seed=seed, statistics=statistics
+    )
+
+    # Save report in src/report/
+    src_dir = os.path.dirname(os.path.dirname(__file__))
+    output_path = os.path.join(src_dir, "report", "analisi_estadistic.json")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    print(f"Statistical analysis report saved to {output_path}")
+
+
+@profiled
+def build_report(
+    merged_df: pd.DataFrame,
+    n_bootstrap: int = 0,
+    seed: int = 0,
+    statistics: Optional["OnlineStatistics"] = None,
+) -> dict:
+    """Compute the statistical analysis report without saving it.
+
+    Args:
+        merged_df: Merged dataset containing performance and dropout metrics.
+        n_bootstrap: If positive, number of bootstrap resamples for the
+            ``intervalos_confianza`` section.
+        seed: Random seed for the bootstrap.
+        statistics: Accumulated statistics of ``merged_df``, e.g. reduced
+            from partitions of the rows. If given, every section but the
+            bootstrap comes from :meth:`OnlineStatistics.report` instead of a
+            new pass over the rows.
+
+    Returns:
+        The report written by :func:`analyze_dataset`, with the metadata,
+        global statistics, per-branch analysis and rankings sections.
+    """
+    if statistics is not None:
+        report = statistics.report()
+    else:
+        report = _serial_report(merged_df)
+    if n_bootstrap > 0:
+        report["intervalos_confianza"] = bootstrap_intervals(
+            merged_df, n_resamples=n_bootstrap, seed=seed
+        )
+    return report
+
+
+def _serial_report(merged_df: pd.DataFrame) -> dict:
+    """Compute every report section but the bootstrap in one pass.
+
+    Args:
+        merged_df: Merged dataset containing performance and dropout metrics.
+
+    Returns:
+        The report without ``intervalos_confianza``.
+    """
+    abandon_col = ABANDON_COL
+    perf_col = PERF_COL
 
     # Metadata section
     metadata = {
@@ -45,61 +145,638 @@ def analyze_dataset(merged_df: pd.DataFrame) -> None:
         "correlacion_abandono_rendimiento": corr,
     }
 
+    return _assemble_report(metadata, global_stats, branch_summary(merged_df))
+
+
+def _assemble_report(metadata: dict, global_stats: dict, summary: pd.DataFrame) -> dict:
+    """Add the per-branch and rankings sections and assemble the report.
+
+    Args:
+        metadata: The ``analysis_metadata`` section.
+        global_stats: The ``estadisticas_globales`` section.
+        summary: Per-branch statistics in the layout of :func:`branch_summary`.
+
+    Returns:
+        The report dict.
+    """
     # Analysis by branch section
     branch_stats = {}
-    for branch in merged_df["Branca"].unique():
-        branch_data = merged_df[merged_df["Branca"] == branch]
-        abandon_mean = branch_data[abandon_col].mean()
-        abandon_std = branch_data[abandon_col].std()
-        perf_mean = branch_data[perf_col].mean()
-        perf_std = branch_data[perf_col].std()
-        branch_by_year = (
-            branch_data.groupby("Curs Acadèmic")
-            .agg({abandon_col: "mean"})
-            .reset_index()
-        )
-        years = branch_by_year["Curs Acadèmic"].tolist()
-        valores_abandono = branch_by_year[abandon_col].tolist()
-        slope = linregress(range(len(years)), valores_abandono).slope
-        if slope > 0.01:
-            tendencia = "increasing"
-        elif slope < -0.01:
-            tendencia = "decreasing"
-        else:
-            tendencia = "stable"
+    trends = _trend_labels(summary["slope"].to_numpy())
+    for (branch, row), tendencia in zip(summary.iterrows(), trends):
         branch_stats[branch] = {
-            "abandono": {"mean": abandon_mean, "std": abandon_std},
-            "rendimiento": {"mean": perf_mean, "std": perf_std},
+            "abandono": {"mean": row["abandon_mean"], "std": row["abandon_std"]},
+            "rendimiento": {"mean": row["perf_mean"], "std": row["perf_std"]},
             "tendencia_abandono": tendencia,
         }
 
-    # Rankings section
-    branch_means = merged_df.groupby("Branca").agg(
-        {perf_col: "mean", abandon_col: "mean"}
-    )
-    best_perf = branch_means[perf_col].idxmax()
-    worst_perf = branch_means[perf_col].idxmin()
-    most_abandon = branch_means[abandon_col].idxmax()
-    least_abandon = branch_means[abandon_col].idxmin()
+    # Rankings section, ties resolved in sorted branch order
+    branch_means = summary.reindex(summary.index.sort_values())
     rankings = {
-        "mejor_rendimiento": best_perf,
-        "peor_rendimiento": worst_perf,
-        "mayor_abandono": most_abandon,
-        "menor_abandono": least_abandon,
+        "mejor_rendimiento": branch_means["perf_mean"].idxmax(),
+        "peor_rendimiento": branch_means["perf_mean"].idxmin(),
+        "mayor_abandono": branch_means["abandon_mean"].idxmax(),
+        "menor_abandono": branch_means["abandon_mean"].idxmin(),
     }
 
     # Create final JSON report
-    report = {
+    return {
         "analysis_metadata": metadata,
         "estadisticas_globales": global_stats,
         "analisis_por_rama": branch_stats,
         "rankings": rankings,
     }
 
-    # Save report in src/report/
-    src_dir = os.path.dirname(os.path.dirname(__file__))
-    output_path = os.path.join(src_dir, "report", "analisi_estadistic.json")
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(report, f, indent=4, ensure_ascii=False)
-    print(f"Statistical analysis report saved to {output_path}")
+
+@profiled
+def branch_summary(data: Union[pd.DataFrame, IndexedDataset]) -> pd.DataFrame:
+    """Compute the per-branch statistics in one grouped pass.
+
+    The rows are indexed by branch and year once (see
+    :class:`~src.modules.indexed_dataset.IndexedDataset`), so every branch is
+    a contiguous slice of the value arrays and its mean and sample std are
+    computed the way ``Series.mean``/``Series.std`` do (NaNs skipped,
+    two-pass variance). The slices keep each branch's rows in input order
+    (:meth:`~src.modules.indexed_dataset.IndexedDataset.branch_values`), so
+    the results are bitwise identical to the per-branch pandas ones. The
+    dropout trend is the least-squares slope of the branch's per-year dropout
+    means against the year position, computed in closed form for all
+    branches at once.
+
+    Args:
+        data: Merged dataset containing performance and dropout metrics, or
+            an already indexed one.
+
+    Returns:
+        One row per branch, in order of first appearance, with the
+        ``abandon_mean``, ``abandon_std``, ``perf_mean``, ``perf_std`` and
+        ``slope`` columns.
+    """
+    if not isinstance(data, IndexedDataset):
+        data = IndexedDataset(data)
+    bounds = data.branch_bounds
+    order = data.appearance_order
+
+    stats = {}
+    for name, col in (("abandon", ABANDON_COL), ("perf", PERF_COL)):
+        values = data.branch_values(col)
+        means, stds = np.empty(len(order)), np.empty(len(order))
+        for i, branch in enumerate(order):
+            means[i], stds[i] = _mean_std(values[bounds[branch] : bounds[branch + 1]])
+        stats[f"{name}_mean"], stats[f"{name}_std"] = means, stds
+
+    # Per-year dropout means, sorted by branch and then by year
+    yearly = data.yearly_means([ABANDON_COL])
+    slopes = _group_linregress(
+        np.repeat(np.arange(len(data.branches)), np.diff(yearly.branch_bounds)),
+        yearly.values(ABANDON_COL),
+        len(data.branches),
+    )["slope"]
+    stats["slope"] = slopes[order]
+    return pd.DataFrame(stats, index=data.branches.take(order).rename("Branca"))
+
+
+@profiled
+def trend_by_groups(
+    df: pd.DataFrame,
+    group_cols: List[str],
+    value_col: str = ABANDON_COL,
+    threshold: float = TREND_THRESHOLD,
+) -> pd.DataFrame:
+    """Fit the yearly trend of ``value_col`` for every group at once.
+
+    Like the per-branch ``tendencia_abandono``, each group's per-year means
+    are regressed against the year position (0, 1, ...) within the group.
+    All regressions are solved together in closed form with NumPy, giving the
+    same slope, intercept, r and two-sided p-value as ``scipy.stats.linregress``
+    without one scipy call per group.
+
+    Args:
+        df: Dataset with ``group_cols``, ``Curs Acadèmic`` and ``value_col``.
+        group_cols: Columns defining the groups, e.g. ``["Sigles"]`` or
+            ``["Sigles", "Sexe"]``.
+        value_col: Column whose yearly means are regressed.
+        threshold: Slope above which (or below minus which) a trend is
+            labelled ``"increasing"`` (or ``"decreasing"``).
+
+    Returns:
+        One row per group, sorted by the group columns, with the group
+        columns, ``n_years``, ``slope``, ``intercept``, ``r``, ``p_value``
+        and ``tendencia``. Statistics are NaN for groups observed in fewer
+        than two years.
+    """
+    yearly = df.groupby(list(group_cols) + [YEAR_COL], observed=True, sort=True)[
+        value_col
+    ].mean()
+    keys = yearly.index.droplevel(-1)
+    # Rows are sorted by group, so each group starts where its key first appears
+    firsts = ~keys.duplicated()
+    groups = np.cumsum(firsts) - 1
+    fit = _group_linregress(groups, yearly.to_numpy(), int(firsts.sum()))
+
+    result = keys[firsts].to_frame(index=False)
+    result["n_years"] = fit["n"].astype(np.int64)
+    for col in ("slope", "intercept", "r", "p_value"):
+        result[col] = fit[col]
+    result["tendencia"] = _trend_labels(fit["slope"], threshold)
+    return result
+
+
+class OnlineStatistics:
+    """Mergeable running statistics for building the report from chunks.
+
+    Tracks, with Welford/Chan updates, the count, mean and sum of squared
+    deviations of both metrics and their co-moment, overall, per branch and
+    per branch and academic year. Chunks are absorbed with :meth:`update`,
+    and accumulators filled independently (e.g. in parallel, one per
+    partition of the rows) are combined with :meth:`merge`. :meth:`report`
+    returns the :func:`build_report` result for all rows seen, up to
+    floating-point rounding.
+    """
+
+    def __init__(self):
+        self.n_rows = 0
+        self.years: set = set()
+        self.overall = pd.DataFrame(columns=MOMENT_COLUMNS, dtype=np.float64)
+        self.branches = self.overall.copy()
+        self.yearly = self.overall.copy()
+
+    def update(self, chunk: pd.DataFrame) -> "OnlineStatistics":
+        """Absorb a chunk of rows of the merged dataset.
+
+        Args:
+            chunk: Rows with the ``Branca``, ``Curs Acadèmic`` and metric
+                columns.
+
+        Returns:
+            The accumulator itself, to allow chaining.
+        """
+        branch = np.asarray(chunk["Branca"], dtype=object)
+        year = np.asarray(chunk[YEAR_COL], dtype=object)
+        self.n_rows += len(chunk)
+        self.years.update(y for y in year if not pd.isna(y))
+        self.overall = _merge_moments(
+            self.overall, _chunk_moments(chunk, [np.zeros(len(chunk), dtype=int)])
+        )
+        self.branches = _merge_moments(self.branches, _chunk_moments(chunk, [branch]))
+        self.yearly = _merge_moments(self.yearly, _chunk_moments(chunk, [branch, year]))
+        return self
+
+    def merge(self, other: "OnlineStatistics") -> "OnlineStatistics":
+        """Fold the statistics of another accumulator into this one.
+
+        Branches keep their order of first appearance, ``self`` before
+        ``other``, so merging partial results in row order gives the same
+        report as a single pass.
+
+        Args:
+            other: Accumulator over rows disjoint from this one's.
+
+        Returns:
+            The accumulator itself, to allow chaining.
+        """
+        self.n_rows += other.n_rows
+        self.years |= other.years
+        self.overall = _merge_moments(self.overall, other.overall)
+        self.branches = _merge_moments(self.branches, other.branches)
+        self.yearly = _merge_moments(self.yearly, other.yearly)
+        return self
+
+    def summary(self) -> pd.DataFrame:
+        """Return the per-branch statistics of every row seen so far.
+
+        Returns:
+            One row per branch in the layout of :func:`branch_summary`.
+        """
+        summary = pd.DataFrame(index=pd.Index(self.branches.index, name="Branca"))
+        for prefix in ("abandon", "perf"):
+            n = self.branches[f"{prefix}_n"]
+            summary[f"{prefix}_mean"] = self.branches[f"{prefix}_mean"].where(n > 0)
+            summary[f"{prefix}_std"] = np.sqrt(
+                self.branches[f"{prefix}_m2"] / (n - 1)
+            ).where(n > 1)
+
+        # Per-year dropout means, ordered by branch and then by year
+        yearly = self.yearly[self.yearly["abandon_n"] > 0]
+        positions = {branch: i for i, branch in enumerate(self.branches.index)}
+        groups = np.array([positions[b] for b in yearly.index.get_level_values(0)])
+        years = yearly.index.get_level_values(1).to_numpy()
+        order = np.lexsort((years, groups))
+        summary["slope"] = _group_linregress(
+            groups[order].astype(np.int64),
+            yearly["abandon_mean"].to_numpy()[order],
+            len(summary),
+        )["slope"]
+        return summary
+
+    def report(self) -> dict:
+        """Build the report for every row seen so far.
+
+        Returns:
+            The report in the layout of :func:`build_report`.
+
+        Raises:
+            ValueError: If no rows have been accumulated yet.
+        """
+        if not self.n_rows:
+            raise ValueError("No data has been accumulated yet")
+        metadata = {
+            "fecha_analisis": datetime.now().strftime("%Y-%m-%d"),
+            "num_registros": self.n_rows,
+            "periodo_temporal": sorted(self.years),
+        }
+        total = self.overall.iloc[0]
+        global_stats = {
+            "abandono_medio": total["abandon_mean"],
+            "rendimiento_medio": total["perf_mean"],
+            "correlacion_abandono_rendimiento": total["pair_c"]
+            / np.sqrt(total["pair_m2_a"] * total["pair_m2_p"]),
+        }
+        return _assemble_report(metadata, global_stats, self.summary())
+
+
+def _chunk_moments(chunk: pd.DataFrame, keys: List[np.ndarray]) -> pd.DataFrame:
+    """Compute the :data:`MOMENT_COLUMNS` of a chunk per key.
+
+    Args:
+        chunk: Rows with both metric columns.
+        keys: Grouping arrays, aligned with the rows.
+
+    Returns:
+        One row of moments per key, in order of first appearance.
+    """
+    abandon = chunk[ABANDON_COL].to_numpy(dtype=np.float64, na_value=np.nan)
+    perf = chunk[PERF_COL].to_numpy(dtype=np.float64, na_value=np.nan)
+    both = ~(np.isnan(abandon) | np.isnan(perf))
+    values = pd.DataFrame(
+        {
+            "abandon": abandon,
+            "perf": perf,
+            "pair_a": np.where(both, abandon, np.nan),
+            "pair_p": np.where(both, perf, np.nan),
+        }
+    )
+    grouped = values.groupby(keys, sort=False)
+    counts, means = grouped.count(), grouped.mean()
+    deviations = values - grouped.transform("mean")
+    squares = (deviations**2).groupby(keys, sort=False).sum()
+
+    moments = pd.DataFrame(index=counts.index)
+    for prefix in ("abandon", "perf"):
+        moments[f"{prefix}_n"] = counts[prefix]
+        moments[f"{prefix}_mean"] = means[prefix]
+        moments[f"{prefix}_m2"] = squares[prefix]
+    moments["pair_n"] = counts["pair_a"]
+    moments["pair_mean_a"], moments["pair_mean_p"] = means["pair_a"], means["pair_p"]
+    moments["pair_m2_a"], moments["pair_m2_p"] = squares["pair_a"], squares["pair_p"]
+    moments["pair_c"] = (
+        (deviations["pair_a"] * deviations["pair_p"]).groupby(keys, sort=False).sum()
+    )
+    return moments.astype(np.float64).fillna(0.0)
+
+
+def _merge_moments(left: pd.DataFrame, right: pd.DataFrame) -> pd.DataFrame:
+    """Combine two tables of :data:`MOMENT_COLUMNS` with Chan's formulas.
+
+    Args:
+        left: Moments of one set of rows.
+        right: Moments of a disjoint set of rows.
+
+    Returns:
+        The moments of the union, keyed by ``left``'s keys followed by the
+        new keys of ``right``.
+    """
+    if left.empty:
+        return right
+    index = left.index.append(right.index[~right.index.isin(left.index)])
+    left, right = left.reindex(index, fill_value=0.0), right.reindex(
+        index, fill_value=0.0
+    )
+    merged = pd.DataFrame(index=index)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for prefix, pairs in (
+            ("abandon", [("mean", "m2")]),
+            ("perf", [("mean", "m2")]),
+            ("pair", [("mean_a", "m2_a"), ("mean_p", "m2_p")]),
+        ):
+            n_left, n_right = left[f"{prefix}_n"], right[f"{prefix}_n"]
+            n = n_left + n_right
+            weight = (n_left * n_right / n).fillna(0.0)
+            merged[f"{prefix}_n"] = n
+            deltas = []
+            for mean, m2 in pairs:
+                mean, m2 = f"{prefix}_{mean}", f"{prefix}_{m2}"
+                delta = right[mean] - left[mean]
+                deltas.append(delta)
+                merged[mean] = (left[mean] + delta * n_right / n).fillna(0.0)
+                merged[m2] = left[m2] + right[m2] + delta**2 * weight
+        merged["pair_c"] = (
+            left["pair_c"] + right["pair_c"] + (deltas[0] * deltas[1] * weight)
+        )
+    return merged[MOMENT_COLUMNS]
+
+
+@profiled
+def bootstrap_intervals(
+    merged_df: pd.DataFrame,
+    n_resamples: int = 1000,
+    confidence: float = 0.95,
+    seed: int = 0,
+    max_workers: Optional[int] = None,
+) -> dict:
+    """Percentile bootstrap confidence intervals for the report statistics.
+
+    The global correlation is bootstrapped over all rows; per-branch means and
+    dropout slopes resample rows within each branch. Resamples are drawn as
+    index matrices, a batch of resamples at a time, and batches are spread over
+    a process pool, which reads the rows from a :class:`SharedFrame` rather
+    than receiving a pickled copy per batch. Each batch draws from its own
+    child of ``SeedSequence(seed)``, so results depend only on the seed and the
+    data, not on the number of workers. Rows missing either metric are dropped.
+
+    Resampled slopes regress the per-year dropout means on the position of
+    the year among the branch's years; a year missing from a resample is
+    left out of that resample's fit.
+
+    Args:
+        merged_df: Merged dataset containing performance and dropout metrics.
+        n_resamples: Number of bootstrap resamples.
+        confidence: Confidence level of the intervals.
+        seed: Random seed.
+        max_workers: Maximum number of worker processes. Defaults to one per
+            batch, capped at the CPU count. With a single worker, batches run
+            in the current process.
+
+    Returns:
+        A dict with the ``nivel_confianza``, ``remuestreos`` and ``semilla``
+        used, the ``correlacion_abandono_rendimiento`` interval and, under
+        ``por_rama``, the ``abandono_medio``, ``rendimiento_medio`` and
+        ``pendiente_abandono`` intervals of every branch. Intervals are
+        ``[lower, upper]`` lists.
+    """
+    data = _bootstrap_inputs(merged_df)
+    batch_size = max(1, BOOTSTRAP_BATCH_ELEMENTS // max(len(data["abandon"]), 1))
+    sizes = [batch_size] * (n_resamples // batch_size)
+    if n_resamples % batch_size:
+        sizes.append(n_resamples % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if max_workers is None:
+        max_workers = min(len(sizes), os.cpu_count() or 1)
+    if max_workers <= 1 or len(sizes) <= 1:
+        batches = [_bootstrap_batch(data, s, n) for s, n in zip(seeds, sizes)]
+    else:
+        # Workers attach to the per-row arrays instead of unpickling them
+        rows = pd.DataFrame({key: data.pop(key) for key in BOOTSTRAP_ROWS})
+        with SharedFrame(rows) as shared, ProcessPoolExecutor(
+            max_workers=max_workers
+        ) as executor:
+            run_batch = partial(_shared_bootstrap_batch, shared, data)
+            batches = list(executor.map(run_batch, seeds, sizes))
+
+    alpha = (1 - confidence) / 2
+    bounds = {}
+    for name in ("corr", "abandon_mean", "perf_mean", "slope"):
+        samples = np.concatenate([batch[name] for batch in batches])
+        with np.errstate(invalid="ignore"):
+            bounds[name] = np.nanpercentile(
+                samples, [100 * alpha, 100 - 100 * alpha], 0
+            )
+    return {
+        "nivel_confianza": confidence,
+        "remuestreos": n_resamples,
+        "semilla": seed,
+        "correlacion_abandono_rendimiento": bounds["corr"].tolist(),
+        "por_rama": {
+            branch: {
+                "abandono_medio": bounds["abandon_mean"][:, i].tolist(),
+                "rendimiento_medio": bounds["perf_mean"][:, i].tolist(),
+                "pendiente_abandono": bounds["slope"][:, i].tolist(),
+            }
+            for i, branch in enumerate(data["branches"])
+        },
+    }
+
+
+def _bootstrap_inputs(merged_df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Arrange the metrics by branch for :func:`_bootstrap_batch`.
+
+    Args:
+        merged_df: Merged dataset containing performance and dropout metrics.
+
+    Returns:
+        The ``abandon`` and ``perf`` values and each row's ``year_pos`` (the
+        position of its year among its branch's years), sorted by branch;
+        branch ``bounds`` into those arrays, ``n_years`` per branch, and the
+        ``branches`` in order of first appearance.
+    """
+    complete = merged_df[[ABANDON_COL, PERF_COL]].notna().all(axis=1).to_numpy()
+    df = merged_df[complete]
+    codes, branches = pd.factorize(df["Branca"])
+    year_codes, _ = pd.factorize(df[YEAR_COL], sort=True)
+    order = np.argsort(codes, kind="stable")
+    codes, year_codes = codes[order], year_codes[order]
+    bounds = np.searchsorted(codes, np.arange(len(branches) + 1))
+    year_pos = np.empty(len(order), dtype=np.int64)
+    n_years = np.empty(len(branches), dtype=np.int64)
+    for i in range(len(branches)):
+        years, pos = np.unique(
+            year_codes[bounds[i] : bounds[i + 1]], return_inverse=True
+        )
+        year_pos[bounds[i] : bounds[i + 1]] = pos
+        n_years[i] = len(years)
+    return {
+        "abandon": df[ABANDON_COL].to_numpy(dtype=np.float64)[order],
+        "perf": df[PERF_COL].to_numpy(dtype=np.float64)[order],
+        "year_pos": year_pos,
+        "bounds": bounds,
+        "n_years": n_years,
+        "branches": np.asarray(branches).tolist(),
+    }
+
+
+def _bootstrap_batch(
+    data: Dict[str, np.ndarray], seed: np.random.SeedSequence, size: int
+) -> Dict[str, np.ndarray]:
+    """Compute the statistics of one batch of bootstrap resamples.
+
+    Args:
+        data: Output of :func:`_bootstrap_inputs`.
+        seed: Seed of this batch.
+        size: Number of resamples in the batch.
+
+    Returns:
+        The resampled ``corr`` (shape ``(size,)``) and the per-branch
+        ``abandon_mean``, ``perf_mean`` and ``slope`` (shape
+        ``(size, n_branches)``).
+    """
+    rng = np.random.default_rng(seed)
+    abandon, perf, bounds = data["abandon"], data["perf"], data["bounds"]
+    n_branches = len(bounds) - 1
+
+    rows = rng.integers(0, len(abandon), (size, len(abandon)))
+    result = {"corr": _rowwise_corr(abandon[rows], perf[rows])}
+    for name in ("abandon_mean", "perf_mean", "slope"):
+        result[name] = np.empty((size, n_branches))
+    for i in range(n_branches):
+        start, stop = bounds[i], bounds[i + 1]
+        rows = start + rng.integers(0, stop - start, (size, stop - start))
+        sample = abandon[rows]
+        result["abandon_mean"][:, i] = sample.mean(axis=1)
+        result["perf_mean"][:, i] = perf[rows].mean(axis=1)
+        result["slope"][:, i] = _resampled_slopes(
+            data["year_pos"][rows], sample, int(data["n_years"][i])
+        )
+    return result
+
+
+def _shared_bootstrap_batch(
+    rows: SharedFrame, data: dict, seed: np.random.SeedSequence, size: int
+) -> Dict[str, np.ndarray]:
+    """Run :func:`_bootstrap_batch` on per-row arrays in shared memory.
+
+    Args:
+        rows: The :data:`BOOTSTRAP_ROWS` arrays of :func:`_bootstrap_inputs`.
+        data: The other entries of :func:`_bootstrap_inputs`.
+        seed: Seed of this batch.
+        size: Number of resamples in the batch.
+
+    Returns:
+        The statistics of the batch.
+    """
+    return _bootstrap_batch({**data, **rows.arrays()}, seed, size)
+
+
+def _rowwise_corr(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Pearson correlation between matching rows of two matrices.
+
+    Args:
+        x: Values, one resample per row.
+        y: Values with the same shape as ``x``.
+
+    Returns:
+        The correlation of every row.
+    """
+    x = x - x.mean(axis=1, keepdims=True)
+    y = y - y.mean(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (x * y).sum(axis=1) / np.sqrt((x * x).sum(axis=1) * (y * y).sum(axis=1))
+
+
+def _resampled_slopes(
+    year_pos: np.ndarray, values: np.ndarray, n_years: int
+) -> np.ndarray:
+    """Slope of the per-year means of every resample of one branch.
+
+    Args:
+        year_pos: Year position of each resampled row, one resample per row.
+        values: Resampled dropout values, same shape as ``year_pos``.
+        n_years: Number of years of the branch.
+
+    Returns:
+        The slope of every resample; NaN when fewer than two years remain.
+    """
+    size = len(values)
+    flat = (np.arange(size)[:, None] * n_years + year_pos).ravel()
+    sums = np.bincount(flat, weights=values.ravel(), minlength=size * n_years)
+    counts = np.bincount(flat, minlength=size * n_years)
+    sums, counts = sums.reshape(size, n_years), counts.reshape(size, n_years)
+    present = counts > 0
+    means = np.where(present, sums / np.maximum(counts, 1), 0.0)
+    x = np.arange(n_years)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        n_present = present.sum(axis=1)
+        x_mean = (present * x).sum(axis=1) / n_present
+        y_mean = means.sum(axis=1) / n_present
+        dx = (x - x_mean[:, None]) * present
+        return (dx * (means - y_mean[:, None])).sum(axis=1) / (dx * dx).sum(axis=1)
+
+
+def _mean_std(values: np.ndarray):
+    """Return the NaN-skipping mean and sample std of a float array.
+
+    Mirrors pandas' ``nanmean`` and two-pass ``nanvar`` so the results match
+    ``Series.mean`` and ``Series.std`` exactly.
+
+    Args:
+        values: Contiguous ``float64`` values.
+
+    Returns:
+        A ``(mean, std)`` tuple; NaN where there are too few values.
+    """
+    mask = np.isnan(values)
+    filled = np.where(mask, 0.0, values)
+    count = np.float64(len(values) - mask.sum())
+    if count == 0:
+        return np.nan, np.nan
+    mean = filled.sum() / count
+    if count <= 1:
+        return mean, np.nan
+    squares = (mean - filled) ** 2
+    squares[mask] = 0.0
+    return mean, np.sqrt(squares.sum() / (count - 1))
+
+
+def _group_linregress(groups: np.ndarray, y: np.ndarray, n_groups: int) -> dict:
+    """Regress ``y`` on its position within each group, for all groups at once.
+
+    Follows ``scipy.stats.linregress`` (including its special cases for
+    constant values and two-point fits) using per-group sums.
+
+    Args:
+        groups: Group code of each value, non-decreasing.
+        y: Values, in order within each group.
+        n_groups: Number of groups.
+
+    Returns:
+        A dict of per-group arrays: ``n``, ``slope``, ``intercept``, ``r``
+        and ``p_value``. NaN for groups with fewer than two values or with
+        missing values.
+    """
+    counts = np.bincount(groups, minlength=n_groups).astype(np.float64)
+    starts = np.cumsum(counts) - counts
+    x = np.arange(len(y)) - starts[groups]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = (counts - 1) / 2
+        y_mean = np.bincount(groups, weights=y, minlength=n_groups) / counts
+        dx = x - x_mean[groups]
+        dy = y - y_mean[groups]
+        sxx = np.bincount(groups, weights=dx * dx, minlength=n_groups)
+        sxy = np.bincount(groups, weights=dx * dy, minlength=n_groups)
+        syy = np.bincount(groups, weights=dy * dy, minlength=n_groups)
+        slope = sxy / sxx
+        intercept = y_mean - slope * x_mean
+        r = np.where(
+            (sxx == 0) | (syy == 0), 0.0, np.clip(sxy / np.sqrt(sxx * syy), -1, 1)
+        )
+        dof = counts - 2
+        t_stat = r * np.sqrt(dof / ((1.0 - r + 1e-20) * (1.0 + r + 1e-20)))
+        p_value = 2 * student_t.sf(np.abs(t_stat), dof)
+    # Two points always fit exactly: p is 1 for a flat line and 0 otherwise
+    p_value = np.where(counts == 2, np.where(sxy == 0, 1.0, 0.0), p_value)
+    undefined = (counts < 2) | np.isnan(slope)
+    for values in (slope, intercept, r, p_value):
+        values[undefined] = np.nan
+    return {
+        "n": counts,
+        "slope": slope,
+        "intercept": intercept,
+        "r": r,
+        "p_value": p_value,
+    }
+
+
+def _trend_labels(slopes: np.ndarray, threshold: float = TREND_THRESHOLD) -> np.ndarray:
+    """Label slopes as increasing, decreasing or stable.
+
+    Args:
+        slopes: Trend slopes; NaN slopes are labelled ``"stable"``.
+        threshold: Minimum absolute slope of a non-stable trend.
+
+    Returns:
+        An array of labels.
+    """
+    return np.select(
+        [slopes > threshold, slopes < -threshold],
+        ["increasing", "decreasing"],
+        "stable",
+    )
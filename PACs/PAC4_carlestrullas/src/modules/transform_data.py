@@ -2,11 +2,41 @@
 
 Helpers to harmonize column names between datasets, drop unused fields, compute
 grouped aggregates by branch and related dimensions, and merge the datasets.
+:func:`transform_dataset` fuses the harmonize, drop and group steps into one
+pass without intermediate copies of the full dataset, and
+:class:`IncrementalBranchAggregator` maintains the grouped means as new
+academic years arrive. :func:`merge_datasets_encoded` joins on a single
+integer key instead of the seven string dimensions.
 """
 
+import pickle
+from typing import List, Optional, Tuple
+
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
+
+from src.modules.profiling import profiled
+
+ABANDONMENT_RENAMES = {
+    "Naturalesa universitat responsable": "Tipus universitat",
+    "Universitat responsable": "Universitat",
+    "Sexe Alumne": "Sexe",
+    "Tipus de centre": "Integrat S/N",
+}
 
+GROUP_COLS = [
+    "Curs Acadèmic",
+    "Tipus universitat",
+    "Sigles",
+    "Tipus Estudi",
+    "Branca",
+    "Sexe",
+    "Integrat S/N",
+]
 
+
+@profiled
 def harmonize_abandonment_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Harmonize abandonment dataset columns.
 
@@ -19,15 +49,10 @@ def harmonize_abandonment_columns(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         A DataFrame with harmonized column names.
     """
-    rename_dict = {
-        "Naturalesa universitat responsable": "Tipus universitat",
-        "Universitat responsable": "Universitat",
-        "Sexe Alumne": "Sexe",
-        "Tipus de centre": "Integrat S/N",
-    }
-    return df.rename(columns=rename_dict)
+    return df.rename(columns=ABANDONMENT_RENAMES)
 
 
+@profiled
 def drop_unnecessary_columns(df: pd.DataFrame, dataset: str) -> pd.DataFrame:
     """Drop unneeded columns for the specified dataset type.
 
@@ -47,11 +72,13 @@ def drop_unnecessary_columns(df: pd.DataFrame, dataset: str) -> pd.DataFrame:
     )
 
 
+@profiled
 def group_by_branch(df: pd.DataFrame, value_col: str, new_col: str) -> pd.DataFrame:
     """Compute per-branch averages over common grouping dimensions.
 
     Groups by academic year, university type, sigles, study type, branch,
-    gender, integration flag, and averages ``value_col``.
+    gender, integration flag, and averages ``value_col``. Categorical keys only
+    produce the combinations actually observed in the data.
 
     Args:
         df: Input DataFrame.
@@ -61,20 +88,146 @@ def group_by_branch(df: pd.DataFrame, value_col: str, new_col: str) -> pd.DataFr
     Returns:
         A grouped DataFrame with averaged values and normalized column name.
     """
-    group_cols = [
-        "Curs Acadèmic",
-        "Tipus universitat",
-        "Sigles",
-        "Tipus Estudi",
-        "Branca",
-        "Sexe",
-        "Integrat S/N",
-    ]
-    grouped = df.groupby(group_cols, dropna=False)[value_col].mean().reset_index()
+    # sort_index keeps the sorted key order for categorical keys too, which
+    # groupby does not guarantee when combined with dropna=False
+    grouped = (
+        df.groupby(GROUP_COLS, dropna=False, observed=True)[value_col]
+        .mean()
+        .sort_index()
+        .reset_index()
+    )
     grouped = grouped.rename(columns={value_col: new_col})
     return grouped
 
 
+@profiled
+def transform_dataset(
+    df: pd.DataFrame, dataset: str, value_col: str, new_col: str
+) -> pd.DataFrame:
+    """Harmonize, clean and group a dataset in one step.
+
+    Equivalent to :func:`harmonize_abandonment_columns` (for the abandonment
+    dataset), :func:`drop_unnecessary_columns` and :func:`group_by_branch`
+    chained, but only the grouping and value columns are copied out of
+    ``df``, and they are renamed in place, so no intermediate copy of the
+    full dataset is made.
+
+    Args:
+        df: Raw performance or abandonment dataset.
+        dataset: Dataset type, ``"performance"`` or ``"abandonment"``.
+        value_col: Name of the column to average (after harmonization).
+        new_col: Name of the averaged column in the result.
+
+    Returns:
+        The grouped DataFrame, identical to the chained result.
+    """
+    renames = ABANDONMENT_RENAMES if dataset == "abandonment" else {}
+    source_names = {new: old for old, new in renames.items() if old in df.columns}
+    needed = GROUP_COLS + [value_col]
+    projected = df[[source_names.get(col, col) for col in needed]]
+    projected.columns = needed
+    grouped = (
+        projected.groupby(GROUP_COLS, dropna=False, observed=True)[value_col]
+        .mean()
+        .sort_index()
+    )
+    grouped.name = new_col
+    return grouped.reset_index()
+
+
+class IncrementalBranchAggregator:
+    """Per-group running means that absorb new batches of rows.
+
+    Keeps the sum and count of ``value_col`` for every combination of the
+    grouping dimensions used by :func:`group_by_branch`. Each :meth:`update`
+    only combines the new batch's partial sums with the stored state, so old
+    rows never need to be reloaded, and :meth:`result` returns the same frame
+    :func:`group_by_branch` would compute over all rows seen so far. Batches
+    must not repeat rows already aggregated.
+
+    Args:
+        value_col: Name of the column to average.
+        new_col: Name of the averaged column in the result.
+    """
+
+    def __init__(self, value_col: str, new_col: str):
+        self.value_col = value_col
+        self.new_col = new_col
+        self.state: Optional[pd.DataFrame] = None
+
+    def update(self, df: pd.DataFrame) -> "IncrementalBranchAggregator":
+        """Merge a new batch of rows into the aggregate.
+
+        Args:
+            df: Rows with the grouping columns and ``value_col``, e.g. a new
+                ``Curs Acadèmic`` of data.
+
+        Returns:
+            The aggregator itself, to allow chaining.
+        """
+        batch = df.groupby(GROUP_COLS, dropna=False, observed=True)[self.value_col].agg(
+            ["sum", "count"]
+        )
+        if self.state is not None:
+            batch = (
+                pd.concat([self.state, batch])
+                .groupby(level=GROUP_COLS, dropna=False, observed=True)[["sum", "count"]]
+                .sum()
+            )
+        self.state = batch.sort_index()
+        return self
+
+    def result(self) -> pd.DataFrame:
+        """Return the grouped means over every batch seen so far.
+
+        Returns:
+            A DataFrame with the grouping columns and ``new_col``, in the same
+            layout as :func:`group_by_branch`.
+
+        Raises:
+            ValueError: If no batch has been aggregated yet.
+        """
+        if self.state is None:
+            raise ValueError("No data has been aggregated yet")
+        means = self.state["sum"] / self.state["count"]
+        means.name = self.new_col
+        return means.reset_index()
+
+    def save(self, path: str) -> None:
+        """Persist the aggregation state so a later run can resume it.
+
+        Args:
+            path: Destination file.
+        """
+        with open(path, "wb") as f:
+            pickle.dump(
+                {
+                    "value_col": self.value_col,
+                    "new_col": self.new_col,
+                    "state": self.state,
+                },
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "IncrementalBranchAggregator":
+        """Restore an aggregator saved with :meth:`save`.
+
+        Args:
+            path: File written by :meth:`save`.
+
+        Returns:
+            The restored aggregator.
+        """
+        with open(path, "rb") as f:
+            saved = pickle.load(f)
+        aggregator = cls(saved["value_col"], saved["new_col"])
+        aggregator.state = saved["state"]
+        return aggregator
+
+
+@profiled
 def merge_datasets(df_perf: pd.DataFrame, df_aband: pd.DataFrame) -> pd.DataFrame:
     """Merge performance and abandonment datasets on shared dimensions.
 
@@ -85,14 +238,129 @@ def merge_datasets(df_perf: pd.DataFrame, df_aband: pd.DataFrame) -> pd.DataFram
     Returns:
         A merged DataFrame containing only matching rows across datasets.
     """
-    merge_cols = [
-        "Curs Acadèmic",
-        "Tipus universitat",
-        "Sigles",
-        "Tipus Estudi",
-        "Branca",
-        "Sexe",
-        "Integrat S/N",
+    merged = pd.merge(df_perf, df_aband, on=GROUP_COLS, how="inner")
+    return merged
+
+
+@profiled
+def merge_datasets_encoded(
+    df_perf: pd.DataFrame, df_aband: pd.DataFrame
+) -> pd.DataFrame:
+    """Merge the datasets through an integer-encoded composite key.
+
+    The seven grouping columns of both frames are factorized jointly into a
+    single ``int64`` key, and the inner join is computed by sorting that key
+    and matching runs with ``searchsorted``-style offsets, so no Python
+    strings are hashed or compared per row. The result is identical to
+    :func:`merge_datasets`, including row order (grouped by key in order of
+    first appearance in ``df_perf``) and column layout. If either frame is
+    empty, the result comes from :func:`merge_datasets` itself.
+
+    Args:
+        df_perf: Performance dataset.
+        df_aband: Abandonment dataset.
+
+    Returns:
+        A merged DataFrame containing only matching rows across datasets.
+    """
+    if len(df_perf) == 0 or len(df_aband) == 0:
+        # No rows to join; pandas' column order and key dtypes differ here
+        return merge_datasets(df_perf, df_aband)
+    left_codes, right_codes = _encode_keys(df_perf, df_aband, GROUP_COLS)
+    n_keys = int(max(left_codes.max(initial=-1), right_codes.max(initial=-1))) + 1
+
+    # Right rows sorted by key; each key's matches form a contiguous run
+    right_order = _stable_order(right_codes)
+    right_counts = np.bincount(right_codes, minlength=n_keys)
+    right_starts = np.cumsum(right_counts) - right_counts
+
+    # Keys are numbered by first appearance in the left frame, so a stable
+    # sort of the left codes reproduces pandas' output order
+    left_order = _stable_order(left_codes)
+    matches = right_counts[left_codes[left_order]]
+    left_idx = np.repeat(left_order, matches)
+    run_offsets = np.arange(len(left_idx)) - np.repeat(
+        np.cumsum(matches) - matches, matches
+    )
+    right_idx = right_order[
+        np.repeat(right_starts[left_codes[left_order]], matches) + run_offsets
     ]
-    merged = pd.merge(df_perf, df_aband, on=merge_cols, how="inner")
+
+    if len(left_idx) == len(df_perf) and (left_idx == left_order).all():
+        # Every left row matched exactly once, in its original position
+        merged = df_perf.copy()
+    else:
+        merged = df_perf.take(left_idx)
+    merged.index = pd.RangeIndex(len(merged))
+    value_cols = [c for c in df_aband.columns if c not in GROUP_COLS]
+    overlap = set(value_cols) & set(df_perf.columns)
+    merged.columns = [f"{c}_x" if c in overlap else c for c in merged.columns]
+    for col in value_cols:
+        name = f"{col}_y" if col in overlap else col
+        merged[name] = df_aband[col].take(right_idx).array
+    for col in GROUP_COLS:
+        left_dtype, right_dtype = df_perf[col].dtype, df_aband[col].dtype
+        if left_dtype != right_dtype and "category" in (left_dtype, right_dtype):
+            merged[col] = merged[col].astype(object)
     return merged
+
+
+def _stable_order(codes: np.ndarray) -> np.ndarray:
+    """Return the stable sort order of integer codes.
+
+    Args:
+        codes: Key codes.
+
+    Returns:
+        Indices that sort ``codes`` stably; the sort is skipped when the codes
+        are already non-decreasing, as for grouped frames.
+    """
+    if (codes[1:] >= codes[:-1]).all():
+        return np.arange(len(codes))
+    if len(codes) and codes.max() <= np.iinfo(np.uint16).max:
+        # NumPy uses an O(n) radix sort for stable sorts of 16-bit integers
+        codes = codes.astype(np.uint16)
+    return np.argsort(codes, kind="stable")
+
+
+def _encode_keys(
+    left: pd.DataFrame, right: pd.DataFrame, cols: List[str]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Factorize several key columns of two frames into one dense int key.
+
+    Each column is factorized over both frames at once (missing values get
+    their own code, since ``pd.merge`` matches them to each other), and the
+    per-column codes are combined in mixed radix. If the combined key could
+    overflow ``int64`` it is re-densified before adding the next column.
+
+    Args:
+        left: First frame.
+        right: Second frame.
+        cols: Key columns present in both frames.
+
+    Returns:
+        The key codes of ``left`` and ``right``, dense in ``[0, n_keys)`` and
+        numbered by first appearance, scanning ``left`` before ``right``.
+    """
+    n_left = len(left)
+    key = np.zeros(n_left + len(right), dtype=np.int64)
+    cardinality = 1
+    for col in cols:
+        if isinstance(left[col].dtype, pd.CategoricalDtype) and isinstance(
+            right[col].dtype, pd.CategoricalDtype
+        ):
+            values = union_categoricals([left[col], right[col]])
+        else:
+            values = pd.concat([left[col], right[col]], ignore_index=True)
+        # Missing values get the extra code ``len(uniques)``; this is much
+        # cheaper than ``use_na_sentinel=False`` on object columns
+        codes, uniques = pd.factorize(values)
+        radix = len(uniques) + 1
+        codes[codes < 0] = len(uniques)
+        if cardinality * radix >= np.iinfo(np.int64).max:
+            key, key_uniques = pd.factorize(key)
+            cardinality = len(key_uniques)
+        key = key * radix + codes
+        cardinality *= radix
+    dense, _ = pd.factorize(key)
+    return dense[:n_left], dense[n_left:]
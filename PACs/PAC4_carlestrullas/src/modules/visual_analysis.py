@@ -2,73 +2,627 @@
 
 Functions to generate time series plots of dropout and performance rates by
 branch and save them as PNG files under `src/img/`.
+:func:`plot_time_series_batch` renders one such figure per value of another
+dimension (e.g. per university) across a process pool, whose workers read
+the rows from shared memory. Rendering is skipped when a figure's render
+cache entry shows the existing PNG was drawn from the same data, parameters,
+plotting code and matplotlib version. Long series can be downsampled with
+:func:`lttb_indices` (largest-triangle-three-buckets) before they are drawn.
+Figures are drawn on a :class:`TimeSeriesFigure`, which a batch reuses for
+every slice instead of rebuilding the layout. It renders with the Agg canvas
+directly rather than through pyplot, so figures can be drawn from any thread
+or worker process whatever the configured GUI backend.
 """
 
+import hashlib
+import json
 import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
-import matplotlib.pyplot as plt
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.ticker import FixedFormatter, FixedLocator
+import numpy as np
 import pandas as pd
 
+from src.modules import artifacts
+from src.modules.indexed_dataset import IndexedDataset
+from src.modules.shared_frame import SharedFrame
+
+SRC_DIR = os.path.dirname(os.path.dirname(__file__))
+IMG_DIR = os.path.join(SRC_DIR, "img")
+# Render fingerprints of the PNGs in a folder, stored in that folder
+RENDER_CACHE_NAME = ".render_cache.json"
+FIGSIZE = (14, 10)
+DPI = 300
+YEAR_COL = "Curs Acadèmic"
+BRANCH_COL = "Branca"
+PLOT_COLUMNS = ["Abandonament mitjà (%)", "Rendiment mitjà (%)"]
+SUBPLOT_PARAMS = ("left", "right", "bottom", "top", "wspace", "hspace")
+# Title name and y label of the panel of each plotted column
+PANELS = [("Dropout", "Dropout Rate (%)"), ("Performance", "Performance Rate (%)")]
+# LTTB buckets up to this wide are solved for all previous points at once
+LTTB_TABLE_WIDTH = 24
+# Triangle areas computed per array operation by the LTTB table
+LTTB_BATCH_ELEMENTS = 1 << 20
+
+
+@dataclass(frozen=True)
+class RenderOptions:
+    """How :func:`plot_time_series_batch` draws its figures.
+
+    Attributes:
+        force: Render every figure, even those whose PNG matches the render
+            cache.
+        max_points: If set, draw at most this many points per series,
+            selected with :func:`lttb_indices`.
+        reuse_figure: Redraw one figure per worker instead of building a
+            new figure, with its own branches and years, for each value.
+    """
+
+    force: bool = False
+    max_points: Optional[int] = None
+    reuse_figure: bool = True
+
 
 def plot_time_series_by_branch(
-    merged_df: pd.DataFrame, student_name: str = "carlestrullas"
+    merged_df: Union[pd.DataFrame, IndexedDataset],
+    student_name: str = "carlestrullas",
+    force: bool = False,
+    max_points: Optional[int] = None,
 ) -> None:
     """Plot and save time series by branch for dropout and performance.
 
     Args:
-        merged_df: Merged dataset created in exercise 2.
+        merged_df: Merged dataset created in exercise 2, or an already
+            indexed one.
         student_name: Identifier used in the output filename.
+        force: Render even if the existing PNG matches the render cache.
+        max_points: If set, draw at most this many points per series,
+            selected with :func:`lttb_indices`.
 
     Returns:
         None. Saves a PNG figure and prints its path.
     """
-    plt.figure(figsize=(14, 10))
-    grouped = merged_df.groupby(["Branca", "Curs Acadèmic"], as_index=False).mean(
-        numeric_only=True
+    out_path = os.path.join(IMG_DIR, f"evolucio_{student_name}.png")
+    cache = _load_render_cache(IMG_DIR)
+    name = os.path.basename(out_path)
+    figure = TimeSeriesFigure(max_points=max_points)
+    entry = _render_time_series(
+        merged_df, out_path, figure, cached=None if force else cache.get(name)
     )
-    branches = grouped["Branca"].unique()
-    colors = plt.get_cmap("tab10").colors
-
-    # Subplot 1: Abandonment
-    ax1 = plt.subplot(2, 1, 1)
-    for i, branch in enumerate(branches):
-        data = grouped[grouped["Branca"] == branch]
-        ax1.plot(
-            data["Curs Acadèmic"],
-            data["Abandonament mitjà (%)"],
-            label=branch,
-            color=colors[i % len(colors)],
+    figure.close()
+    if entry is None:
+        print(f"Figure unchanged, keeping {out_path}")
+        return
+    cache[name] = entry
+    _save_render_cache(IMG_DIR, cache)
+    print(f"Figure saved to {out_path}")
+
+
+def plot_time_series_batch(
+    merged_df: pd.DataFrame,
+    by: str,
+    student_name: str = "carlestrullas",
+    max_workers: Optional[int] = None,
+    options: Optional[RenderOptions] = None,
+) -> List[str]:
+    """Render the time series figure once per value of a dimension.
+
+    Rows are sorted by ``by`` once, and the figures are split into one
+    contiguous share per worker process. The sorted rows are placed in a
+    :class:`SharedFrame`, so each worker reads the slices of its values from
+    shared memory instead of receiving a pickled copy of them. By default
+    each worker builds a single :class:`TimeSeriesFigure` covering every
+    branch and year of ``merged_df`` and redraws it for each value, so all
+    figures share axes and branch colours.
+
+    Args:
+        merged_df: Merged dataset created in exercise 2.
+        by: Column to split on, e.g. ``"Sigles"`` or ``"Tipus Estudi"``.
+        student_name: Identifier used in the output filenames.
+        max_workers: Maximum number of worker processes. Defaults to the CPU
+            count. With a single worker, figures are rendered in the current
+            process.
+        options: Rendering options; defaults to :class:`RenderOptions`'
+            defaults.
+
+    Returns:
+        The paths of the saved figures, ordered by value of ``by``.
+
+    Raises:
+        ValueError: If two values of ``by`` give the same filename, e.g.
+            ``"S/N"`` and ``"S N"``, so that one figure would overwrite the
+            other.
+    """
+    options = options or RenderOptions()
+    codes, values = pd.factorize(merged_df[by], sort=True)
+    names = [f"evolucio_{student_name}_{_slug(by)}_{_slug(v)}.png" for v in values]
+    counts = Counter(names)
+    clashes = [str(v) for v, name in zip(values, names) if counts[name] > 1]
+    if clashes:
+        raise ValueError(f"Values of {by!r} share a figure filename: {clashes}")
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(values) + 1))
+    rows = merged_df[[BRANCH_COL, YEAR_COL, *PLOT_COLUMNS]].take(order)
+    cache = _load_render_cache(IMG_DIR)
+
+    jobs = []
+    for i, (value, name) in enumerate(zip(values, names)):
+        jobs.append(
+            (
+                slice(bounds[i], bounds[i + 1]),
+                os.path.join(IMG_DIR, name),
+                f"{by}: {value}",
+                None if options.force else cache.get(name),
+            )
         )
-    ax1.set_title("Evolution of Dropout Rate by Branch")
-    ax1.set_xlabel("Academic Year")
-    ax1.set_ylabel("Dropout Rate (%)")
-    ax1.legend()
-    ax1.grid(True)
-    plt.setp(ax1.get_xticklabels(), rotation=45)
-
-    # Subplot 2: Performance
-    ax2 = plt.subplot(2, 1, 2)
-    for i, branch in enumerate(branches):
-        data = grouped[grouped["Branca"] == branch]
-        ax2.plot(
-            data["Curs Acadèmic"],
-            data["Rendiment mitjà (%)"],
-            label=branch,
-            color=colors[i % len(colors)],
+    template = None
+    if options.reuse_figure:
+        template = tuple(
+            pd.factorize(merged_df[col], sort=True)[1] for col in (BRANCH_COL, YEAR_COL)
         )
-    ax2.set_title("Evolution of Performance Rate by Branch")
-    ax2.set_xlabel("Academic Year")
-    ax2.set_ylabel("Performance Rate (%)")
-    ax2.legend()
-    ax2.grid(True)
-    plt.setp(ax2.get_xticklabels(), rotation=45)
-    plt.tight_layout()
-
-    # Save figure
-    src_dir = os.path.dirname(os.path.dirname(__file__))
-    img_dir = os.path.join(src_dir, "img")
-    os.makedirs(img_dir, exist_ok=True)
-    out_path = os.path.join(img_dir, f"evolucio_{student_name}.png")
-    plt.savefig(out_path, dpi=300)
-    plt.close()
-    print(f"Figure saved to {out_path}")
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    n_groups = max(1, min(max_workers, len(jobs)))
+    shares = np.array_split(np.arange(len(jobs)), n_groups)
+    if n_groups > 1:
+        # Workers attach to the sorted rows instead of unpickling their slices
+        with SharedFrame(rows) as shared, ProcessPoolExecutor(
+            max_workers=n_groups
+        ) as executor:
+            groups = [
+                (shared, [jobs[i] for i in share], template, options.max_points)
+                for share in shares
+            ]
+            results = [
+                r for group in executor.map(_render_group, groups) for r in group
+            ]
+    else:
+        results = _render_group((rows, jobs, template, options.max_points))
+    rendered = {os.path.basename(p): e for p, e in results if e is not None}
+    if rendered:
+        cache.update(rendered)
+        _save_render_cache(IMG_DIR, cache)
+    print(
+        f"{len(rendered)} figures saved to {IMG_DIR}, "
+        f"{len(results) - len(rendered)} unchanged"
+    )
+    return [path for path, _ in results]
+
+
+class TimeSeriesFigure:
+    """Two-panel dropout and performance figure whose artists are reused.
+
+    The figure, its axes, labels, grid and one line per branch are created
+    on the first :meth:`draw`. Every later :meth:`draw` only replaces the
+    lines' data, the axis limits, the legend and the titles, so a batch of
+    similar figures does not pay for building the layout each time.
+
+    Academic years given as labels are drawn at their positions in ``years``
+    with one tick per year, so every slice shares the same x axis.
+
+    Args:
+        branches: Branches with a line, in colour order. Defaults to the
+            branches of the first data drawn.
+        years: Academic years of the x axis, in order. Defaults to the
+            years of the first data drawn.
+        max_points: If set, draw at most this many points per series,
+            selected with :func:`lttb_indices`.
+    """
+
+    def __init__(
+        self,
+        branches: Optional[Sequence] = None,
+        years: Optional[Sequence] = None,
+        max_points: Optional[int] = None,
+    ):
+        self.branches = None if branches is None else pd.Index(branches)
+        self.years = None if years is None else pd.Index(years)
+        self.max_points = max_points
+        self.figure: Optional[Figure] = None
+        self.lines: List[List[Line2D]] = []
+
+    def settings(self) -> tuple:
+        """Return what, besides the data, determines the rendered image.
+
+        Returns:
+            The branches, years and downsampling target, as plain values.
+        """
+        return (
+            None if self.branches is None else list(self.branches),
+            None if self.years is None else list(self.years),
+            self.max_points,
+        )
+
+    def draw(self, grouped: IndexedDataset, subtitle: Optional[str] = None) -> None:
+        """Show per-year means on the figure, building it on first use.
+
+        Args:
+            grouped: Means per branch and year, as returned by
+                :meth:`IndexedDataset.yearly_means`.
+            subtitle: Text appended to both subplot titles.
+        """
+        if self.figure is None:
+            self._build(grouped)
+        numeric_years = pd.api.types.is_numeric_dtype(self.years)
+        suffix = f" ({subtitle})" if subtitle else ""
+        for ax, lines, column, (name, _) in zip(
+            self.figure.axes, self.lines, PLOT_COLUMNS, PANELS
+        ):
+            for branch, line in zip(self.branches, lines):
+                if branch not in grouped.branches:
+                    line.set_data([], [])
+                    line.set_visible(False)
+                    continue
+                data = grouped.branch(branch)
+                if numeric_years:
+                    x = data[YEAR_COL].to_numpy(np.float64)
+                else:
+                    x = self.years.get_indexer(data[YEAR_COL]).astype(np.float64)
+                line.set_data(
+                    *_downsample(x, data[column].to_numpy(np.float64), self.max_points)
+                )
+                line.set_visible(True)
+            ax.relim()
+            ax.autoscale_view()
+            ax.legend(handles=[line for line in lines if line.get_visible()])
+            ax.set_title(f"Evolution of {name} Rate by Branch{suffix}")
+        # tight_layout starts from the current margins, so start every draw
+        # from the defaults, as a new figure would
+        self.figure.subplots_adjust(
+            **{k: matplotlib.rcParams[f"figure.subplot.{k}"] for k in SUBPLOT_PARAMS}
+        )
+        self.figure.tight_layout()
+
+    def save(self, out_path: str) -> None:
+        """Save the figure as a PNG.
+
+        Args:
+            out_path: Destination file.
+        """
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        self.figure.savefig(out_path, dpi=DPI)
+
+    def close(self) -> None:
+        """Release the figure; the next :meth:`draw` builds a new one."""
+        if self.figure is not None:
+            self.figure = None
+            self.lines = []
+
+    def _build(self, grouped: IndexedDataset) -> None:
+        """Create the figure, axes and lines.
+
+        Args:
+            grouped: First data drawn, supplying the default branches and
+                years.
+        """
+        if self.branches is None:
+            self.branches = grouped.branches
+        if self.years is None:
+            self.years = grouped.years
+        colors = matplotlib.colormaps["tab10"].colors
+        self.figure = Figure(figsize=FIGSIZE)
+        FigureCanvasAgg(self.figure)
+        for row, (_, ylabel) in enumerate(PANELS):
+            ax = self.figure.add_subplot(2, 1, row + 1)
+            self.lines.append(
+                [
+                    ax.plot([], [], label=branch, color=colors[i % len(colors)])[0]
+                    for i, branch in enumerate(self.branches)
+                ]
+            )
+            ax.set_xlabel("Academic Year")
+            ax.set_ylabel(ylabel)
+            ax.grid(True)
+            if not pd.api.types.is_numeric_dtype(self.years):
+                ax.xaxis.set_major_locator(FixedLocator(np.arange(len(self.years))))
+                ax.xaxis.set_major_formatter(
+                    FixedFormatter([str(year) for year in self.years])
+                )
+            ax.tick_params(axis="x", labelrotation=45)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Select the points of a series to keep with largest-triangle-three-buckets.
+
+    The first and last points are always kept. The points in between are split
+    into ``max_points - 2`` buckets of consecutive points, and from each
+    bucket the point forming the largest triangle with the point kept from the
+    previous bucket and the average of the next bucket is kept, which
+    preserves the peaks and troughs a line plot shows.
+
+    Since each choice depends on the previous one, buckets are processed in
+    order. For narrow buckets (up to ``LTTB_TABLE_WIDTH`` points) the best
+    point of every bucket is first computed for each possible previous
+    choice, in a few array operations, and the chain of choices is then read
+    off that table; wider buckets are scanned one at a time.
+
+    Args:
+        x: Positions of the points, in increasing order.
+        y: Values of the points. Missing values are only kept from buckets
+            without any other point.
+        max_points: Number of points to keep; at least 3.
+
+    Returns:
+        The sorted indices of the kept points; all indices if the series has
+        at most ``max_points`` points.
+
+    Raises:
+        ValueError: If ``max_points`` is smaller than 3.
+    """
+    if max_points < 3:
+        raise ValueError("max_points must be at least 3")
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+
+    n_buckets = max_points - 2
+    # Bucket i holds points edges[i]..edges[i + 1] - 1 of the interior 1..n-2
+    edges = 1 + np.arange(n_buckets + 1) * (n - 2) // n_buckets
+    valid = ~np.isnan(y)
+    counts = np.add.reduceat(valid.astype(np.int64)[:-1], edges[:-1])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = np.add.reduceat(np.where(valid, x, 0.0)[:-1], edges[:-1]) / counts
+        mean_y = np.add.reduceat(np.where(valid, y, 0.0)[:-1], edges[:-1]) / counts
+    # The point after each bucket's candidates: the next bucket's average,
+    # or the last point for the last bucket
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    kept = np.empty(max_points, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    if np.diff(edges).max() <= LTTB_TABLE_WIDTH:
+        candidates, choices = _lttb_table(x, y, edges, next_x, next_y)
+        candidates, choices = candidates.tolist(), choices.tolist()
+        choice = 0
+        for i in range(n_buckets):
+            choice = choices[i][choice]
+            kept[i + 1] = candidates[i][choice]
+        return kept
+
+    previous = 0
+    for i in range(n_buckets):
+        start, stop = edges[i], edges[i + 1]
+        ax, ay = x[previous], y[previous]
+        areas = np.abs(
+            (ax - next_x[i]) * (y[start:stop] - ay)
+            - (ax - x[start:stop]) * (next_y[i] - ay)
+        )
+        previous = start + int(np.argmax(np.nan_to_num(areas, nan=-1.0)))
+        kept[i + 1] = previous
+    return kept
+
+
+def _lttb_table(
+    x: np.ndarray,
+    y: np.ndarray,
+    edges: np.ndarray,
+    next_x: np.ndarray,
+    next_y: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Find each LTTB bucket's best point for every possible previous choice.
+
+    Args:
+        x: Positions of the points.
+        y: Values of the points.
+        edges: Start of every bucket, and the end of the last one.
+        next_x: Position of the point after each bucket's candidates.
+        next_y: Value of the point after each bucket's candidates.
+
+    Returns:
+        The candidate indices of every bucket, padded to the widest bucket's
+        size with its last point, and, for every bucket and position of the
+        point chosen in the previous bucket (the first point, at position 0,
+        for the first bucket), the position of the point to choose.
+    """
+    width = int(np.diff(edges).max())
+    # Padding repeats the bucket's last point, which argmax never prefers
+    # over its first occurrence
+    candidates = np.minimum(edges[:-1, None] + np.arange(width), edges[1:, None] - 1)
+    bx, by = x[candidates], y[candidates]
+    prev_x = np.vstack([np.full(width, x[0]), bx[:-1]])[:, :, None]
+    prev_y = np.vstack([np.full(width, y[0]), by[:-1]])[:, :, None]
+
+    choices = np.empty(candidates.shape, dtype=np.int64)
+    step = max(1, LTTB_BATCH_ELEMENTS // width**2)
+    for lo in range(0, len(candidates), step):
+        rows = slice(lo, lo + step)
+        ax, ay = prev_x[rows], prev_y[rows]
+        areas = np.abs(
+            (ax - next_x[rows, None, None]) * (by[rows, None, :] - ay)
+            - (ax - bx[rows, None, :]) * (next_y[rows, None, None] - ay)
+        )
+        choices[rows] = np.argmax(np.nan_to_num(areas, nan=-1.0), axis=2)
+    return candidates, choices
+
+
+def _render_time_series(
+    merged_df: Union[pd.DataFrame, IndexedDataset],
+    out_path: str,
+    figure: "TimeSeriesFigure",
+    subtitle: Optional[str] = None,
+    cached: Optional[Dict[str, str]] = None,
+) -> Optional[Dict[str, str]]:
+    """Draw the dropout and performance time series by branch and save them.
+
+    Args:
+        merged_df: Rows to plot, or an already indexed dataset.
+        out_path: Destination PNG file.
+        figure: Figure to draw on; reused figures keep their artists.
+        subtitle: Text appended to both subplot titles, e.g. the slice shown.
+        cached: Render cache entry of ``out_path`` from a previous run; None
+            to render unconditionally.
+
+    Returns:
+        The new render cache entry, or None if the existing PNG was kept.
+    """
+    if not isinstance(merged_df, IndexedDataset):
+        merged_df = IndexedDataset(merged_df)
+    # Per-year means, indexed so each branch's rows are a slice
+    grouped = merged_df.yearly_means(PLOT_COLUMNS)
+    fingerprint = _plot_fingerprint(grouped.frame, subtitle, figure)
+    if _is_fresh(cached, fingerprint, out_path):
+        return None
+    figure.draw(grouped, subtitle)
+    figure.save(out_path)
+    return {"fingerprint": fingerprint, "png": artifacts.file_digest(out_path)}
+
+
+def _render_group(
+    group: Tuple[
+        Union[pd.DataFrame, SharedFrame],
+        List[Tuple[slice, str, str, Optional[Dict[str, str]]]],
+        Optional[Tuple[pd.Index, pd.Index]],
+        Optional[int],
+    ],
+) -> List[Tuple[str, Optional[Dict[str, str]]]]:
+    """Render a share of a batch; picklable worker for the pool.
+
+    Args:
+        group: The rows of the batch, sorted by value, or a shared frame of
+            them; the jobs (slice of the rows to plot, output path, subtitle
+            and render cache entry of the output, None to force the render);
+            the branches and years of the shared template figure (None for a
+            new figure per job) and the downsampling target.
+
+    Returns:
+        The output path and new render cache entry (None if kept) of each job.
+    """
+    rows, jobs, template, max_points = group
+    if isinstance(rows, SharedFrame):
+        rows = rows.to_frame()
+    shared = None if template is None else TimeSeriesFigure(*template, max_points)
+    results = []
+    for share, out_path, subtitle, cached in jobs:
+        figure = shared or TimeSeriesFigure(max_points=max_points)
+        results.append(
+            (
+                out_path,
+                _render_time_series(
+                    rows.iloc[share], out_path, figure, subtitle, cached
+                ),
+            )
+        )
+        if shared is None:
+            figure.close()
+    if shared is not None:
+        shared.close()
+    return results
+
+
+def _downsample(
+    x: np.ndarray, y: np.ndarray, max_points: Optional[int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce a series to ``max_points`` points if it is longer.
+
+    Args:
+        x: Positions of the points.
+        y: Values of the points.
+        max_points: Maximum number of points; None to keep them all.
+
+    Returns:
+        The kept positions and values.
+    """
+    if max_points is None or len(y) <= max_points:
+        return x, y
+    kept = lttb_indices(x, y, max_points)
+    return x[kept], y[kept]
+
+
+def _plot_fingerprint(
+    grouped: pd.DataFrame, subtitle: Optional[str], figure: "TimeSeriesFigure"
+) -> str:
+    """Fingerprint everything a rendered figure depends on.
+
+    Args:
+        grouped: The per-branch, per-year means being plotted.
+        subtitle: Subplot title suffix.
+        figure: Figure the data would be drawn on.
+
+    Returns:
+        A digest of the plotted values and labels, the figure's settings,
+        the source of this module and of the modules computing the plotted
+        values, and the matplotlib version.
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(grouped, index=False).to_numpy())
+    digest.update(repr(list(grouped.columns)).encode("utf-8"))
+    params = (subtitle, figure.settings(), FIGSIZE, DPI, matplotlib.__version__)
+    digest.update(repr(params).encode("utf-8"))
+    code = artifacts.code_version("visual_analysis", "indexed_dataset", "shared_frame")
+    digest.update(code.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _is_fresh(
+    cached: Optional[Dict[str, str]], fingerprint: str, out_path: str
+) -> bool:
+    """Whether ``out_path`` is the figure rendered for ``fingerprint``.
+
+    Args:
+        cached: Render cache entry of ``out_path``.
+        fingerprint: Fingerprint of the figure about to be rendered.
+        out_path: Existing PNG file.
+
+    Returns:
+        True if the entry matches and the PNG is the one it recorded.
+    """
+    return (
+        cached is not None
+        and cached.get("fingerprint") == fingerprint
+        and os.path.exists(out_path)
+        and cached.get("png") == artifacts.file_digest(out_path)
+    )
+
+
+def _load_render_cache(img_dir: str) -> Dict[str, Dict[str, str]]:
+    """Read the render cache of a figure folder.
+
+    Args:
+        img_dir: Folder holding the PNGs.
+
+    Returns:
+        The entries by PNG filename; empty if there is no readable cache.
+    """
+    try:
+        with open(os.path.join(img_dir, RENDER_CACHE_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_render_cache(img_dir: str, cache: Dict[str, Dict[str, str]]) -> None:
+    """Atomically write the render cache of a figure folder.
+
+    Args:
+        img_dir: Folder holding the PNGs.
+        cache: Entries by PNG filename.
+    """
+    path = os.path.join(img_dir, RENDER_CACHE_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _slug(value: object) -> str:
+    """Turn a dimension name or value into a filename fragment.
+
+    Args:
+        value: Name or value, e.g. ``"Tipus Estudi"`` or ``"S/N"``.
+
+    Returns:
+        The text with runs of other characters than letters, digits and
+        hyphens replaced by ``_``.
+    """
+    return re.sub(r"[^\w-]+", "_", str(value)).strip("_")
@@ -0,0 +1,18 @@
+"""Test case base shared by the tests that compare statistical reports."""
+
+import unittest
+
+
+class ReportTestCase(unittest.TestCase):
+    """Test case with a tolerant comparison of nested report dicts."""
+
+    def assert_reports_close(self, actual, expected):
+        """Compare two reports, allowing floating-point rounding differences."""
+        if isinstance(expected, dict):
+            self.assertEqual(list(actual), list(expected))
+            for key, value in expected.items():
+                self.assert_reports_close(actual[key], value)
+        elif isinstance(expected, float):
+            self.assertAlmostEqual(actual, expected, places=10)
+        else:
+            self.assertEqual(actual, expected)
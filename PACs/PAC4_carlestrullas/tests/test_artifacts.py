@@ -0,0 +1,78 @@
+"""Unit tests for the content-addressed stage artifact store."""
+
+import io
+import sys
+import tempfile
+import unittest
+from contextlib import ExitStack, redirect_stdout
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from src.modules import artifacts
+
+
+class ArtifactStoreTests(unittest.TestCase):
+    """Check stage keys, artifact reuse and invalidation."""
+
+    def setUp(self):
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        self.root = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        stack.enter_context(patch("src.modules.artifacts.print"))
+
+    def test_stage_key_depends_on_every_part(self):
+        """Changing any input fingerprint yields a different key."""
+        key = artifacts.stage_key("stage", "a", "b")
+
+        self.assertEqual(key, artifacts.stage_key("stage", "a", "b"))
+        self.assertNotEqual(key, artifacts.stage_key("stage", "a", "c"))
+        self.assertNotEqual(key, artifacts.stage_key("other", "a", "b"))
+        self.assertNotEqual(key, artifacts.stage_key("stage", "ab"))
+
+    def test_run_reuses_artifact_for_same_key(self):
+        """A second run with the same key loads the pickled result."""
+        store = artifacts.ArtifactStore(str(self.root))
+        func = MagicMock(return_value={"value": 42})
+
+        first = store.run("stage", "k1", func, 1)
+        second = store.run("stage", "k1", func, 1)
+        store.run("stage", "k2", func, 2)
+
+        self.assertEqual(first, second)
+        self.assertEqual(func.call_count, 2)
+        self.assertEqual([p.name for p in self.root.iterdir()], ["stage.k2.pkl"])
+
+    def test_run_replays_stage_output_on_reuse(self):
+        """A reused stage prints what it printed when it ran."""
+        store = artifacts.ArtifactStore(str(self.root))
+
+        def stage():
+            print("EDA summary")
+            return 42
+
+        first, second = io.StringIO(), io.StringIO()
+        with redirect_stdout(first):
+            store.run("stage", "k", stage)
+            self.assertIs(sys.stdout, first)
+        with redirect_stdout(second):
+            result = store.run("stage", "k", MagicMock())
+
+        self.assertEqual(result, 42)
+        self.assertEqual(first.getvalue(), "EDA summary\n")
+        self.assertEqual(second.getvalue(), "EDA summary\n")
+
+    def test_run_recomputes_forced_stage_or_missing_output(self):
+        """Forced stages and stages whose outputs vanished are rerun."""
+        func = MagicMock(return_value=None)
+        artifacts.ArtifactStore(str(self.root)).run("stage", "k", func)
+
+        artifacts.ArtifactStore(str(self.root), force=["stage"]).run("stage", "k", func)
+        artifacts.ArtifactStore(str(self.root)).run(
+            "stage", "k", func, outputs=[str(self.root / "missing.png")]
+        )
+
+        self.assertEqual(func.call_count, 3)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,118 @@
+"""Unit tests for the precomputed data cube."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from src.modules.data_cube import MEASURES, DataCube
+
+
+def make_frame(rows=400, seed=0):
+    """Build a merged-like frame with the seven dimensions and both measures."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "Curs Acadèmic": rng.choice(["2018-19", "2019-20", "2020-21"], rows),
+            "Tipus universitat": rng.choice(["Pública", "Privada"], rows),
+            "Sigles": rng.choice(["UB", "UAB", "UPC", "UdG"], rows),
+            "Tipus Estudi": rng.choice(["grau", "màster universitari"], rows),
+            "Branca": rng.choice(["Arts", "STEM", "Salut"], rows),
+            "Sexe": rng.choice(["DONA", "HOME"], rows),
+            "Integrat S/N": rng.choice(["Integrat", "Adscrit"], rows),
+            MEASURES[0]: rng.random(rows) * 20,
+            MEASURES[1]: 60 + rng.random(rows) * 40,
+        }
+    )
+    df.loc[::13, MEASURES[1]] = np.nan
+    return df
+
+
+class DataCubeTests(unittest.TestCase):
+    """Check cube queries against direct groupbys over the rows."""
+
+    def setUp(self):
+        self.df = make_frame()
+
+    def expected(self, df, by):
+        """Aggregate the rows directly, as the cube should."""
+        return df.groupby(by, observed=True)[MEASURES].agg(["mean", "std", "count"])
+
+    def assert_same(self, actual, expected):
+        """Compare query results, allowing rounding differences."""
+        self.assertTrue(actual.index.equals(expected.index))
+        self.assertEqual(list(actual.columns), list(expected.columns))
+        np.testing.assert_allclose(
+            actual.to_numpy(dtype=float), expected.to_numpy(dtype=float), rtol=1e-9
+        )
+
+    def test_query_matches_groupby(self):
+        """Grouped and filtered queries match the row-level aggregation."""
+        cube = DataCube.build(self.df)
+
+        self.assert_same(
+            cube.query(by=["Curs Acadèmic", "Branca"], where={"Sexe": "DONA"}),
+            self.expected(
+                self.df[self.df["Sexe"] == "DONA"], ["Curs Acadèmic", "Branca"]
+            ),
+        )
+        self.assert_same(
+            cube.query(by=["Sigles"], where={"Branca": ["Arts", "STEM"]}),
+            self.expected(
+                self.df[self.df["Branca"].isin(["Arts", "STEM"])], ["Sigles"]
+            ),
+        )
+
+    def test_query_follows_requested_level_order(self):
+        """Levels come back in the order of ``by``, not the cube's order."""
+        cube = DataCube.build(self.df)
+
+        result = cube.query(by=["Sexe", "Curs Acadèmic"])
+
+        self.assert_same(result, self.expected(self.df, ["Sexe", "Curs Acadèmic"]))
+
+    def test_overall_query_and_categorical_keys(self):
+        """An empty ``by`` gives one row; categorical keys give the same cube."""
+        cube = DataCube.build(self.df.astype({"Branca": "category"}))
+
+        overall = cube.query()
+        by_branch = cube.query(by=["Branca"], measures=[MEASURES[0]])
+
+        self.assertEqual(len(overall), 1)
+        self.assertAlmostEqual(
+            overall[(MEASURES[1], "mean")].iloc[0], self.df[MEASURES[1]].mean()
+        )
+        self.assertEqual(overall[(MEASURES[1], "count")].iloc[0], 369)
+        self.assertEqual(by_branch.index.tolist(), ["Arts", "STEM", "Salut"])
+        self.assertEqual(
+            list(by_branch.columns.get_level_values(0).unique()), [MEASURES[0]]
+        )
+
+    def test_configured_cuboids(self):
+        """Only the requested rollups are stored; queries still use them."""
+        cube = DataCube.build(self.df, cuboids=[["Branca", "Curs Acadèmic"]])
+
+        self.assertEqual(len(cube.cuboids), 2)
+        self.assert_same(cube.query(by=["Branca"]), self.expected(self.df, ["Branca"]))
+
+    def test_unknown_dimension(self):
+        """Querying a dimension outside the cube is an error."""
+        cube = DataCube.build(self.df, cuboids=[])
+
+        with self.assertRaises(KeyError):
+            cube.query(by=["Unitat"])
+
+    def test_save_and_load(self):
+        """A saved cube answers queries after loading."""
+        cube = DataCube.build(self.df)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "cube.pkl"
+            cube.save(str(path))
+            restored = DataCube.load(str(path))
+
+        self.assert_same(restored.query(by=["Sexe"]), cube.query(by=["Sexe"]))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Unit tests for the exploratory data analysis helpers."""
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from src.modules import eda
+
+
+class ProfileDatasetTests(unittest.TestCase):
+    """Check the single-pass profile against plain pandas statistics."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame(
+            {
+                "Branca": rng.choice(["Arts", "STEM", "Salut"], size=200),
+                "Sexe": pd.Categorical(rng.choice(["DONA", "HOME"], size=200)),
+                "Taxa rendiment": rng.random(200).round(2),
+                "Crèdits": rng.integers(0, 50, size=200),
+            }
+        )
+        self.df.loc[[3, 7], "Taxa rendiment"] = np.nan
+        self.df.loc[5, "Branca"] = None
+
+    def test_numeric_profile_matches_pandas(self):
+        """Counts, cardinality, moments and quantiles agree with pandas."""
+        profile = eda.profile_dataset(self.df)
+        numeric = self.df[["Taxa rendiment", "Crèdits"]]
+
+        stats = profile.numeric
+        self.assertEqual(stats["nulls"].tolist(), [2, 0])
+        self.assertEqual(stats["unique"].tolist(), numeric.nunique().tolist())
+        np.testing.assert_allclose(stats["mean"], numeric.mean())
+        np.testing.assert_allclose(stats["std"], numeric.std())
+        np.testing.assert_allclose(stats["min"], numeric.min())
+        np.testing.assert_allclose(stats["max"], numeric.max())
+        np.testing.assert_allclose(
+            stats[["25%", "50%", "75%"]].T, numeric.quantile([0.25, 0.5, 0.75])
+        )
+
+    def test_numeric_profile_counts_repeated_infinities_once(self):
+        """Repeated infinite values count as one distinct value."""
+        df = pd.DataFrame(
+            {"value": [1.0, np.inf, np.inf, 2.0, -np.inf, -np.inf, np.nan]}
+        )
+
+        profile = eda.profile_dataset(df)
+
+        self.assertEqual(profile.numeric["unique"].tolist(), [df["value"].nunique()])
+
+    def test_categorical_profile_reports_top_values(self):
+        """Top-k values are ordered by frequency and nulls are excluded."""
+        profile = eda.profile_dataset(self.df, top_k=2)
+        branca = profile.categorical.loc["Branca"]
+        expected = self.df["Branca"].value_counts().head(2)
+
+        self.assertEqual(branca["nulls"], 1)
+        self.assertEqual(branca["unique"], 3)
+        self.assertEqual(branca["top"], list(expected.items()))
+        self.assertEqual(profile.categorical.loc["Sexe", "count"], 200)
+
+    def test_sampling_is_reproducible(self):
+        """The same seed profiles the same sample."""
+        first = eda.profile_dataset(self.df, sample_size=50, seed=7)
+        second = eda.profile_dataset(self.df, sample_size=50, seed=7)
+
+        self.assertTrue(first.sampled)
+        self.assertEqual(first.n_rows, 200)
+        self.assertEqual(first.to_dict(), second.to_dict())
+
+    def test_show_eda_prints_and_returns_profile(self):
+        """show_eda prints the profile and returns it for further use."""
+        with patch("src.modules.eda.print") as mock_print, patch.object(
+            pd.DataFrame, "info"
+        ):
+            profile = eda.show_eda(self.df)
+
+        self.assertIsInstance(profile, eda.DatasetProfile)
+        self.assertIs(mock_print.call_args.args[0], profile)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,108 @@
+"""Unit tests for the branch/year indexed dataset."""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+from src.modules.indexed_dataset import IndexedDataset
+
+
+class IndexedDatasetTests(unittest.TestCase):
+    """Check slices and yearly means against mask scans and groupby."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame(
+            {
+                "Curs Acadèmic": rng.choice(["2018-19", "2019-20", "2020-21"], 300),
+                "Branca": rng.choice(["STEM", "Arts", "Salut"], 300),
+                "Abandonament mitjà (%)": rng.random(300) * 20,
+                "Rendiment mitjà (%)": rng.random(300) * 100,
+            }
+        )
+
+    def test_slices_match_masks(self):
+        """Branch and branch-year slices hold the rows a mask would select."""
+        data = IndexedDataset(self.df)
+
+        self.assertEqual(data.branches.tolist(), ["Arts", "STEM", "Salut"])
+        self.assertEqual(
+            data.branches.take(data.appearance_order).tolist(),
+            self.df["Branca"].unique().tolist(),
+        )
+        for branch in data.branches:
+            expected = self.df[self.df["Branca"] == branch]
+            rows = data.branch(branch)
+            self.assertEqual(len(rows), len(expected))
+            self.assertTrue(rows["Curs Acadèmic"].is_monotonic_increasing)
+            for year in data.years:
+                pd.testing.assert_frame_equal(
+                    data.branch_year(branch, year).reset_index(drop=True),
+                    expected[expected["Curs Acadèmic"] == year].reset_index(drop=True),
+                )
+
+    def test_yearly_means_match_groupby(self):
+        """Per branch-year means equal a groupby, skipping missing values."""
+        df = self.df.copy()
+        df.loc[::9, "Rendiment mitjà (%)"] = np.nan
+        df.loc[5, "Branca"] = np.nan
+        df.loc[6, "Curs Acadèmic"] = np.nan
+        columns = ["Abandonament mitjà (%)", "Rendiment mitjà (%)"]
+
+        yearly = IndexedDataset(df).yearly_means(columns)
+        expected = df.groupby(["Branca", "Curs Acadèmic"])[columns].mean()
+
+        self.assertEqual(len(yearly), len(expected))
+        np.testing.assert_allclose(yearly.frame[columns], expected, rtol=1e-12)
+        self.assertEqual(
+            list(zip(yearly.frame["Branca"], yearly.frame["Curs Acadèmic"])),
+            expected.index.tolist(),
+        )
+
+    def test_missing_keys_are_outside_group_slices(self):
+        """Rows without a branch are kept but belong to no branch slice."""
+        df = self.df.astype({"Branca": "category"})
+        df.loc[0, "Branca"] = np.nan
+
+        data = IndexedDataset(df)
+
+        self.assertEqual(len(data), len(df))
+        self.assertEqual(
+            sum(len(data.branch(branch)) for branch in data.branches), len(df) - 1
+        )
+        with self.assertRaises(KeyError):
+            data.branch("Unknown")
+
+    def test_sorted_input_is_not_reordered(self):
+        """Rows already in branch/year order keep their order."""
+        order = np.lexsort((self.df["Curs Acadèmic"], self.df["Branca"]))
+        df = self.df.take(order)
+
+        data = IndexedDataset(df)
+
+        np.testing.assert_array_equal(
+            data.values("Rendiment mitjà (%)"), df["Rendiment mitjà (%)"].to_numpy()
+        )
+        np.testing.assert_array_equal(
+            data.branch_values("Rendiment mitjà (%)"),
+            data.values("Rendiment mitjà (%)"),
+        )
+
+    def test_branch_values_keep_input_order(self):
+        """Branch slices of branch_values follow the input rows, not the years."""
+        df = self.df.copy()
+        df.loc[3, "Branca"] = np.nan
+
+        data = IndexedDataset(df)
+        values = data.branch_values("Abandonament mitjà (%)")
+
+        for branch in data.branches:
+            np.testing.assert_array_equal(
+                values[data.branch_slice(branch)],
+                df.loc[df["Branca"] == branch, "Abandonament mitjà (%)"].to_numpy(),
+            )
+        self.assertEqual(values[-1], df.loc[3, "Abandonament mitjà (%)"])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -1,9 +1,11 @@
 """Unit tests covering dataset loading workflows."""
 
+import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
+import openpyxl
 import pandas as pd
 from src.modules import load_data
 
@@ -24,6 +26,7 @@ class LoadDataTests(unittest.TestCase):
             Path(load_data.__file__).resolve().parents[2] / "data" / "custom.xlsx"
         )
         self.assertEqual(Path(mock_read.call_args[0][0]), data_dir)
+        self.assertEqual(mock_read.call_args[1], {"sheet_name": 0})
         self.assertIs(result, expected_df)
 
     def test_load_dataset_prompt_selection(self):
@@ -44,8 +47,146 @@ class LoadDataTests(unittest.TestCase):
             / "taxa_abandonament.xlsx"
         )
         self.assertEqual(Path(mock_read.call_args[0][0]), expected_path)
+        self.assertEqual(mock_read.call_args[1], {"sheet_name": 0})
         self.assertIs(result, selected_df)
 
+    def test_load_dataset_cache_skips_excel_parse(self):
+        """A second cached load reads the Feather copy instead of the workbook."""
+        with tempfile.TemporaryDirectory() as tmp:
+            workbook = Path(tmp) / "sample.xlsx"
+            expected_df = pd.DataFrame(
+                {"Branca": ["Arts", "STEM"], "value": [1.5, 2.5]}
+            )
+            expected_df.to_excel(workbook, index=False)
+
+            with patch("src.modules.load_data.print"), patch.object(
+                load_data, "CACHE_DIR", str(Path(tmp) / "cache")
+            ):
+                first = load_data.load_dataset(str(workbook), use_cache=True)
+                with patch.object(load_data.pd, "read_excel") as mock_read:
+                    second = load_data.load_dataset(str(workbook), use_cache=True)
+                mock_read.assert_not_called()
+
+        pd.testing.assert_frame_equal(first, expected_df)
+        pd.testing.assert_frame_equal(second, expected_df)
+
+    def test_clear_cache_invalidates_cached_workbook(self):
+        """Clearing the cache forces the next load to parse the workbook again."""
+        with tempfile.TemporaryDirectory() as tmp:
+            workbook = Path(tmp) / "sample.xlsx"
+            pd.DataFrame({"value": [1, 2]}).to_excel(workbook, index=False)
+
+            with patch("src.modules.load_data.print"), patch.object(
+                load_data, "CACHE_DIR", str(Path(tmp) / "cache")
+            ):
+                load_data.load_dataset(str(workbook), use_cache=True)
+                removed = load_data.clear_cache(str(workbook))
+                with patch.object(
+                    load_data.pd, "read_excel", wraps=load_data.pd.read_excel
+                ) as mock_read:
+                    load_data.load_dataset(str(workbook), use_cache=True)
+
+        self.assertEqual(removed, 1)
+        mock_read.assert_called_once()
+
+    def test_cache_keeps_same_named_workbooks_apart(self):
+        """Same-named workbooks in different folders keep separate copies."""
+        with tempfile.TemporaryDirectory() as tmp:
+            workbooks = [Path(tmp) / folder / "sample.xlsx" for folder in "ab"]
+            for value, workbook in enumerate(workbooks):
+                workbook.parent.mkdir()
+                pd.DataFrame({"value": [value]}).to_excel(workbook, index=False)
+
+            with patch("src.modules.load_data.print"), patch.object(
+                load_data, "CACHE_DIR", str(Path(tmp) / "cache")
+            ):
+                for workbook in workbooks:
+                    load_data.load_dataset(str(workbook), use_cache=True)
+                with patch.object(load_data.pd, "read_excel") as mock_read:
+                    cached = [
+                        load_data.load_dataset(str(workbook), use_cache=True)
+                        for workbook in workbooks
+                    ]
+                mock_read.assert_not_called()
+            cache_files = list((Path(tmp) / "cache").iterdir())
+
+        self.assertEqual([df["value"].tolist() for df in cached], [[0], [1]])
+        self.assertEqual(len(cache_files), 2)
+
+    def test_iter_dataset_yields_bounded_chunks(self):
+        """Streaming returns chunks of at most ``chunksize`` rows in order."""
+        expected_df = pd.DataFrame(
+            {"Branca": ["Arts", "STEM", "Arts", "STEM", "Salut"], "value": range(5)}
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            workbook = Path(tmp) / "sample.xlsx"
+            expected_df.to_excel(workbook, index=False)
+
+            with patch("src.modules.load_data.print"):
+                chunks = list(load_data.iter_dataset(str(workbook), chunksize=2))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected_df)
+
+    def test_optimize_dtypes_is_lossless(self):
+        """Dimensions become categoricals and floats only shrink when exact."""
+        df = pd.DataFrame(
+            {
+                "Branca": ["Arts", "STEM", "Arts"] * 100,
+                "Crèdits ordinaris superats": [60.0, 120.0, 30.0] * 100,
+                "Taxa rendiment": [0.1, 0.2, 0.3] * 100,
+                "Estudi": ["A", "B", "C"] * 100,
+            }
+        )
+
+        optimized = load_data.optimize_dtypes(df)
+        report = load_data.memory_report(df, optimized)
+
+        self.assertEqual(optimized["Branca"].dtype, "category")
+        self.assertEqual(optimized["Crèdits ordinaris superats"].dtype, "float32")
+        self.assertEqual(optimized["Taxa rendiment"].dtype, "float64")
+        self.assertEqual(optimized["Estudi"].dtype, object)
+        pd.testing.assert_frame_equal(
+            optimized.astype({"Branca": object, "Crèdits ordinaris superats": float}),
+            df,
+        )
+        self.assertIn("Total", report.index)
+        self.assertLess(
+            report.loc["Branca", "bytes_after"], report.loc["Branca", "bytes_before"]
+        )
+
+    def test_load_datasets_preserves_order_across_workers(self):
+        """Parallel loading returns workbooks and sheets in input order."""
+        with tempfile.TemporaryDirectory() as tmp:
+            first, second = Path(tmp) / "first.xlsx", Path(tmp) / "second.xlsx"
+            pd.DataFrame({"value": [1]}).to_excel(first, index=False)
+            pd.DataFrame({"value": [2]}).to_excel(second, sheet_name="A", index=False)
+            workbook = openpyxl.load_workbook(second)
+            workbook.create_sheet("B").append(["value"])
+            workbook["B"].append([3])
+            workbook.save(second)
+
+            with patch("src.modules.load_data.print"):
+                frames = load_data.load_datasets(
+                    [str(first), (str(second), "B"), (str(second), "A")],
+                    max_workers=2,
+                )
+
+        self.assertEqual([df.loc[0, "value"] for df in frames], [1, 3, 2])
+
+    def test_load_datasets_propagates_errors(self):
+        """A failing source raises its error in the caller."""
+        with tempfile.TemporaryDirectory() as tmp:
+            existing = Path(tmp) / "existing.xlsx"
+            pd.DataFrame({"value": [1]}).to_excel(existing, index=False)
+
+            with patch("src.modules.load_data.print"):
+                with self.assertRaises(FileNotFoundError):
+                    load_data.load_datasets(
+                        [str(existing), str(Path(tmp) / "missing.xlsx")],
+                        max_workers=2,
+                    )
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
@@ -1,60 +1,310 @@
 """Unit tests ensuring the PAC4 CLI orchestrator behaves as expected."""
 
+import io
+import json
+import os
+import subprocess
 import sys
+import tempfile
+import threading
 import unittest
-from contextlib import ExitStack
+from contextlib import ExitStack, redirect_stdout
+from pathlib import Path
 from unittest.mock import patch
 
 from src import main as pac4_main
+from src.modules import artifacts
+
+
+def load_performance():
+    """Picklable stand-in for the performance load, run in a worker process."""
+    return "perf"
+
+
+def load_abandonment():
+    """Picklable stand-in for the abandonment load, run in a worker process."""
+    return "aband"
 
 
 class MainModuleTests(unittest.TestCase):
     """Verify that CLI argument parsing triggers the right exercises."""
 
-    def test_main_runs_only_requested_exercises(self):
-        """Passing -ex 2 should execute only exercises 1 and 2."""
+    def setUp(self):
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        tmp = stack.enter_context(tempfile.TemporaryDirectory())
+        stack.enter_context(patch.object(artifacts, "ARTIFACT_DIR", tmp))
+        stack.enter_context(patch("src.modules.artifacts.print"))
+
+    def run_main(self, argv, workers=1, replacements=None):
+        """Run ``main`` with mocked stages and return the mocks by name.
+
+        ``replacements`` maps stage functions to stand-ins used instead of
+        mocks, e.g. picklable ones for the stages run in worker processes.
+        """
+        returns = {
+            "load_performance": "perf",
+            "load_abandonment": "aband",
+            "run_exercise_1": None,
+            "transform_performance": "perf_g",
+            "transform_abandonment": "aband_g",
+            "run_exercise_2": "merged",
+            "run_exercise_2_by_year": ("merged", "statistics"),
+            "run_exercise_3": None,
+            "run_exercise_4": None,
+        }
         with ExitStack() as stack:
-            ex1 = stack.enter_context(
-                patch.object(
-                    pac4_main, "run_exercise_1", return_value=("perf", "aband")
+            mocks = {
+                name: stack.enter_context(
+                    patch.object(pac4_main, name, return_value=value)
                 )
+                for name, value in returns.items()
+                if name not in (replacements or {})
+            }
+            for name, replacement in (replacements or {}).items():
+                stack.enter_context(patch.object(pac4_main, name, replacement))
+            stack.enter_context(
+                patch.object(sys, "argv", ["pac4", *argv, "--workers", str(workers)])
             )
-            ex2 = stack.enter_context(
-                patch.object(pac4_main, "run_exercise_2", return_value="merged")
-            )
-            ex3 = stack.enter_context(patch.object(pac4_main, "run_exercise_3"))
-            ex4 = stack.enter_context(patch.object(pac4_main, "run_exercise_4"))
-            stack.enter_context(patch.object(sys, "argv", ["pac4", "-ex", "2"]))
-
             pac4_main.main()
+        return mocks
+
+    def test_main_runs_only_requested_exercises(self):
+        """Passing -ex 2 should execute only exercises 1 and 2."""
+        mocks = self.run_main(["-ex", "2"])
 
-        self.assertEqual(ex1.call_count, 1)
-        self.assertEqual(ex2.call_count, 1)
-        ex2.assert_called_once_with("perf", "aband")
-        ex3.assert_not_called()
-        ex4.assert_not_called()
+        mocks["run_exercise_1"].assert_called_once_with("perf", "aband")
+        mocks["transform_performance"].assert_called_once_with("perf")
+        mocks["transform_abandonment"].assert_called_once_with("aband")
+        mocks["run_exercise_2"].assert_called_once_with("perf_g", "aband_g")
+        mocks["run_exercise_3"].assert_not_called()
+        mocks["run_exercise_4"].assert_not_called()
 
     def test_main_runs_all_exercises_by_default(self):
         """Without arguments, the CLI should run exercises 1 through 4."""
-        with ExitStack() as stack:
-            ex1 = stack.enter_context(
-                patch.object(
-                    pac4_main, "run_exercise_1", return_value=("perf", "aband")
-                )
+        mocks = self.run_main([])
+
+        mocks["load_performance"].assert_called_once_with()
+        mocks["load_abandonment"].assert_called_once_with()
+        mocks["run_exercise_1"].assert_called_once_with("perf", "aband")
+        mocks["run_exercise_2"].assert_called_once_with("perf_g", "aband_g")
+        mocks["run_exercise_3"].assert_called_once_with("merged", force_render=False)
+        mocks["run_exercise_4"].assert_called_once_with("merged", n_bootstrap=0)
+
+    def test_concurrent_run_matches_sequential_run(self):
+        """With several workers every stage still runs once, on its inputs."""
+        mocks = self.run_main(
+            [],
+            workers=4,
+            replacements={
+                "load_performance": load_performance,
+                "load_abandonment": load_abandonment,
+            },
+        )
+
+        for name in ("run_exercise_1", "run_exercise_2"):
+            self.assertEqual(mocks[name].call_count, 1)
+        mocks["run_exercise_3"].assert_called_once_with("merged", force_render=False)
+        mocks["run_exercise_4"].assert_called_once_with("merged", n_bootstrap=0)
+
+    def test_concurrent_run_prints_exercises_in_order(self):
+        """Exercise 3's output comes first even when exercise 4 ends first."""
+        report_done = threading.Event()
+
+        def run_exercise_3(_merged, force_render):
+            report_done.wait(timeout=5)
+            print(f"Exercise 3 (force_render={force_render})")
+
+        def run_exercise_4(_merged, n_bootstrap):
+            print(f"Exercise 4 (n_bootstrap={n_bootstrap})")
+            report_done.set()
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.run_main(
+                [],
+                workers=4,
+                replacements={
+                    "load_performance": load_performance,
+                    "load_abandonment": load_abandonment,
+                    "run_exercise_3": run_exercise_3,
+                    "run_exercise_4": run_exercise_4,
+                },
             )
-            ex2 = stack.enter_context(
-                patch.object(pac4_main, "run_exercise_2", return_value="merged")
+
+        self.assertTrue(report_done.is_set())
+        self.assertEqual(
+            out.getvalue(),
+            "Exercise 3 (force_render=False)\nExercise 4 (n_bootstrap=0)\n",
+        )
+
+    def test_main_reuses_unchanged_stages(self):
+        """A rerun with unchanged inputs skips the cached stages."""
+        self.run_main(["-ex", "2"])
+        mocks = self.run_main(["-ex", "2"])
+
+        for mock in mocks.values():
+            mock.assert_not_called()
+
+    def test_from_stage_reruns_later_stages_with_cached_inputs(self):
+        """--from-stage N reruns N onwards, fed by the cached earlier stages."""
+        self.run_main(["-ex", "2"])
+        mocks = self.run_main(["-ex", "2", "--from-stage", "2"])
+
+        mocks["load_performance"].assert_not_called()
+        mocks["run_exercise_1"].assert_not_called()
+        mocks["transform_performance"].assert_called_once_with("perf")
+        mocks["run_exercise_2"].assert_called_once_with("perf_g", "aband_g")
+
+    def test_force_reruns_every_stage(self):
+        """--force ignores every cached artifact."""
+        self.run_main(["-ex", "2"])
+        mocks = self.run_main(["-ex", "2", "--force"])
+
+        mocks["load_performance"].assert_called_once_with()
+        mocks["run_exercise_1"].assert_called_once_with("perf", "aband")
+        mocks["run_exercise_2"].assert_called_once_with("perf_g", "aband_g")
+
+    def test_bootstrap_option_reruns_report(self):
+        """--bootstrap N is passed to exercise 4 and invalidates its artifact."""
+        self.run_main([])
+        mocks = self.run_main(["--bootstrap", "500"])
+
+        mocks["run_exercise_3"].assert_not_called()
+        mocks["run_exercise_4"].assert_called_once_with("merged", n_bootstrap=500)
+
+    def test_force_render_reruns_plot_stage(self):
+        """--force-render reruns exercise 3 and asks it to redraw."""
+        self.run_main([])
+        mocks = self.run_main(["--force-render"])
+
+        mocks["run_exercise_1"].assert_not_called()
+        mocks["run_exercise_3"].assert_called_once_with("merged", force_render=True)
+        mocks["run_exercise_4"].assert_not_called()
+
+    def test_analysis_dependencies_invalidate_plot_and_report(self):
+        """Editing a module the plot and report use reruns exercises 3 and 4."""
+        file_digest = artifacts.file_digest
+        for module in ("indexed_dataset", "shared_frame"):
+            with self.subTest(module=module):
+                self.run_main([])
+                with patch.object(
+                    artifacts,
+                    "file_digest",
+                    lambda path, module=module: (
+                        "edited"
+                        if os.path.basename(path) == f"{module}.py"
+                        else file_digest(path)
+                    ),
+                ):
+                    mocks = self.run_main([])
+
+                mocks["run_exercise_2"].assert_not_called()
+                mocks["run_exercise_3"].assert_called_once()
+                mocks["run_exercise_4"].assert_called_once()
+
+    def test_partition_by_year_feeds_statistics_to_report(self):
+        """--partition-by-year replaces the transforms and merge with one stage."""
+        mocks = self.run_main(["--partition-by-year"])
+
+        mocks["run_exercise_2_by_year"].assert_called_once_with(
+            "perf", "aband", max_workers=1
+        )
+        for name in ("transform_performance", "run_exercise_2"):
+            mocks[name].assert_not_called()
+        mocks["run_exercise_3"].assert_called_once_with("merged", force_render=False)
+        mocks["run_exercise_4"].assert_called_once_with(
+            "merged", "statistics", n_bootstrap=0
+        )
+
+    def test_profile_records_every_stage(self):
+        """--profile times each stage that ran and can dump cProfile files."""
+        with ExitStack() as stack:
+            report_dir = stack.enter_context(tempfile.TemporaryDirectory())
+            stack.enter_context(patch.object(pac4_main, "REPORT_DIR", report_dir))
+            stack.enter_context(patch("src.main.print"))
+            mocks = self.run_main(
+                ["-ex", "2", "--profile", "--profile-dump"], workers=4
             )
-            ex3 = stack.enter_context(patch.object(pac4_main, "run_exercise_3"))
-            ex4 = stack.enter_context(patch.object(pac4_main, "run_exercise_4"))
-            stack.enter_context(patch.object(sys, "argv", ["pac4"]))
+            with open(os.path.join(report_dir, "profile.json"), encoding="utf-8") as f:
+                report = json.load(f)
+            prof_files = os.listdir(os.path.join(report_dir, "profile"))
 
-            pac4_main.main()
+        mocks["run_exercise_2"].assert_called_once_with("perf_g", "aband_g")
+        stages = [timing["name"] for timing in report["stages"]]
+        self.assertEqual(
+            sorted(stages),
+            sorted(pac4_main.EXERCISE_STAGES[1] + pac4_main.EXERCISE_STAGES[2]),
+        )
+        self.assertEqual(stages[-1], "exercise_2")
+        self.assertEqual(
+            report["argv"][:4], ["-ex", "2", "--profile", "--profile-dump"]
+        )
+        self.assertEqual(
+            sorted(prof_files),
+            sorted(f"{name}.prof" for name in stages),
+        )
+
+    def test_profile_runs_stages_of_warm_store(self):
+        """--profile times the stage work even when artifacts are current."""
+        self.run_main(["-ex", "2"])
+        with ExitStack() as stack:
+            report_dir = stack.enter_context(tempfile.TemporaryDirectory())
+            stack.enter_context(patch.object(pac4_main, "REPORT_DIR", report_dir))
+            stack.enter_context(patch("src.main.print"))
+            mocks = self.run_main(["-ex", "2", "--profile"])
+
+        mocks["load_performance"].assert_called_once_with()
+        mocks["run_exercise_1"].assert_called_once_with("perf", "aband")
+        mocks["run_exercise_2"].assert_called_once_with("perf_g", "aband_g")
+
+
+class StartupImportTests(unittest.TestCase):
+    """Guard the lazy-import structure that keeps CLI startup fast."""
+
+    project_root = Path(pac4_main.__file__).resolve().parents[1]
+
+    def imported_modules(self, code):
+        """Return the top-level packages imported by ``code`` and its time.
+
+        Runs ``code`` in a fresh interpreter with ``-X importtime`` and parses
+        the report written to stderr.
+        """
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=self.project_root,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        packages, total_us = set(), 0
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            if not cumulative.strip().isdigit():
+                continue
+            packages.add(name.strip().split(".")[0])
+            if not name.startswith("  "):
+                total_us += int(cumulative)
+        return packages, total_us
+
+    def test_importing_main_skips_heavy_dependencies(self):
+        """Importing the CLI (e.g. for --help) loads no analysis libraries."""
+        packages, total_us = self.imported_modules("import src.main")
+
+        self.assertFalse({"pandas", "numpy", "matplotlib", "scipy"} & packages)
+        self.assertLess(total_us / 1e6, 1.0)
+
+    def test_early_exercises_skip_plotting_and_stats_libraries(self):
+        """Exercises 1 and 2 never import matplotlib or scipy."""
+        packages, _ = self.imported_modules(
+            "from src import modules\n"
+            "modules.load_data, modules.eda, modules.transform_data"
+        )
 
-        self.assertEqual(ex1.call_count, 1)
-        ex2.assert_called_once_with("perf", "aband")
-        ex3.assert_called_once_with("merged")
-        ex4.assert_called_once_with("merged")
+        self.assertIn("pandas", packages)
+        self.assertFalse({"matplotlib", "scipy"} & packages)
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -0,0 +1,98 @@
+"""Unit tests for the year-partitioned map-reduce of exercises 2 and 4."""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+from report_assertions import ReportTestCase
+
+from src.modules import partitioned, statistical_analysis, transform_data
+from src.modules.load_data import optimize_dtypes
+
+DIMENSIONS = {
+    "Tipus universitat": ["PÚBLICA", "PRIVADA"],
+    "Sigles": ["UB", "UAB", "URL"],
+    "Tipus Estudi": ["grau", "màster universitari"],
+    "Branca": ["Arts", "Ciències", "Salut"],
+    "Integrat S/N": ["Integrat", "Adscrit"],
+}
+
+
+def make_raw(rows, years, value_col, seed, abandonment=False):
+    """Build a raw dataset with a few missing keys.
+
+    Only performance rows miss a year, since the report needs every merged
+    row to have one.
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"Curs Acadèmic": rng.choice(years, rows).astype(object)})
+    for col, values in DIMENSIONS.items():
+        df[col] = rng.choice(values, rows)
+    df["Sexe"] = rng.choice(["HOME", "DONA"], rows)
+    df[value_col] = rng.random(rows)
+    df.loc[::29, "Branca"] = np.nan
+    if not abandonment:
+        df.loc[::17, "Curs Acadèmic"] = np.nan
+    else:
+        df = df.rename(
+            columns={
+                new: old
+                for old, new in transform_data.ABANDONMENT_RENAMES.items()
+                if new in df.columns
+            }
+        )
+    return df
+
+
+class MergeByYearTests(ReportTestCase):
+    """Check that the partitioned path reproduces the serial one."""
+
+    def setUp(self):
+        (_, perf_value, _), (_, aband_value, _) = partitioned.TRANSFORMS
+        # 18-19 only has dropout rows and 21-22 only performance rows
+        self.df_perf = make_raw(800, ["19-20", "20-21", "21-22"], perf_value, 0)
+        self.df_aband = make_raw(
+            700, ["18-19", "19-20", "20-21"], aband_value, 1, abandonment=True
+        )
+
+    def serial(self, df_perf, df_aband):
+        """Run the serial exercise 2 and 4 computations."""
+        perf_g, aband_g = (
+            transform_data.transform_dataset(df, *spec)
+            for df, spec in zip((df_perf, df_aband), partitioned.TRANSFORMS)
+        )
+        merged = transform_data.merge_datasets_encoded(perf_g, aband_g)
+        return merged, statistical_analysis.build_report(merged)
+
+    def test_matches_serial_merge_and_report(self):
+        """Object and categorical inputs, in-process and in a pool."""
+        cases = [
+            (self.df_perf, self.df_aband),
+            (optimize_dtypes(self.df_perf), optimize_dtypes(self.df_aband)),
+        ]
+        for df_perf, df_aband in cases:
+            expected_merged, expected_report = self.serial(df_perf, df_aband)
+            for workers in (1, 2):
+                with self.subTest(dtype=df_perf["Sigles"].dtype, workers=workers):
+                    merged, statistics = partitioned.merge_by_year(
+                        df_perf, df_aband, max_workers=workers
+                    )
+                    pd.testing.assert_frame_equal(merged, expected_merged)
+                    self.assert_reports_close(statistics.report(), expected_report)
+
+    def test_report_from_partial_statistics(self):
+        """build_report takes the reduced statistics and adds the bootstrap."""
+        merged, statistics = partitioned.merge_by_year(
+            self.df_perf, self.df_aband, max_workers=1
+        )
+        report = statistical_analysis.build_report(
+            merged, n_bootstrap=20, statistics=statistics
+        )
+
+        self.assertEqual(report["intervalos_confianza"]["remuestreos"], 20)
+        del report["intervalos_confianza"]
+        self.assertEqual(report, statistics.report())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
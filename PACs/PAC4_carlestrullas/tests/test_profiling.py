@@ -0,0 +1,98 @@
+"""Unit tests for the opt-in profiling instrumentation."""
+
+import json
+import os
+import pstats
+import tempfile
+import unittest
+
+from src.modules.profiling import Profiler, profiled
+
+MIB = 1 << 20
+
+
+@profiled
+def allocate(size):
+    """Allocate and release ``size`` bytes, returning the size."""
+    block = bytearray(size)
+    return len(block)
+
+
+@profiled
+def allocate_twice(size):
+    """Call :func:`allocate` twice, then hold ``size`` bytes itself."""
+    allocate(size)
+    allocate(size)
+    block = bytearray(size)
+    return len(block)
+
+
+class ProfilerTests(unittest.TestCase):
+    """Check the recorded timings and memory peaks."""
+
+    def test_decorated_function_is_untouched_without_profiler(self):
+        """Outside a profiler the function just runs."""
+        profiler = Profiler()
+
+        self.assertEqual(allocate(10), 10)
+        self.assertEqual(allocate.__name__, "allocate")
+        self.assertEqual(profiler.report(), {"stages": [], "functions": []})
+
+    def test_stage_and_function_timings(self):
+        """Calls are added up per stage and peaks include nested calls."""
+        with Profiler() as profiler:
+            stage = profiler.wrap_stage("alloc", allocate_twice)
+            self.assertEqual(stage(MIB), MIB)
+            allocate(MIB)
+
+        self.assertEqual(len(profiler.stages), 1)
+        timing = profiler.stages[0]
+        self.assertEqual((timing.name, timing.stage, timing.calls), ("alloc", None, 1))
+        self.assertGreaterEqual(timing.wall_s, 0)
+        self.assertGreaterEqual(timing.peak_kib, 1024)
+        functions = {(t.stage, t.name): t for t in profiler.functions.values()}
+        self.assertEqual(
+            list(functions),
+            [
+                ("alloc", "test_profiling.allocate_twice"),
+                ("alloc", "test_profiling.allocate"),
+                (None, "test_profiling.allocate"),
+            ],
+        )
+        self.assertEqual(functions["alloc", "test_profiling.allocate"].calls, 2)
+        for t in functions.values():
+            self.assertGreaterEqual(t.peak_kib, 1024)
+            self.assertLess(t.peak_kib, 1.5 * 1024)
+
+    def test_failing_stage_is_still_recorded(self):
+        """An exception propagates after the stage timing is stored."""
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with Profiler() as profiler, self.assertRaises(RuntimeError):
+            profiler.wrap_stage("fail", fail)()
+        self.assertEqual([t.name for t in profiler.stages], ["fail"])
+
+    def test_dumps_and_saves_report(self):
+        """cProfile files are written per stage and the report is JSON."""
+        with tempfile.TemporaryDirectory() as tmp:
+            prof_dir = os.path.join(tmp, "prof")
+            with Profiler(prof_dir) as profiler:
+                profiler.wrap_stage("alloc", allocate_twice)(MIB)
+            path = os.path.join(tmp, "profile.json")
+            profiler.save(path, argv=["--profile"])
+
+            stats = pstats.Stats(os.path.join(prof_dir, "alloc.prof"))
+            self.assertTrue(
+                any(func[2] == "allocate" for func in stats.stats)  # type: ignore
+            )
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+        self.assertEqual(report["argv"], ["--profile"])
+        self.assertEqual(report["stages"][0]["name"], "alloc")
+        self.assertEqual(len(report["functions"]), 2)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,227 @@
+"""Unit tests for the dependency-graph stage scheduler."""
+
+import io
+import os
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from src.modules.scheduler import Pipeline, Stage
+
+
+def worker_pid():
+    """Return the id of the process running the stage."""
+    return os.getpid()
+
+
+def announce_load():
+    """Print from a worker process and return a value."""
+    print("load")
+    return 1
+
+
+def diamond(log=None):
+    """Build a ``load -> (left, right) -> join`` pipeline."""
+
+    def step(name, result):
+        def func(*args):
+            if log is not None:
+                log.append(name)
+            return result(*args)
+
+        return func
+
+    return Pipeline(
+        [
+            Stage("join", step("join", lambda a, b: a + b), ("a", "b"), ("total",)),
+            Stage("load", step("load", lambda: (1, 2)), (), ("x", "y")),
+            Stage("left", step("left", lambda x: x * 10), ("x",), ("a",)),
+            Stage("right", step("right", lambda y: y * 100), ("y",), ("b",)),
+            Stage("unrelated", step("unrelated", lambda: 0), (), ("z",)),
+        ]
+    )
+
+
+class PipelineTests(unittest.TestCase):
+    """Check the graph validation, subgraph selection and execution."""
+
+    def test_subgraph_follows_dependencies(self):
+        """Only the stages a target needs run, after their inputs."""
+        pipeline = diamond()
+
+        self.assertEqual(pipeline.subgraph(["left"]), ["load", "left"])
+        self.assertEqual(pipeline.subgraph(["join"]), ["load", "left", "right", "join"])
+        with self.assertRaises(KeyError):
+            pipeline.subgraph(["missing"])
+
+    def test_sequential_and_concurrent_runs_agree(self):
+        """Both modes produce every value of the needed stages."""
+        expected = {"x": 1, "y": 2, "a": 10, "b": 200, "total": 210}
+        for workers in (1, 4):
+            log = []
+            values = diamond(log).run(["join"], max_workers=workers)
+
+            self.assertEqual(values, expected)
+            self.assertEqual(sorted(log), ["join", "left", "load", "right"])
+            self.assertEqual((log[0], log[-1]), ("load", "join"))
+
+    def test_after_orders_stages_without_passing_values(self):
+        """A stage waits for its ``after`` stages and pulls them in."""
+        log = []
+        pipeline = Pipeline(
+            [
+                Stage("report", lambda: log.append("report")),
+                Stage("summary", lambda: log.append("summary"), after=("report",)),
+            ]
+        )
+
+        self.assertEqual(pipeline.subgraph(["summary"]), ["report", "summary"])
+        pipeline.run(["summary"], max_workers=2)
+        self.assertEqual(log, ["report", "summary"])
+
+    def test_independent_stages_run_at_the_same_time(self):
+        """Stages without a dependency between them overlap."""
+        barrier = threading.Barrier(2, timeout=5)
+        pipeline = Pipeline(
+            [
+                Stage("first", barrier.wait, (), ("first",)),
+                Stage("second", barrier.wait, (), ("second",)),
+            ]
+        )
+
+        # Each stage only returns once both are waiting at the barrier
+        values = pipeline.run(["first", "second"], max_workers=2)
+        self.assertEqual(sorted(values.values()), [0, 1])
+
+    def test_concurrent_output_is_printed_in_stage_order(self):
+        """Stages print as in a sequential run, whatever finishes first."""
+        fast_done = threading.Event()
+
+        def slow(_):
+            fast_done.wait(timeout=5)
+            print("slow")
+
+        def fast(_):
+            print("fast")
+            fast_done.set()
+
+        pipeline = Pipeline(
+            [
+                Stage("load", announce_load, (), ("x",), use_process=True),
+                Stage("slow", slow, ("x",)),
+                Stage("fast", fast, ("x",)),
+            ]
+        )
+        out = io.StringIO()
+        with redirect_stdout(out):
+            pipeline.run(["slow", "fast"], max_workers=2)
+
+        self.assertTrue(fast_done.is_set())
+        self.assertEqual(out.getvalue(), "load\nslow\nfast\n")
+
+    def test_main_thread_stages_run_alone(self):
+        """main_thread stages run in the calling thread, after the others."""
+        lock, active, seen = threading.Lock(), [0], {}
+
+        def work():
+            with lock:
+                active[0] += 1
+            threading.Event().wait(0.05)
+            with lock:
+                active[0] -= 1
+
+        def in_main():
+            seen["thread"] = threading.current_thread()
+            seen["active"] = active[0]
+            print("main")
+
+        pipeline = Pipeline(
+            [
+                Stage("main", in_main, main_thread=True),
+                Stage("first", work),
+                Stage("second", work),
+            ]
+        )
+        out = io.StringIO()
+        with redirect_stdout(out):
+            pipeline.run(["main", "first", "second"], max_workers=3)
+
+        self.assertIs(seen["thread"], threading.main_thread())
+        self.assertEqual(seen["active"], 0)
+        self.assertEqual(out.getvalue(), "main\n")
+
+    def test_failed_stage_output_is_printed(self):
+        """What a failing stage printed is shown before its error propagates."""
+
+        def fail():
+            print("partial")
+            raise RuntimeError("boom")
+
+        pipeline = Pipeline([Stage("fail", fail), Stage("other", lambda: None)])
+        out = io.StringIO()
+        with redirect_stdout(out), self.assertRaisesRegex(RuntimeError, "boom"):
+            pipeline.run(["fail", "other"], max_workers=2)
+        self.assertIn("partial\n", out.getvalue())
+
+    def test_process_stages_run_in_worker_processes(self):
+        """Stages marked use_process run outside the calling process."""
+        pipeline = Pipeline(
+            [
+                Stage("child", worker_pid, (), ("child",), use_process=True),
+                Stage("parent", worker_pid, (), ("parent",)),
+            ]
+        )
+
+        values = pipeline.run(["child", "parent"], max_workers=2)
+        self.assertNotEqual(values["child"], os.getpid())
+        self.assertEqual(values["parent"], os.getpid())
+        # The pool has no more workers than there are process stages
+        with patch(
+            "src.modules.scheduler.ProcessPoolExecutor", side_effect=ThreadPoolExecutor
+        ) as pool:
+            pipeline.run(["child", "parent"], max_workers=8)
+        pool.assert_called_once_with(1)
+        # A single worker never starts a process
+        values = pipeline.run(["child"], max_workers=1)
+        self.assertEqual(values["child"], os.getpid())
+
+    def test_stage_error_stops_the_run(self):
+        """The first failure propagates and dependants never run."""
+        ran = []
+
+        def fail():
+            raise RuntimeError("boom")
+
+        pipeline = Pipeline(
+            [
+                Stage("fail", fail, (), ("value",)),
+                Stage("after", ran.append, ("value",)),
+            ]
+        )
+        for workers in (1, 2):
+            with self.assertRaisesRegex(RuntimeError, "boom"):
+                pipeline.run(["after"], max_workers=workers)
+        self.assertEqual(ran, [])
+
+    def test_invalid_graphs_are_rejected(self):
+        """Duplicate names or outputs, missing inputs and cycles fail early."""
+
+        def noop(*args):
+            return args
+
+        invalid = [
+            [Stage("a", noop), Stage("a", noop)],
+            [Stage("a", noop, (), ("v",)), Stage("b", noop, (), ("v",))],
+            [Stage("a", noop, ("missing",))],
+            [Stage("a", noop, after=("missing",))],
+            [Stage("a", noop, ("v",), ("w",)), Stage("b", noop, ("w",), ("v",))],
+        ]
+        for stages in invalid:
+            with self.assertRaises(ValueError):
+                Pipeline(stages)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
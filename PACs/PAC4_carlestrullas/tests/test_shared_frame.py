@@ -0,0 +1,98 @@
+"""Unit tests for the shared-memory frames handed to process pools."""
+
+import os
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from src.modules.shared_frame import SharedFrame
+
+
+def make_frame():
+    """Build a frame with numeric, categorical, string and missing values."""
+    return pd.DataFrame(
+        {
+            "Branca": pd.Categorical(["Arts", "STEM", None, "Arts"]),
+            "Curs Acadèmic": ["2019-20", None, "2018-19", "2019-20"],
+            "Rendiment mitjà (%)": [85.0, np.nan, 82.5, 90.0],
+            "n": np.array([3, 1, 4, 1], dtype=np.int16),
+            "flag": [True, False, True, True],
+        },
+        index=[10, 11, 12, 13],
+    )
+
+
+def column_sum(shared, column):
+    """Sum a shared column in a worker, returning its process id too."""
+    return os.getpid(), float(np.nansum(shared.arrays()[column]))
+
+
+class SharedFrameTests(unittest.TestCase):
+    """Check the round trip, the views and the lifetime of the blocks."""
+
+    def test_to_frame_rebuilds_the_columns(self):
+        """Numeric columns keep their dtype; strings come back categorical."""
+        df = make_frame()
+        with SharedFrame(df) as shared:
+            result = shared.to_frame()
+
+            self.assertEqual(len(shared), 4)
+            pd.testing.assert_index_equal(result.index, pd.RangeIndex(4))
+            expected = df.assign(
+                **{"Curs Acadèmic": df["Curs Acadèmic"].astype("category")}
+            ).reset_index(drop=True)
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_columns_are_read_only_views_of_the_block(self):
+        """Unpickled handles read the same pages without copying them."""
+        with SharedFrame(make_frame()) as shared:
+            handle = pickle.loads(pickle.dumps(shared))
+            views = handle.arrays()
+            frame = handle.to_frame()
+
+            self.assertLess(len(pickle.dumps(shared)), 4096)
+            self.assertTrue(np.shares_memory(views["n"], shared.arrays()["n"]))
+            self.assertTrue(
+                np.shares_memory(
+                    frame["Rendiment mitjà (%)"].to_numpy(),
+                    views["Rendiment mitjà (%)"],
+                )
+            )
+            self.assertTrue(
+                np.shares_memory(frame["Branca"].cat.codes.to_numpy(), views["Branca"])
+            )
+            with self.assertRaises(ValueError):
+                views["n"][0] = 0
+
+    def test_close_unlinks_the_block(self):
+        """Closing in the creating process removes the block's name."""
+        shared = SharedFrame(make_frame())
+        shared.close()
+        shared.close()
+
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name=shared.name)
+
+    def test_workers_attach_to_the_block(self):
+        """Pool workers read the parent's values through the handle."""
+        df = make_frame()
+        with SharedFrame(df) as shared, ProcessPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(column_sum, [shared] * 2, ["n", "flag"]))
+
+        self.assertTrue(all(pid != os.getpid() for pid, _ in results))
+        self.assertEqual([total for _, total in results], [9.0, 3.0])
+
+    def test_empty_frames_and_duplicate_columns(self):
+        """Empty frames can be shared; ambiguous column names cannot."""
+        with SharedFrame(pd.DataFrame({"x": np.empty(0)})) as shared:
+            self.assertEqual(len(shared.to_frame()), 0)
+        with self.assertRaises(ValueError):
+            SharedFrame(pd.DataFrame([[1, 2]], columns=["x", "x"]))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
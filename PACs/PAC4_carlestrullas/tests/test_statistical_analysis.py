@@ -5,11 +5,14 @@ import unittest
 from pathlib import Path
 from unittest.mock import patch
 
+import numpy as np
 import pandas as pd
+from report_assertions import ReportTestCase
+from scipy.stats import linregress
 from src.modules import statistical_analysis
 
 
-class StatisticalAnalysisTests(unittest.TestCase):
+class StatisticalAnalysisTests(ReportTestCase):
     """Cover the JSON reporting workflow for statistical analysis."""
 
     def setUp(self):
@@ -48,6 +51,185 @@ class StatisticalAnalysisTests(unittest.TestCase):
         self.assertEqual(payload["analysis_metadata"]["num_registros"], 4)
         self.assertIn(payload["rankings"]["mejor_rendimiento"], {"Arts", "STEM"})
 
+    def test_branch_summary_matches_per_branch_series(self):
+        """Grouped statistics should equal the per-branch pandas results."""
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(
+            {
+                "Curs Acadèmic": rng.choice(["2018-19", "2019-20", "2020-21"], 500),
+                "Branca": rng.choice(["Arts", "STEM", "Salut", "Socials"], 500),
+                "Abandonament mitjà (%)": rng.random(500) * 20,
+                "Rendiment mitjà (%)": rng.random(500) * 100,
+            }
+        )
+        df.loc[::7, "Rendiment mitjà (%)"] = np.nan
+
+        summary = statistical_analysis.branch_summary(df)
+
+        self.assertEqual(summary.index.tolist(), df["Branca"].unique().tolist())
+        for branch, row in summary.iterrows():
+            branch_data = df[df["Branca"] == branch]
+            for prefix, col in (
+                ("abandon", "Abandonament mitjà (%)"),
+                ("perf", "Rendiment mitjà (%)"),
+            ):
+                self.assertEqual(row[f"{prefix}_mean"], branch_data[col].mean())
+                self.assertEqual(row[f"{prefix}_std"], branch_data[col].std())
+
+    def test_build_report_detects_trends(self):
+        """Per-year dropout slopes should classify each branch's trend."""
+        df = pd.DataFrame(
+            {
+                "Curs Acadèmic": ["2018-19", "2019-20", "2020-21"] * 3,
+                "Branca": ["Arts"] * 3 + ["STEM"] * 3 + ["Salut"] * 3,
+                "Abandonament mitjà (%)": [5.0, 6.0, 7.0, 9.0, 8.0, 7.0, 4.0, 4.0, 4.0],
+                "Rendiment mitjà (%)": [80.0, 81.0, 82.0] * 3,
+            }
+        )
+
+        report = statistical_analysis.build_report(df)
+
+        trends = {
+            branch: stats["tendencia_abandono"]
+            for branch, stats in report["analisis_por_rama"].items()
+        }
+        self.assertEqual(
+            trends, {"Arts": "increasing", "STEM": "decreasing", "Salut": "stable"}
+        )
+        self.assertEqual(report["rankings"]["mayor_abandono"], "STEM")
+        self.assertEqual(report["rankings"]["menor_abandono"], "Salut")
+
+    def test_trend_by_groups_matches_linregress(self):
+        """Batched regressions should agree with one linregress per group."""
+        rng = np.random.default_rng(1)
+        df = pd.DataFrame(
+            {
+                "Curs Acadèmic": rng.choice(["2018-19", "2019-20", "2020-21"], 300),
+                "Sigles": rng.choice(["UB", "UAB", "UPC"], 300),
+                "Sexe": rng.choice(["DONA", "HOME"], 300),
+                "Abandonament mitjà (%)": rng.random(300) * 20,
+            }
+        )
+
+        trends = statistical_analysis.trend_by_groups(df, ["Sigles", "Sexe"])
+
+        self.assertEqual(len(trends), 6)
+        self.assertEqual(
+            list(trends.columns),
+            ["Sigles", "Sexe", "n_years", "slope", "intercept", "r", "p_value"]
+            + ["tendencia"],
+        )
+        for _, row in trends.iterrows():
+            group = df[(df["Sigles"] == row["Sigles"]) & (df["Sexe"] == row["Sexe"])]
+            yearly = group.groupby("Curs Acadèmic")["Abandonament mitjà (%)"].mean()
+            expected = linregress(range(len(yearly)), yearly.tolist())
+            self.assertAlmostEqual(row["slope"], expected.slope)
+            self.assertAlmostEqual(row["intercept"], expected.intercept)
+            self.assertAlmostEqual(row["r"], expected.rvalue)
+            self.assertAlmostEqual(row["p_value"], expected.pvalue)
+
+    def test_trend_by_groups_short_series(self):
+        """Single-year groups have no fit and two-year groups fit exactly."""
+        df = pd.DataFrame(
+            {
+                "Curs Acadèmic": ["2018-19", "2019-20", "2018-19"],
+                "Sigles": ["UB", "UB", "UPC"],
+                "Abandonament mitjà (%)": [4.0, 6.0, 5.0],
+            }
+        )
+
+        trends = statistical_analysis.trend_by_groups(df, ["Sigles"]).set_index(
+            "Sigles"
+        )
+
+        self.assertEqual(trends.loc["UB", "slope"], 2.0)
+        self.assertEqual(trends.loc["UB", "p_value"], 0.0)
+        self.assertEqual(trends.loc["UB", "tendencia"], "increasing")
+        self.assertTrue(np.isnan(trends.loc["UPC", "slope"]))
+        self.assertEqual(trends.loc["UPC", "tendencia"], "stable")
+
+    def test_bootstrap_intervals_are_reproducible(self):
+        """Intervals depend on the seed, not the workers, and bracket estimates."""
+        rng = np.random.default_rng(2)
+        df = pd.DataFrame(
+            {
+                "Curs Acadèmic": rng.choice(["2018-19", "2019-20", "2020-21"], 400),
+                "Branca": rng.choice(["Arts", "STEM"], 400),
+                "Abandonament mitjà (%)": rng.random(400) * 20,
+                "Rendiment mitjà (%)": rng.random(400) * 100,
+            }
+        )
+
+        with patch.object(statistical_analysis, "BOOTSTRAP_BATCH_ELEMENTS", 40_000):
+            first = statistical_analysis.bootstrap_intervals(
+                df, 500, seed=3, max_workers=2
+            )
+            second = statistical_analysis.bootstrap_intervals(
+                df, 500, seed=3, max_workers=1
+            )
+        report = statistical_analysis.build_report(df)
+
+        self.assertEqual(first, second)
+        self.assertEqual(list(first["por_rama"]), ["Arts", "STEM"])
+        low, high = first["correlacion_abandono_rendimiento"]
+        corr = report["estadisticas_globales"]["correlacion_abandono_rendimiento"]
+        self.assertLess(low, corr)
+        self.assertLess(corr, high)
+        for branch, intervals in first["por_rama"].items():
+            low, high = intervals["abandono_medio"]
+            mean = report["analisis_por_rama"][branch]["abandono"]["mean"]
+            self.assertLess(low, mean)
+            self.assertLess(mean, high)
+
+    def test_report_includes_bootstrap_only_when_requested(self):
+        """The default report is unchanged; n_bootstrap adds the intervals."""
+        df = pd.DataFrame(
+            {
+                "Curs Acadèmic": ["2018-19", "2019-20"] * 4,
+                "Branca": ["Arts"] * 4 + ["STEM"] * 4,
+                "Abandonament mitjà (%)": [5.0, 4.0, 6.0, 3.0, 7.0, 6.0, 8.0, 5.0],
+                "Rendiment mitjà (%)": [85.0, 86.0, 84.0, 88.0, 82.0, 83.0, 80.0, 84.0],
+            }
+        )
+
+        self.assertNotIn("intervalos_confianza", statistical_analysis.build_report(df))
+        report = statistical_analysis.build_report(df, n_bootstrap=50)
+        self.assertEqual(report["intervalos_confianza"]["remuestreos"], 50)
+        self.assertEqual(
+            set(report["intervalos_confianza"]["por_rama"]), {"Arts", "STEM"}
+        )
+
+    def test_online_statistics_match_in_memory_report(self):
+        """Chunked and merged accumulators rebuild the in-memory report."""
+        rng = np.random.default_rng(4)
+        df = pd.DataFrame(
+            {
+                "Curs Acadèmic": rng.choice(["2018-19", "2019-20", "2020-21"], 600),
+                "Branca": rng.choice(["Arts", "STEM", "Salut"], 600),
+                "Abandonament mitjà (%)": rng.random(600) * 20,
+                "Rendiment mitjà (%)": 60 + rng.random(600) * 40,
+            }
+        )
+        df.loc[::11, ["Abandonament mitjà (%)", "Rendiment mitjà (%)"]] = np.nan
+        expected = statistical_analysis.build_report(df)
+
+        chunked = statistical_analysis.OnlineStatistics()
+        for start in range(0, len(df), 128):
+            chunked.update(df.iloc[start : start + 128])
+        partials = [
+            statistical_analysis.OnlineStatistics().update(part)
+            for part in (df.iloc[:250], df.iloc[250:400], df.iloc[400:])
+        ]
+        merged = partials[0].merge(partials[1]).merge(partials[2])
+
+        self.assert_reports_close(chunked.report(), expected)
+        self.assert_reports_close(merged.report(), expected)
+
+    def test_online_statistics_require_data(self):
+        """An empty accumulator has no report."""
+        with self.assertRaises(ValueError):
+            statistical_analysis.OnlineStatistics().report()
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
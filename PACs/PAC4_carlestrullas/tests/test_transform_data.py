@@ -1,7 +1,10 @@
 """Unit tests for the data transformation helpers."""
 
+import tempfile
 import unittest
+from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from src.modules import transform_data
 
@@ -70,6 +73,101 @@ class TransformDataTests(unittest.TestCase):
         self.assertAlmostEqual(grouped.loc[0, "Mitjana"], 85.0, places=3)
         self.assertEqual(list(grouped.columns)[-1], "Mitjana")
 
+    def test_group_by_branch_with_categorical_keys_matches_object_keys(self):
+        """Categorical keys yield the same sorted, observed-only groups."""
+        df = pd.DataFrame(
+            {
+                "Curs Acadèmic": ["2020-21", "2019-20", "2020-21"],
+                "Tipus universitat": ["P", "P", "P"],
+                "Sigles": ["UPC", "UB", "UB"],
+                "Tipus Estudi": ["G", "G", "G"],
+                "Branca": ["STEM", "Arts", "STEM"],
+                "Sexe": ["D", "H", "D"],
+                "Integrat S/N": ["S", "S", "S"],
+                "Valor": [80.0, 90.0, 70.0],
+            }
+        )
+        keys = [c for c in df.columns if c != "Valor"]
+
+        expected = transform_data.group_by_branch(df, "Valor", "Mitjana")
+        grouped = transform_data.group_by_branch(
+            df.astype({c: "category" for c in keys}), "Valor", "Mitjana"
+        )
+
+        pd.testing.assert_frame_equal(
+            grouped.astype({c: object for c in keys}), expected
+        )
+
+    def test_transform_dataset_matches_chained_steps(self):
+        """The fused transform equals harmonize -> drop -> group chained."""
+        df = pd.DataFrame(
+            {
+                "Curs Acadèmic": ["2019-20", "2019-20", "2020-21", "2019-20"],
+                "Naturalesa universitat responsable": ["P", "P", "P", "P"],
+                "Universitat responsable": ["UPC", "UPC", "UPC", "UB"],
+                "Sigles": ["UPC", "UPC", "UPC", "UB"],
+                "Unitat": ["A", "B", "A", "C"],
+                "Tipus Estudi": ["G", "G", "G", "G"],
+                "Branca": ["STEM", "STEM", "STEM", None],
+                "Sexe Alumne": ["D", "D", "H", "D"],
+                "Tipus de centre": ["S", "S", "S", "S"],
+                "% Abandonament a primer curs": [0.1, 0.3, 0.2, 0.4],
+            }
+        )
+
+        fused = transform_data.transform_dataset(
+            df, "abandonment", "% Abandonament a primer curs", "Mitjana"
+        )
+        chained = transform_data.group_by_branch(
+            transform_data.drop_unnecessary_columns(
+                transform_data.harmonize_abandonment_columns(df), "abandonment"
+            ),
+            "% Abandonament a primer curs",
+            "Mitjana",
+        )
+
+        pd.testing.assert_frame_equal(fused, chained)
+        self.assertEqual(len(fused), 3)
+
+    def test_incremental_aggregator_matches_full_recompute(self):
+        """Year-by-year updates, resumed from disk, equal one full groupby."""
+        rng = np.random.default_rng(1)
+        size = 300
+        df = pd.DataFrame(
+            {
+                "Curs Acadèmic": rng.choice(["19-20", "20-21", "21-22"], size),
+                "Tipus universitat": rng.choice(["PÚBLICA", "PRIVADA"], size),
+                "Sigles": rng.choice(["UB", "UPC", "UAB"], size),
+                "Tipus Estudi": rng.choice(["grau", "màster"], size),
+                "Branca": rng.choice(["Arts", "STEM", None], size),
+                "Sexe": rng.choice(["DONA", "HOME"], size),
+                "Integrat S/N": rng.choice(["Integrat", "Adscrit"], size),
+                "Valor": rng.random(size),
+            }
+        )
+        df.loc[::17, "Valor"] = np.nan
+        years = sorted(df["Curs Acadèmic"].unique())
+        categorical = df.astype({c: "category" for c in transform_data.GROUP_COLS})
+
+        for frame in (df, categorical):
+            with self.subTest(dtype=frame["Sigles"].dtype):
+                aggregator = transform_data.IncrementalBranchAggregator(
+                    "Valor", "Mitjana"
+                )
+                aggregator.update(frame[frame["Curs Acadèmic"] != years[-1]])
+                with tempfile.TemporaryDirectory() as tmp:
+                    state_path = str(Path(tmp) / "state.pkl")
+                    aggregator.save(state_path)
+                    resumed = transform_data.IncrementalBranchAggregator.load(
+                        state_path
+                    )
+                resumed.update(frame[frame["Curs Acadèmic"] == years[-1]])
+
+                pd.testing.assert_frame_equal(
+                    resumed.result(),
+                    transform_data.group_by_branch(frame, "Valor", "Mitjana"),
+                )
+
     def test_merge_datasets_inner_join_only_matches_rows(self):
         """Merge keeps only the intersection of shared grouping keys."""
         shared = {
@@ -90,6 +188,49 @@ class TransformDataTests(unittest.TestCase):
         self.assertIn("Rendiment mitjà (%)", merged.columns)
         self.assertIn("Abandonament mitjà (%)", merged.columns)
 
+    def test_merge_datasets_encoded_is_identical_to_merge(self):
+        """The integer-key join reproduces pd.merge rows, order and columns."""
+        rng = np.random.default_rng(2)
+
+        def frame(size, value_col):
+            return pd.DataFrame(
+                {
+                    "Curs Acadèmic": rng.choice(["19-20", "20-21"], size),
+                    "Tipus universitat": rng.choice(["PÚBLICA", "PRIVADA"], size),
+                    "Sigles": rng.choice(["UB", "UPC", None], size),
+                    "Tipus Estudi": rng.choice(["grau", "màster"], size),
+                    "Branca": rng.choice(["Arts", "STEM"], size),
+                    "Sexe": rng.choice(["DONA", "HOME"], size),
+                    "Integrat S/N": rng.choice(["Integrat", "Adscrit"], size),
+                    "Unitat": rng.choice(["A", "B"], size),
+                    value_col: rng.random(size),
+                }
+            )
+
+        perf, aband = frame(120, "Rendiment"), frame(90, "Abandonament")
+        expected = transform_data.merge_datasets(perf, aband)
+
+        pd.testing.assert_frame_equal(
+            transform_data.merge_datasets_encoded(perf, aband), expected
+        )
+        categorical = {c: "category" for c in transform_data.GROUP_COLS}
+        pd.testing.assert_frame_equal(
+            transform_data.merge_datasets_encoded(
+                perf.astype(categorical), aband.astype(categorical)
+            ),
+            transform_data.merge_datasets(
+                perf.astype(categorical), aband.astype(categorical)
+            ),
+        )
+        self.assertIn("Unitat_x", expected.columns)
+        # Empty sides, with keys categorical on the left only
+        left = perf.astype(categorical)
+        for df_perf, df_aband in ((left, aband.iloc[:0]), (left.iloc[:0], aband)):
+            pd.testing.assert_frame_equal(
+                transform_data.merge_datasets_encoded(df_perf, df_aband),
+                transform_data.merge_datasets(df_perf, df_aband),
+            )
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
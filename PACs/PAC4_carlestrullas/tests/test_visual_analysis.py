@@ -1,11 +1,41 @@
 """Unit tests asserting the visualization module emits expected files."""
 
+import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
+import numpy as np
 import pandas as pd
 from src.modules import visual_analysis
+from src.modules.indexed_dataset import IndexedDataset
+
+
+def reference_lttb(x, y, max_points):
+    """Textbook largest-triangle-three-buckets, one point at a time."""
+    n = len(x)
+    bucket_size = (n - 2) / (max_points - 2)
+    kept, previous = [0], 0
+    for i in range(max_points - 2):
+        start = int(i * bucket_size) + 1
+        stop = int((i + 1) * bucket_size) + 1
+        next_stop = min(int((i + 2) * bucket_size) + 1, n - 1)
+        if i == max_points - 3:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        else:
+            avg_x = sum(x[stop:next_stop]) / (next_stop - stop)
+            avg_y = sum(y[stop:next_stop]) / (next_stop - stop)
+        best, best_area = start, -1.0
+        for j in range(start, stop):
+            area = abs(
+                (x[previous] - avg_x) * (y[j] - y[previous])
+                - (x[previous] - x[j]) * (avg_y - y[previous])
+            )
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        previous = best
+    return kept + [n - 1]
 
 
 class VisualAnalysisTests(unittest.TestCase):
@@ -36,6 +66,239 @@ class VisualAnalysisTests(unittest.TestCase):
         self.assertTrue(output_path.exists(), "Expected PNG output was not created")
         output_path.unlink()
 
+    def test_plot_time_series_batch_renders_one_png_per_value(self):
+        """Batch plotting should save one figure per value, in any worker mode."""
+        df = pd.DataFrame(
+            {
+                "Sigles": ["UPC", "UB", "UPC", "UB", "UdG", "UdG"],
+                "Branca": ["Arts", "Arts", "STEM", "STEM", "Arts", "Arts"],
+                "Curs Acadèmic": ["2018-19", "2019-20"] * 3,
+                "Abandonament mitjà (%)": [5.0, 4.5, 7.0, 6.5, 3.0, 2.5],
+                "Rendiment mitjà (%)": [85.0, 86.0, 82.0, 83.0, 90.0, 91.0],
+            }
+        )
+
+        for workers, reuse in ((1, True), (2, True), (1, False)):
+            with tempfile.TemporaryDirectory() as tmp, patch.object(
+                visual_analysis, "IMG_DIR", tmp
+            ), patch("src.modules.visual_analysis.print"):
+                paths = visual_analysis.plot_time_series_batch(
+                    df,
+                    "Sigles",
+                    student_name="unittest",
+                    max_workers=workers,
+                    options=visual_analysis.RenderOptions(reuse_figure=reuse),
+                )
+
+                self.assertEqual(
+                    [Path(path).name for path in paths],
+                    [
+                        "evolucio_unittest_Sigles_UB.png",
+                        "evolucio_unittest_Sigles_UPC.png",
+                        "evolucio_unittest_Sigles_UdG.png",
+                    ],
+                )
+                self.assertTrue(all(Path(path).exists() for path in paths))
+
+    def test_plot_time_series_batch_rejects_clashing_filenames(self):
+        """Values that slug to the same filename raise instead of overwriting."""
+        df = pd.DataFrame(
+            {
+                "Integrat S/N": ["S/N", "S N", "S/N", "S N"],
+                "Branca": ["Arts", "Arts", "STEM", "STEM"],
+                "Curs Acadèmic": ["2018-19", "2019-20", "2018-19", "2019-20"],
+                "Abandonament mitjà (%)": [5.0, 4.5, 7.0, 6.5],
+                "Rendiment mitjà (%)": [85.0, 86.0, 82.0, 83.0],
+            }
+        )
+
+        with tempfile.TemporaryDirectory() as tmp, patch.object(
+            visual_analysis, "IMG_DIR", tmp
+        ), patch("src.modules.visual_analysis.print"):
+            with self.assertRaisesRegex(ValueError, "S N"):
+                visual_analysis.plot_time_series_batch(
+                    df, "Integrat S/N", max_workers=1
+                )
+            self.assertEqual(list(Path(tmp).iterdir()), [])
+
+    def test_unchanged_figure_is_not_rendered_again(self):
+        """The render cache skips figures whose data and PNG are unchanged."""
+        df = pd.DataFrame(
+            {
+                "Branca": ["Arts", "Arts", "STEM", "STEM"],
+                "Curs Acadèmic": ["2018-19", "2019-20", "2018-19", "2019-20"],
+                "Abandonament mitjà (%)": [5.0, 4.5, 7.0, 6.5],
+                "Rendiment mitjà (%)": [85.0, 86.0, 82.0, 83.0],
+            }
+        )
+
+        with tempfile.TemporaryDirectory() as tmp, patch.object(
+            visual_analysis, "IMG_DIR", tmp
+        ), patch("src.modules.visual_analysis.print"):
+            output_path = Path(tmp) / "evolucio_unittest.png"
+
+            def render_count(data, **kwargs):
+                figure_class = visual_analysis.TimeSeriesFigure
+                with patch.object(
+                    figure_class, "save", autospec=True, side_effect=figure_class.save
+                ) as save:
+                    visual_analysis.plot_time_series_by_branch(
+                        data, student_name="unittest", **kwargs
+                    )
+                return save.call_count
+
+            self.assertEqual(render_count(df), 1)
+            self.assertEqual(render_count(df), 0)
+            self.assertEqual(render_count(df, force=True), 1)
+
+            changed = df.assign(**{"Rendiment mitjà (%)": [85.0, 86.0, 82.0, 84.0]})
+            self.assertEqual(render_count(changed), 1)
+
+            # A PNG edited or replaced outside the cache is redrawn
+            output_path.write_bytes(b"not the rendered figure")
+            self.assertEqual(render_count(changed), 1)
+            self.assertEqual(render_count(changed), 0)
+
+
+class TimeSeriesFigureTests(unittest.TestCase):
+    """Check that a reused figure matches a newly built one."""
+
+    def setUp(self):
+        self.df = pd.DataFrame(
+            {
+                "Sigles": ["UB"] * 4 + ["UdG"] * 2,
+                "Branca": ["Arts", "Arts", "STEM", "STEM", "STEM", "STEM"],
+                "Curs Acadèmic": ["2018-19", "2019-20"] * 3,
+                "Abandonament mitjà (%)": [5.0, 4.5, 7.0, 6.5, 30.0, 2.5],
+                "Rendiment mitjà (%)": [85.0, 86.0, 82.0, 83.0, 90.0, 91.0],
+            }
+        )
+
+    def grouped(self, sigles):
+        """Per-year means of one university."""
+        rows = self.df[self.df["Sigles"] == sigles]
+        return IndexedDataset(rows).yearly_means(visual_analysis.PLOT_COLUMNS)
+
+    def state(self, figure):
+        """Everything drawn on the figure that depends on the data."""
+        return [
+            (
+                ax.get_title(),
+                ax.get_xlim(),
+                ax.get_ylim(),
+                [t.get_text() for t in ax.get_legend().get_texts()],
+                [
+                    (line.get_visible(), list(line.get_xdata()), list(line.get_ydata()))
+                    for line in ax.get_lines()
+                ],
+            )
+            for ax in figure.figure.axes
+        ]
+
+    def test_redraw_matches_new_figure(self):
+        """Redrawing a slice leaves no trace of the previous one."""
+        branches, years = ["Arts", "STEM"], ["2018-19", "2019-20"]
+        reused = visual_analysis.TimeSeriesFigure(branches, years)
+        reused.draw(self.grouped("UB"), "UB")
+        reused.draw(self.grouped("UdG"), "UdG")
+        fresh = visual_analysis.TimeSeriesFigure(branches, years)
+        fresh.draw(self.grouped("UdG"), "UdG")
+        try:
+            self.assertEqual(self.state(reused), self.state(fresh))
+            self.assertEqual(self.state(reused)[0][3], ["STEM"])
+            self.assertEqual(
+                reused.figure.subplotpars.__dict__, fresh.figure.subplotpars.__dict__
+            )
+        finally:
+            reused.close()
+            fresh.close()
+
+
+class LttbTests(unittest.TestCase):
+    """Check the vectorized LTTB selection."""
+
+    def test_matches_reference_implementation(self):
+        """The selected indices match the textbook algorithm."""
+        rng = np.random.default_rng(0)
+        x = np.cumsum(rng.random(1000) + 0.1)
+        y = np.cumsum(rng.normal(size=1000))
+        for max_points in (3, 10, 97, 500):
+            np.testing.assert_array_equal(
+                visual_analysis.lttb_indices(x, y, max_points),
+                reference_lttb(list(x), list(y), max_points),
+            )
+
+    def test_keeps_endpoints_and_spikes(self):
+        """The first, last and extreme points survive the downsampling."""
+        y = np.zeros(1001)
+        y[[123, 700]] = [50.0, -40.0]
+        kept = visual_analysis.lttb_indices(np.arange(1001), y, 20)
+
+        self.assertEqual(len(kept), 20)
+        self.assertEqual((kept[0], kept[-1]), (0, 1000))
+        self.assertIn(123, kept)
+        self.assertIn(700, kept)
+
+    def test_short_series_and_missing_values(self):
+        """Short series are untouched and missing values are avoided."""
+        np.testing.assert_array_equal(
+            visual_analysis.lttb_indices(np.arange(5), np.ones(5), 5), np.arange(5)
+        )
+        y = np.arange(100, dtype=float)
+        y[1:50] = np.nan
+        kept = visual_analysis.lttb_indices(np.arange(100), y, 10)
+        self.assertFalse(np.isnan(y[kept[kept > 50]]).any())
+        with self.assertRaises(ValueError):
+            visual_analysis.lttb_indices(np.arange(5), np.ones(5), 2)
+
+    def test_plot_with_max_points(self):
+        """Long yearly series are drawn downsampled to ``max_points``."""
+        years = [f"{year}-{(year + 1) % 100:02d}" for year in range(1900, 2100)]
+        df = pd.DataFrame(
+            {
+                "Branca": ["Arts"] * 200 + ["STEM"] * 200,
+                "Curs Acadèmic": years * 2,
+                "Abandonament mitjà (%)": np.linspace(0, 30, 400),
+                "Rendiment mitjà (%)": np.linspace(60, 90, 400),
+            }
+        )
+        with tempfile.TemporaryDirectory() as tmp, patch.object(
+            visual_analysis, "IMG_DIR", tmp
+        ), patch("src.modules.visual_analysis.print"), patch.object(
+            visual_analysis.TimeSeriesFigure, "close", autospec=True
+        ) as close:
+            visual_analysis.plot_time_series_by_branch(
+                df, student_name="unittest", max_points=25
+            )
+            figure = close.call_args[0][0].figure
+            lines = [line for ax in figure.axes for line in ax.get_lines()]
+            labels = [t.get_text() for t in figure.axes[0].get_xticklabels()]
+
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(all(len(line.get_xdata()) == 25 for line in lines))
+        self.assertIn("2000-01", labels)
+
+    def test_plot_does_not_use_pyplot(self):
+        """Figures are drawn without pyplot, so no GUI backend is involved."""
+        df = pd.DataFrame(
+            {
+                "Branca": ["Arts", "Arts", "STEM", "STEM"],
+                "Curs Acadèmic": ["19-20", "20-21"] * 2,
+                "Abandonament mitjà (%)": [10.0, 12.0, 8.0, 9.0],
+                "Rendiment mitjà (%)": [80.0, 82.0, 75.0, 77.0],
+            }
+        )
+        with tempfile.TemporaryDirectory() as tmp, patch.object(
+            visual_analysis, "IMG_DIR", tmp
+        ), patch("src.modules.visual_analysis.print"), patch(
+            "matplotlib.pyplot.figure"
+        ) as pyplot_figure:
+            visual_analysis.plot_time_series_by_branch(df, student_name="unittest")
+            saved = [path.name for path in Path(tmp).iterdir()]
+
+        pyplot_figure.assert_not_called()
+        self.assertIn("evolucio_unittest.png", saved)
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()